@@ -0,0 +1,127 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main"))
+
+from synthetic import add_shape_arguments, tree_from_args  # noqa: E402
+from structify.diff import diff_trees, format_path, subtree_hashes  # noqa: E402
+from structify.extsort import external_diff  # noqa: E402
+from structify.tree import StructureTree  # noqa: E402
+
+
+def legacy_compare(left_lines, right_lines):
+    # Per-level name sets, as the comparison dialog used to build them
+    def by_level(lines):
+        levels = {}
+        for line in lines:
+            indent = len(line) - len(line.lstrip())
+            level = indent // 2
+            name = line.strip()
+            if level not in levels:
+                levels[level] = set()
+            if name:
+                levels[level].add(name)
+        return levels
+
+    left_by_level = by_level(left_lines)
+    right_by_level = by_level(right_lines)
+    out = []
+    for level in range(max(max(left_by_level, default=0), max(right_by_level, default=0)) + 1):
+        left_names = left_by_level.get(level, set())
+        right_names = right_by_level.get(level, set())
+        out.extend(sorted(left_names & right_names))
+        out.extend(sorted(left_names - right_names))
+        out.extend(sorted(right_names - left_names))
+    return out
+
+
+def render_per_line(lines):
+    # Old dialog rendering: one insertText with a fresh format per line
+    from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor, QTextDocument
+    doc = QTextDocument()
+    cursor = QTextCursor(doc)
+    cursor.beginEditBlock()
+    for line in lines:
+        fmt = QTextCharFormat()
+        fmt.setBackground(QColor("#e6ffe6"))
+        cursor.setCharFormat(fmt)
+        cursor.insertText(f"  {line}\n")
+    cursor.endEditBlock()
+    return doc
+
+
+def render_batched(diff):
+    # New dialog rendering: one insertText per section
+    from PyQt6.QtGui import QColor, QTextCharFormat, QTextCursor, QTextDocument
+    doc = QTextDocument()
+    cursor = QTextCursor(doc)
+    cursor.beginEditBlock()
+    for prefix, items in (("L", diff.removed), ("R", diff.added)):
+        fmt = QTextCharFormat()
+        fmt.setBackground(QColor("#ffe6e6"))
+        cursor.setCharFormat(fmt)
+        cursor.insertText("\n".join(f"{prefix} {format_path(path)}" for path, _ in items) + "\n")
+    cursor.endEditBlock()
+    return doc
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def run(synthetic, changed, render, memory):
+    # The same shapes run_suite.py's compare case uses: a SyntheticTree
+    # against a variant with `changed` folders renamed
+    left = StructureTree()
+    left.extend(synthetic.entries())
+    right = StructureTree()
+    right.extend(synthetic.variant(changed).entries())
+    left_lines = list(left.iter_lines())
+    right_lines = list(right.iter_lines())
+
+    print(f"\n{len(left):,} vs {len(right):,} folders, {changed} renamed folders")
+    elapsed, legacy = timed(lambda: legacy_compare(left_lines, right_lines))
+    print(f"  legacy per-level sets      {elapsed:8.3f} s")
+    if render:
+        elapsed, _ = timed(lambda: render_per_line(legacy))
+        print(f"  legacy per-line render     {elapsed:8.3f} s  {len(legacy):,} lines")
+    elapsed, _ = timed(lambda: subtree_hashes(right))
+    print(f"  subtree hashes (one side)  {elapsed:8.3f} s")
+    elapsed, diff = timed(lambda: diff_trees(left, right))
+    print(f"  diff_trees                 {elapsed:8.3f} s  "
+          f"{diff.compared:,} folders descended, {len(diff.added)} added, "
+          f"{len(diff.removed)} removed, {len(diff.moved)} moved")
+    if render:
+        elapsed, _ = timed(lambda: render_batched(diff))
+        print(f"  batched render             {elapsed:8.3f} s")
+    elapsed, diff = timed(lambda: diff_trees(left, left))
+    print(f"  diff_trees (identical)     {elapsed:8.3f} s")
+    elapsed, changes = timed(lambda: list(external_diff(left.iter_entries(), right.iter_entries(),
+                                                         memory << 20)))
+    print(f"  {f'external_diff ({memory} MB cap)':<27}{elapsed:8.3f} s  {len(changes)} differences")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the structure diff engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--memory", type=int, default=64,
+                        help="Memory cap in MB for the external-sort diff")
+    parser.add_argument("--render", action="store_true",
+                        help="Also time building the comparison document (needs PyQt6)")
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    if args.render:
+        from PyQt6.QtWidgets import QApplication
+        # Only held so the QApplication outlives the renders below
+        _app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    for size in args.sizes:
+        run(tree_from_args(args, size), args.changed, args.render, args.memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main"))
+
+from synthetic import add_shape_arguments, tree_from_args  # noqa: E402
+from structify.scanner import DEFAULT_WORKERS, get_folder_structure  # noqa: E402
+from structify.stats import walk_stats  # noqa: E402
+
+
+def legacy_get_folder_structure(root_path):
+    # The os.walk implementation the scanner replaced, kept as the baseline
+    structure = []
+    for dirpath, dirnames, _ in os.walk(root_path, topdown=True):
+        dirnames.sort()
+        rel_path = os.path.relpath(dirpath, root_path)
+        if rel_path == '.':
+            continue
+        depth = rel_path.count(os.sep)
+        indent = '  ' * depth
+        folder_name = os.path.basename(dirpath)
+        structure.append(f"{indent}{folder_name}")
+    return structure
+
+
+def stats_lines(root, workers, sizes=True):
+    return [f"{'  ' * depth}{name}"
+            for depth, name, *_ in walk_stats(root, workers, sizes=sizes) if depth >= 0]
+
+
+def best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare os.walk and scandir folder scanners")
+    parser.add_argument("--nodes", type=int, default=20_000, help="folders in the synthetic tree")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--files", type=int, default=0, help="files per synthetic folder")
+    parser.add_argument("--root", help="Scan an existing folder instead of a synthetic tree")
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    tmp = None
+    root = args.root
+    if root is None:
+        tmp = tempfile.mkdtemp(prefix="structify_bench_")
+        root = tmp
+        synthetic = tree_from_args(args, args.nodes)
+        count = synthetic.create(root, args.files)
+        print(f"Synthetic tree: dirs={count} max depth={synthetic.max_depth} "
+              f"fanout={args.fanout} seed={args.seed} files/dir={args.files}")
+    try:
+        cases = [
+            ("os.walk (legacy)", lambda: legacy_get_folder_structure(root)),
+            ("scandir serial", lambda: get_folder_structure(root, workers=1)),
+            (f"scandir {args.workers} threads", lambda: get_folder_structure(root, workers=args.workers)),
+            (f"+ file counts {args.workers} thr",
+             lambda: stats_lines(root, args.workers, sizes=False)),
+            (f"+ file stats {args.workers} thr", lambda: stats_lines(root, args.workers)),
+        ]
+        baseline = None
+        reference = None
+        for label, fn in cases:
+            elapsed, lines = best_of(fn, args.repeat)
+            if reference is None:
+                reference, baseline = lines, elapsed
+            status = "ok" if lines == reference else "MISMATCH"
+            print(f"{label:<24} {elapsed:8.3f} s  {len(lines) / elapsed:12,.0f} dirs/s  "
+                  f"x{baseline / elapsed:5.2f}  {status}")
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_DIR = os.path.join(BENCH_DIR, "..", "main")
+
+# Measured offscreen with the lazy structify imports (first window 85 ms,
+# import gui 52 ms) plus about 50% for slower machines; --baseline holds a
+# machine to its own earlier run instead
+DEFAULT_BUDGET_MS = 130
+DEFAULT_IMPORT_BUDGET_MS = 80
+DEFAULT_THRESHOLD = 0.15
+
+# Runs in a fresh interpreter: builds the main window, shows it and reports
+# once the event loop has turned, then exits without closeEvent so the last
+# paths file is left alone
+FIRST_WINDOW = """
+import json, os, sys, time
+start = time.perf_counter()
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+import gui
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+app.setStyle("Fusion")
+window = gui.FolderStructureApp()
+built = time.perf_counter()
+window.show()
+
+def shown():
+    now = time.perf_counter()
+    print(json.dumps({"import": imported - start, "build": built - imported,
+                      "show": now - built}), flush=True)
+    os._exit(0)
+
+QTimer.singleShot(0, shown)
+app.exec()
+"""
+
+
+def _env(platform):
+    env = dict(os.environ)
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+    return env
+
+
+def import_times(env):
+    """{module: (self us, cumulative us)} and the top-level order of `import gui`."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import gui"], cwd=MAIN_DIR,
+                         env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    direct = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+        # Two spaces of indent per nesting level below `gui`
+        if name.startswith("   ") and not name.startswith("     "):
+            direct.append(name.strip())
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules, direct
+
+
+def first_window(env):
+    # Wall time from launching the interpreter to the first event loop turn
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", FIRST_WINDOW], cwd=MAIN_DIR, env=env,
+                         capture_output=True, text=True, timeout=120)
+    total = time.perf_counter() - start
+    lines = [line for line in out.stdout.splitlines() if line.startswith("{")]
+    if out.returncode or not lines:
+        raise SystemExit(f"bench_startup: window did not come up:\n{out.stderr.strip()}")
+    phases = json.loads(lines[-1])
+    phases["total"] = total
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure GUI startup: `python -X importtime` of the gui module and the "
+                    "wall time to the first shown window; exits 1 over budget")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="median time to first window (default %(default)s)")
+    parser.add_argument("--import-budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="median cumulative `import gui` time (default %(default)s)")
+    parser.add_argument("--baseline", metavar="JSON",
+                        help="an earlier -o result; the budgets become its medians plus "
+                             "--threshold")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown over --baseline counted as a regression "
+                             "(default 0.15 = 15%%)")
+    parser.add_argument("--platform", default=None if os.environ.get("DISPLAY") else "offscreen",
+                        help="QT_QPA_PLATFORM for the runs (default: offscreen without a display)")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("-o", "--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        args.import_budget_ms = baseline["import_median_ms"] * (1 + args.threshold)
+        args.budget_ms = baseline["first_window_median_ms"] * (1 + args.threshold)
+
+    # Cold start means cold caches, not missing bytecode
+    compileall.compile_dir(MAIN_DIR, quiet=1)
+    env = _env(args.platform)
+
+    import_runs = []
+    modules = direct = None
+    for _ in range(args.repeat):
+        modules, direct = import_times(env)
+        import_runs.append(modules["gui"][1] / 1000)
+    windows = [first_window(env) for _ in range(args.repeat)]
+
+    import_ms = statistics.median(import_runs)
+    window_ms = statistics.median(run["total"] for run in windows) * 1000
+    print(f"import gui        {import_ms:8.1f} ms  (budget {args.import_budget_ms:.0f})")
+    for phase in ("import", "build", "show"):
+        print(f"  {phase:<15} {statistics.median(run[phase] for run in windows) * 1000:8.1f} ms")
+    print(f"first window      {window_ms:8.1f} ms  (budget {args.budget_ms:.0f})")
+    print("\nSlowest imports below gui (last run):")
+    for name in sorted(direct, key=lambda n: modules[n][1], reverse=True)[:args.top]:
+        print(f"  {modules[name][1] / 1000:8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"import_ms": import_runs, "first_window": windows,
+                       "import_median_ms": import_ms, "first_window_median_ms": window_ms,
+                       "budget_ms": args.budget_ms, "import_budget_ms": args.import_budget_ms},
+                      f, indent=2)
+            f.write("\n")
+
+    over = []
+    if import_ms > args.import_budget_ms:
+        over.append(f"import gui {import_ms:.1f} ms > {args.import_budget_ms:.0f} ms")
+    if window_ms > args.budget_ms:
+        over.append(f"first window {window_ms:.1f} ms > {args.budget_ms:.0f} ms")
+    if over:
+        print("\nOVER BUDGET: " + "; ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main"))
+
+from synthetic import add_shape_arguments, tree_from_args  # noqa: E402
+from structify.diff import diff_trees  # noqa: E402
+from structify.history import HistoryStore  # noqa: E402
+from structify.replicate import replicate_tree  # noqa: E402
+from structify.scanner import DEFAULT_WORKERS, get_folder_structure  # noqa: E402
+from structify.search import FUZZY, NameIndex  # noqa: E402
+from structify.textfile import read_structure, write_structure  # noqa: E402
+from structify.tree import StructureTree  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+FORMAT_VERSION = 1
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# Cases that touch the disk create one real folder per node
+DISK_CASES = ("scan", "replicate")
+CASES = ("txt_export", "txt_import", "compare", "history", "index", "search") + DISK_CASES
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def measure(fn, repeat, setup=None, teardown=None):
+    # Run fn `repeat` times; setup/teardown are not timed. Returns the
+    # per-run seconds and the last result.
+    runs = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(state) if setup is not None else fn()
+        runs.append(time.perf_counter() - start)
+        if teardown is not None:
+            teardown(state)
+    return runs, result
+
+
+class Suite:
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.results = []
+
+    def record(self, case, nodes, runs=None, skipped=None, **info):
+        entry = {"case": case, "nodes": nodes}
+        if skipped:
+            entry["skipped"] = skipped
+            print(f"  {case:<12} skipped: {skipped}")
+        else:
+            best = min(runs)
+            entry.update({
+                "best": round(best, 6),
+                "median": round(statistics.median(runs), 6),
+                "runs": [round(run, 6) for run in runs],
+                "nodes_per_second": round(nodes / best) if best else None,
+            })
+            print(f"  {case:<12} {best:9.3f} s  (median {statistics.median(runs):.3f})  "
+                  f"{entry['nodes_per_second'] or 0:12,} nodes/s")
+        entry.update(info)
+        self.results.append(entry)
+
+    def run_size(self, nodes):
+        args = self.args
+        repeat = args.repeat
+        cases = args.cases
+        print(f"\n{nodes:,} nodes")
+        synthetic = tree_from_args(args, nodes)
+        tree = StructureTree()
+        tree.extend(synthetic.entries())
+        base = os.path.join(self.workdir, f"n{nodes}")
+        os.mkdir(base)
+
+        txt = os.path.join(base, "structure.txt")
+        if "txt_export" in cases:
+            runs, _ = measure(lambda: write_structure(tree, txt), repeat)
+            self.record("txt_export", nodes, runs, bytes=os.path.getsize(txt))
+        if "txt_import" in cases:
+            if not os.path.exists(txt):
+                synthetic.write_txt(txt)
+            runs, imported = measure(lambda: read_structure(txt), repeat)
+            self.record("txt_import", nodes, runs, ok=len(imported) == nodes)
+        if "compare" in cases:
+            changes = max(1, nodes // 1000)
+            right = StructureTree()
+            right.extend(synthetic.variant(changes).entries())
+            runs, diff = measure(lambda: diff_trees(tree, right), repeat)
+            self.record("compare", nodes, runs, changes=changes, added=len(diff.added),
+                        removed=len(diff.removed), moved=len(diff.moved))
+            del right, diff
+        if "history" in cases:
+            # Store the tree and a changed copy, then diff the two snapshots
+            changes = max(1, nodes // 1000)
+            variant = synthetic.variant(changes)
+            store_path = os.path.join(base, "history.db")
+            with HistoryStore(store_path) as store:
+                start = time.perf_counter()
+                old = store.add("root", synthetic.entries())
+                stored = time.perf_counter() - start
+                new = store.add("root", variant.entries())
+                runs, diff = measure(lambda: store.diff(old.id, new.id), repeat)
+            self.record("history", nodes, runs, changes=changes, store_seconds=round(stored, 6),
+                        new_objects=new.new_objects, compared=diff.compared,
+                        bytes=os.path.getsize(store_path))
+            del variant, diff
+        if "index" in cases or "search" in cases:
+            runs, index = measure(lambda: NameIndex(tree), repeat if "index" in cases else 1)
+            if "index" in cases:
+                self.record("index", nodes, runs, names=len(tree.names))
+            if "search" in cases:
+                # Substring and fuzzy lookups of names taken across the tree
+                step = max(1, len(tree.names) // 20)
+                queries = [name[1:5] for name in tree.names[::step]]
+                runs, found = measure(lambda: sum(len(index.search(query)) for query in queries)
+                                      + sum(len(index.search(query, FUZZY)) for query in queries),
+                                      repeat)
+                self.record("search", nodes, runs, queries=2 * len(queries), matches=found)
+            del index
+
+        disk_cases = [case for case in DISK_CASES if case in cases]
+        if disk_cases and args.disk_limit and nodes > args.disk_limit:
+            for case in disk_cases:
+                self.record(case, nodes, skipped=f"above --disk-limit {args.disk_limit:,}")
+            disk_cases = []
+        if "scan" in disk_cases:
+            root = os.path.join(base, "scan")
+            os.mkdir(root)
+            synthetic.create(root)
+            expected = list(synthetic.lines())
+            runs, lines = measure(lambda: get_folder_structure(root, workers=args.workers), repeat)
+            self.record("scan", nodes, runs, workers=args.workers, ok=lines == expected)
+            del expected, lines
+            shutil.rmtree(root, ignore_errors=True)
+        if "replicate" in disk_cases:
+            # What the GUI's create_from_lines does: parse the lines, then mkdir
+            lines = list(synthetic.lines())
+            targets = iter(range(repeat))
+
+            def setup():
+                dest = os.path.join(base, f"replicate_{next(targets)}")
+                os.mkdir(dest)
+                return dest
+
+            def replicate(dest):
+                return replicate_tree(StructureTree.from_lines(lines), dest, workers=args.workers)
+
+            runs, result = measure(replicate, repeat, setup,
+                                   lambda dest: shutil.rmtree(dest, ignore_errors=True))
+            self.record("replicate", nodes, runs, workers=args.workers,
+                        ok=result.created == nodes and not result.failed)
+        shutil.rmtree(base, ignore_errors=True)
+
+
+def compare_results(current, baseline, threshold):
+    """Print best-time ratios against a previous run; returns the regressions."""
+    previous = {(r["case"], r["nodes"]): r for r in baseline["results"] if "best" in r}
+    regressions = []
+    print(f"\nAgainst {baseline.get('environment', {}).get('git_commit') or 'baseline'} "
+          f"(threshold {threshold:.0%}):")
+    for result in current["results"]:
+        before = previous.get((result["case"], result["nodes"]))
+        if before is None or "best" not in result:
+            continue
+        ratio = result["best"] / before["best"] if before["best"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"  {result['case']:<12} {result['nodes']:>10,}  {before['best']:9.3f} s -> "
+              f"{result['best']:9.3f} s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time scanning, replication, compare and TXT import/export on synthetic "
+                    "trees and write the results as JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--disk-limit", type=int, default=100_000,
+                        help="Skip the on-disk cases above this many nodes, 0 for no limit "
+                             "(default 100000)")
+    parser.add_argument("--temp-dir", help="Where to build the on-disk trees")
+    parser.add_argument("-o", "--output",
+                        help="Result file (default benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--baseline", metavar="JSON",
+                        help="Compare against an earlier result file; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Slowdown counted as a regression (default 0.15 = 15%%)")
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.time()
+    workdir = tempfile.mkdtemp(prefix="structify_suite_", dir=args.temp_dir)
+    suite = Suite(args, workdir)
+    try:
+        for nodes in args.sizes:
+            suite.run_size(nodes)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "format": FORMAT_VERSION,
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "environment": environment(),
+        "parameters": {
+            "repeat": args.repeat, "workers": args.workers, "depth": args.depth,
+            "fanout": args.fanout, "name_length": list(args.name_length),
+            "unicode": args.unicode, "seed": args.seed,
+        },
+        "results": suite.results,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, time.strftime("suite-%Y%m%d-%H%M%S.json",
+                                                         time.localtime(started)))
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare_results(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
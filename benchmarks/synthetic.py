@@ -0,0 +1,189 @@
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main"))
+
+from structify.textfile import write_entries  # noqa: E402
+
+ASCII_CHARS = string.ascii_letters + string.digits + "-_"
+# Precomposed Latin, Greek, Cyrillic and CJK characters plus a few astral
+# symbols (surrogate pairs on Windows); no combining marks, so macOS does
+# not renormalise the names on disk
+UNICODE_CHARS = ("äöüßéèçñøåłšžđćčğış" "αβγδλπσω" "абвгдежзийклмн"
+                 "中文字目录文件夹資料" "日本語フォルダ" "한국어폴더" "📁🚀🎵")
+
+
+class SyntheticTree:
+    """A deterministic random folder tree of exactly `nodes` folders.
+
+    Folders are handed out breadth first: every folder above `depth` levels
+    gets between 1 and 2*fanout-1 children (fanout on average) until the
+    budget runs out, so the same arguments always give the same tree, with
+    a realistic mix of wide and narrow folders. Names are `name_length`
+    (min, max) characters long; a `unicode` fraction of them mixes in
+    non-ASCII characters. Sibling names are unique even on case-insensitive
+    file systems and come out in the scanner's sort order, so scanning a
+    tree made by create() gives back exactly entries().
+    """
+
+    def __init__(self, nodes, depth=8, fanout=8, name_length=(4, 16), unicode=0.0, seed=0):
+        if nodes < 0 or depth < 1 or fanout < 1:
+            raise ValueError("nodes must be >= 0, depth and fanout >= 1")
+        if not 1 <= name_length[0] <= name_length[1]:
+            raise ValueError("name lengths must satisfy 1 <= min <= max")
+        self.nodes = nodes
+        self.depth = depth
+        self.fanout = fanout
+        self.name_length = tuple(name_length)
+        self.unicode = unicode
+        self.seed = seed
+        rng = random.Random(seed)
+        # BFS hands every parent one contiguous run of children:
+        # children of p are first[p] .. first[p] + count[p] - 1
+        self.first = [0] * nodes
+        self.count = [0] * nodes
+        self.roots = []
+        self.names = [None] * nodes
+        level = [0] * nodes
+        size = 0
+        parent = 0
+        while size < nodes:
+            k = min(rng.randint(1, 2 * fanout - 1), nodes - size)
+            if parent == size:
+                # Nobody left to hand children to (depth cap): widen the top
+                self.roots.extend(range(size, size + k))
+                child_level = 0
+            elif level[parent] + 1 < depth:
+                self.first[parent] = size
+                self.count[parent] = k
+                child_level = level[parent] + 1
+                parent += 1
+            else:
+                parent += 1
+                continue
+            self._name_group(rng, range(size, size + k))
+            for node in range(size, size + k):
+                level[node] = child_level
+            size += k
+        self.max_depth = max(level, default=-1)
+
+    def _name_group(self, rng, nodes):
+        low, high = self.name_length
+        taken = set()
+        for node in nodes:
+            chars = ASCII_CHARS + UNICODE_CHARS if rng.random() < self.unicode else ASCII_CHARS
+            name = "".join(rng.choices(chars, k=rng.randint(low, high)))
+            # "-" and "_" only inside, so no name looks like an option
+            name = name.strip("-_") or "x"
+            unique = name
+            suffix = 1
+            while unique.casefold() in taken:
+                suffix += 1
+                unique = f"{name}~{suffix}"
+            taken.add(unique.casefold())
+            self.names[node] = unique
+
+    def __len__(self):
+        return self.nodes
+
+    def _sorted(self, nodes):
+        names = self.names
+        return sorted(nodes, key=names.__getitem__)
+
+    def entries(self):
+        # (depth, name) pairs in pre-order, siblings sorted like the scanner
+        names = self.names
+        first = self.first
+        count = self.count
+        stack = [(node, 0) for node in reversed(self._sorted(self.roots))]
+        while stack:
+            node, depth = stack.pop()
+            yield depth, names[node]
+            if count[node]:
+                children = self._sorted(range(first[node], first[node] + count[node]))
+                stack.extend((child, depth + 1) for child in reversed(children))
+
+    def lines(self):
+        return (f"{'  ' * depth}{name}" for depth, name in self.entries())
+
+    def variant(self, changes, seed=None):
+        """A copy with `changes` random folders renamed.
+
+        Renaming a folder with children makes its whole subtree differ, so
+        diffs see a realistic mix of leaf changes and moved subtrees.
+        """
+        other = object.__new__(SyntheticTree)
+        other.__dict__.update(self.__dict__)
+        other.names = list(self.names)
+        rng = random.Random(self.seed + 1 if seed is None else seed)
+        for node in rng.sample(range(self.nodes), min(changes, self.nodes)):
+            other.names[node] += "_changed"
+        return other
+
+    def write_txt(self, path):
+        # Plain, .gz or .zst by suffix, like every structure file
+        return write_entries(self.entries(), path)
+
+    def create(self, root, files=0):
+        """Make every folder under root (which must exist); returns the count.
+
+        With files, every folder also gets that many small files
+        (file_000.dat holds 0 bytes, file_001.dat 1 byte, ...).
+        """
+        path = [root]
+        made = 0
+        for depth, name in self.entries():
+            del path[depth + 1:]
+            folder = os.path.join(path[-1], name)
+            os.mkdir(folder)
+            for i in range(files):
+                with open(os.path.join(folder, f"file_{i:03d}.dat"), "wb") as f:
+                    f.write(b"x" * i)
+            path.append(folder)
+            made += 1
+        return made
+
+
+def add_shape_arguments(parser):
+    parser.add_argument("--depth", type=int, default=8, help="Maximum folder depth (default 8)")
+    parser.add_argument("--fanout", type=int, default=8,
+                        help="Average number of subfolders per folder (default 8)")
+    parser.add_argument("--name-length", type=int, nargs=2, default=(4, 16),
+                        metavar=("MIN", "MAX"), help="Folder name length range (default 4 16)")
+    parser.add_argument("--unicode", type=float, default=0.1,
+                        help="Fraction of names with non-ASCII characters (default 0.1)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def tree_from_args(args, nodes):
+    return SyntheticTree(nodes, args.depth, args.fanout, args.name_length, args.unicode, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic folder tree")
+    parser.add_argument("nodes", type=int, help="Number of folders")
+    add_shape_arguments(parser)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--txt", metavar="PATH", help="Write a structure TXT (.gz/.zst allowed)")
+    target.add_argument("--create", metavar="DIR", help="Create the folders under DIR")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tree = tree_from_args(args, args.nodes)
+    if args.txt:
+        written = tree.write_txt(args.txt)
+        where = args.txt
+    else:
+        os.makedirs(args.create, exist_ok=True)
+        written = tree.create(args.create)
+        where = args.create
+    print(f"{written:,} folders, max depth {tree.max_depth}, seed {args.seed} -> {where} "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
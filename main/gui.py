@@ -0,0 +1,2195 @@
+import sys
+import os
+import json
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QLabel, QLineEdit, QPushButton, QTextEdit, QFileDialog,
+    QMessageBox, QStyleFactory, QRadioButton, QButtonGroup,
+    QDialog, QDialogButtonBox, QTreeView, QAbstractItemView, QCheckBox, QSpinBox,
+    QPlainTextEdit, QTableWidget, QTableWidgetItem, QHeaderView, QComboBox
+)
+from PyQt6.QtCore import (Qt, QSize, QObject, QThread, QTimer, pyqtSignal, QAbstractItemModel,
+                          QModelIndex)
+from PyQt6.QtGui import QFont, QColor, QTextCharFormat, QTextCursor
+
+import structify
+from structify.filters import ScanFilter, split_patterns
+from structify.profiling import (BUILD, DIFF, MKDIR, PARSE, RENDER, RMDIR, WALK, WRITE, Timings,
+                                 dump_timings, profiled)
+from structify.search import EXACT, FUZZY, SUBSTRING, NameIndex
+from structify.tree import ROOT, NO_NODE, StructureTree
+
+LAST_PATHS_FILE = "structify_last_paths.json"
+# Resolved once at startup, so the caches stay next to the paths file
+STATE_DIR = os.path.dirname(os.path.abspath(LAST_PATHS_FILE))
+SCAN_CACHE_DIR = os.path.join(STATE_DIR, "structify_scan_cache")
+JOURNAL_DIR = os.path.join(STATE_DIR, "structify_journals")
+HISTORY_FILE = os.path.join(STATE_DIR, "structify_history.db")
+SCAN_BATCH_LINES = 2000
+SCAN_BATCH_SECONDS = 0.1
+NEW_FOLDER_NAME = "New folder"
+COMPARE_DISPLAY_LIMIT = 20000
+REPLICATE_DETAIL_LIMIT = 1000
+# Operations whose timings are kept for "Save Timings..."
+TIMINGS_LOG_SIZE = 100
+STATS_COLUMNS = ("Folder", "Files", "Size", "Newest file")
+SEARCH_MODES = (("Contains", SUBSTRING), ("Fuzzy", FUZZY), ("Exact name", EXACT))
+SEARCH_PLACEHOLDER = "Search folders..."
+# Typing pause before a search runs, and the most matches expanded at once
+SEARCH_DELAY_MS = 150
+SEARCH_EXPAND_LIMIT = 2000
+
+
+class StructureModel(QAbstractItemModel):
+    # Child lists are only materialised for nodes the view actually asks
+    # about, so a collapsed million-node tree costs nothing beyond the arrays.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tree = StructureTree()
+        # FolderStats when the tree was scanned with file statistics; adds
+        # the Files/Size/Newest file columns
+        self.stats = None
+        # structify.search.NameIndex once built; edits keep it current
+        self.name_index = None
+        # Bumped by every edit, so an index built meanwhile can be discarded
+        self.edits = 0
+        # With a search filter only these nodes are shown; visible_parents
+        # are the nodes that have a visible child
+        self.visible = None
+        self.visible_parents = None
+        self._rows = {}
+        self._row_of = {}
+
+    def set_tree(self, tree, stats=None):
+        self.beginResetModel()
+        self.tree = tree
+        self.stats = stats
+        self.name_index = None
+        self.edits += 1
+        self.visible = None
+        self.visible_parents = None
+        self._rows = {}
+        self._row_of = {}
+        self.endResetModel()
+
+    def set_filter(self, nodes):
+        # Show only nodes and their ancestors; None shows everything again
+        self.beginResetModel()
+        if nodes is None:
+            self.visible = None
+            self.visible_parents = None
+        else:
+            visible = set()
+            parents = set()
+            parent_of = self.tree.parent
+            for node in nodes:
+                while node != ROOT and node not in visible:
+                    visible.add(node)
+                    node = parent_of[node]
+                    parents.add(node)
+            self.visible = visible
+            self.visible_parents = parents
+        self._rows = {}
+        self._row_of = {}
+        self.endResetModel()
+
+    def clear(self):
+        self.set_tree(StructureTree())
+
+    def node(self, index):
+        return index.internalId() if index.isValid() else ROOT
+
+    def node_index(self, node):
+        if node == ROOT:
+            return QModelIndex()
+        return self.createIndex(self._row(node), 0, node)
+
+    def _children(self, node):
+        rows = self._rows.get(node)
+        if rows is None:
+            rows = self._listed(node)
+            self._rows[node] = rows
+            row_of = self._row_of
+            for row, child in enumerate(rows):
+                row_of[child] = row
+        return rows
+
+    def _listed(self, node):
+        rows = self.tree.children(node)
+        if self.visible is not None:
+            visible = self.visible
+            rows = [child for child in rows if child in visible]
+        return rows
+
+    def _row(self, node):
+        row = self._row_of.get(node)
+        if row is None:
+            self._children(self.tree.parent[node])
+            row = self._row_of[node]
+        return row
+
+    def _reindex(self, node, start=0):
+        row_of = self._row_of
+        rows = self._rows[node]
+        for row in range(start, len(rows)):
+            row_of[rows[row]] = row
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not 0 <= column < self.columnCount():
+            return QModelIndex()
+        rows = self._children(self.node(parent))
+        if 0 <= row < len(rows):
+            return self.createIndex(row, column, rows[row])
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        return self.node_index(self.tree.parent[index.internalId()])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self._children(self.node(parent)))
+
+    def columnCount(self, parent=QModelIndex()):
+        if self.stats is None:
+            return 1
+        # Size and Newest file only when the scan stat'ed the files
+        return len(STATS_COLUMNS) if self.stats.sizes else 2
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if (orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole
+                and section < len(STATS_COLUMNS)):
+            return STATS_COLUMNS[section]
+        return None
+
+    def hasChildren(self, parent=QModelIndex()):
+        if self.visible_parents is not None:
+            return self.node(parent) in self.visible_parents
+        return self.tree.first_child[self.node(parent)] != NO_NODE
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = index.column()
+        if column == 0:
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+                return self.tree.name(index.internalId())
+            return None
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        files, size, newest = self.stats.totals(index.internalId())
+        if column == 1:
+            return f"{files:,}"
+        if column == 2:
+            return structify.stats.format_size(size)
+        return structify.stats.format_mtime(newest)
+
+    def refresh_stats(self):
+        # Roll the per-folder file totals up into subtree totals
+        if self.stats is None:
+            return
+        self.stats.rollup(self.tree)
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+
+    def _stats_changed(self, node):
+        # Totals of node and its ancestors moved; repaint the visible ones
+        last = self.columnCount() - 1
+        while node != ROOT and node != NO_NODE:
+            row = self._row_of.get(node)
+            if row is not None:
+                self.dataChanged.emit(self.createIndex(row, 1, node), self.createIndex(row, last, node))
+            node = self.tree.parent[node]
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        name = str(value).strip()
+        if (not index.isValid() or index.column() != 0 or role != Qt.ItemDataRole.EditRole
+                or not name):
+            return False
+        node = index.internalId()
+        old_name_id = self.tree.name_id[node]
+        self.tree.rename(node, name)
+        if self.name_index is not None:
+            self.name_index.rename(node, old_name_id)
+        self.edits += 1
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if index.column() != 0:
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        return (Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+                | Qt.ItemFlag.ItemIsEditable)
+
+    def append_entries(self, entries):
+        tree = self.tree
+        first_new = len(tree.parent)
+        if self.stats is not None:
+            # (depth, name, files, bytes, newest) items from a stats scan
+            entries = self.stats.extend(entries)
+        tree.extend(entries)
+        self.edits += 1
+        if self.name_index is not None:
+            self.name_index.extend(first_new)
+        if self.visible is not None:
+            # New folders stay hidden until the search is run again
+            return
+        # Only parents the view already knows about need row notifications;
+        # everything else is picked up lazily when it is first expanded.
+        added = {}
+        parent_of = tree.parent
+        for node in range(first_new, len(parent_of)):
+            added.setdefault(parent_of[node], []).append(node)
+        for parent, nodes in added.items():
+            if parent != ROOT and parent not in self._row_of and parent not in self._rows:
+                continue
+            rows = self._rows.get(parent)
+            if rows is None:
+                rows = tree.children(parent)[:-len(nodes)]
+                self._rows[parent] = rows
+                self._reindex(parent)
+            else:
+                # The view may already have listed this parent while an
+                # earlier group was being announced
+                nodes = [node for node in nodes if node not in self._row_of]
+                if not nodes:
+                    continue
+            start = len(rows)
+            self.beginInsertRows(self.node_index(parent), start, start + len(nodes) - 1)
+            row_of = self._row_of
+            for row, node in enumerate(nodes, start):
+                rows.append(node)
+                row_of[node] = row
+            self.endInsertRows()
+
+    def insert_folder(self, parent_index, row, name=NEW_FOLDER_NAME):
+        parent = self.node(parent_index)
+        rows = self._children(parent)
+        after = rows[row - 1] if row > 0 else NO_NODE
+        self.beginInsertRows(parent_index, row, row)
+        node = self.tree.insert(parent, name, after)
+        self._inserted(node)
+        if self.visible is not None:
+            self.visible.add(node)
+            self.visible_parents.add(parent)
+        rows.insert(row, node)
+        self._reindex(parent, row)
+        self.endInsertRows()
+        return self.createIndex(row, 0, node)
+
+    def _inserted(self, node):
+        self.edits += 1
+        if self.stats is not None:
+            self.stats.grow(len(self.tree.parent))
+        if self.name_index is not None:
+            self.name_index.insert(node)
+
+    def _removing(self, node):
+        self.edits += 1
+        if self.name_index is not None:
+            self.name_index.remove(node)
+
+    def remove_folder(self, index):
+        node = index.internalId()
+        parent = self.tree.parent[node]
+        row = index.row()
+        self.beginRemoveRows(index.parent(), row, row)
+        if self.stats is not None:
+            self.stats.detach(self.tree, node)
+        self._removing(node)
+        self.tree.remove(node)
+        del self._rows[parent][row]
+        self._reindex(parent, row)
+        self._forget(node)
+        self.endRemoveRows()
+        if self.stats is not None:
+            self._stats_changed(parent)
+
+    def _forget(self, node):
+        # Drop cached rows at and below a node that left its parent
+        for child in self.tree.iter_nodes(node):
+            self._rows.pop(child, None)
+            self._row_of.pop(child, None)
+        self._rows.pop(node, None)
+        self._row_of.pop(node, None)
+
+    def _known_rows(self, parent):
+        # Rows of parent if the view may know about its children, else None
+        rows = self._rows.get(parent)
+        if rows is None and (parent == ROOT or parent in self._row_of):
+            rows = self._children(parent)
+        return rows
+
+    # insert/remove/move mirror StructureTree so structify.watch.apply_events
+    # can edit through the model; parents the view never listed are changed
+    # silently.
+    def insert(self, parent, name, after=NO_NODE):
+        rows = self._known_rows(parent)
+        if rows is None or self.visible is not None:
+            # While a search filter is shown new folders stay hidden
+            node = self.tree.insert(parent, name, after)
+            self._inserted(node)
+            return node
+        row = rows.index(after) + 1 if after != NO_NODE else 0
+        return self.insert_folder(self.node_index(parent), row, name).internalId()
+
+    def remove(self, node):
+        if node in self._row_of:
+            self.remove_folder(self.node_index(node))
+        else:
+            if self.stats is not None:
+                self.stats.detach(self.tree, node)
+                self._stats_changed(self.tree.parent[node])
+            self._removing(node)
+            self.tree.remove(node)
+
+    def move(self, node, parent, after=NO_NODE, name=None):
+        tree = self.tree
+        if self.stats is not None:
+            self.stats.detach(tree, node)
+            self._stats_changed(tree.parent[node])
+        if node in self._row_of:
+            old_parent = tree.parent[node]
+            row = self._row_of[node]
+            self.beginRemoveRows(self.node_index(old_parent), row, row)
+            del self._rows[old_parent][row]
+            self._reindex(old_parent, row)
+            self._forget(node)
+            self.endRemoveRows()
+        old_name_id = tree.name_id[node]
+        tree.move(node, parent, after, name)
+        self.edits += 1
+        if self.name_index is not None:
+            self.name_index.rename(node, old_name_id)
+        if self.stats is not None:
+            self.stats.attach(tree, node)
+            self._stats_changed(parent)
+        if self.visible is not None and node not in self.visible:
+            return
+        rows = self._rows.get(parent)
+        if rows is None:
+            if parent != ROOT and parent not in self._row_of:
+                return
+            rows = [child for child in self._listed(parent) if child != node]
+            self._rows[parent] = rows
+            self._reindex(parent)
+        row = self._row_among(rows, after)
+        self.beginInsertRows(self.node_index(parent), row, row)
+        rows.insert(row, node)
+        self._reindex(parent, row)
+        self.endInsertRows()
+
+    def _row_among(self, rows, after):
+        # Row behind after; a hidden after counts from its last shown sibling
+        if after == NO_NODE:
+            return 0
+        if after in self._row_of:
+            return self._row_of[after] + 1
+        child = self.tree.first_child[self.tree.parent[after]]
+        row = 0
+        while child != NO_NODE and child != after:
+            if child in self._row_of:
+                row = self._row_of[child] + 1
+            child = self.tree.next_sibling[child]
+        return row
+
+
+class ScanWorker(QThread):
+    entries_ready = pyqtSignal(list)
+    progress = pyqtSignal(int, float)
+    failed = pyqtSignal(str)
+
+    def __init__(self, root_path, recursive, scan_cache=None, scan_filter=None,
+                 collect_stats=False, sizes=True, parent=None):
+        super().__init__(parent)
+        self.root_path = root_path
+        self.recursive = recursive
+        self.scan_cache = scan_cache
+        self.scan_filter = scan_filter
+        # Stats scans emit (depth, name, files, bytes, newest) and skip the cache
+        self.collect_stats = collect_stats
+        self.sizes = sizes
+        self.stats = structify.scan_cache.ScanStats()
+        self.count = 0
+        self.elapsed = 0.0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            if not self.recursive:
+                lines = structify.scanner.get_folder_structure(self.root_path, recursive=False,
+                                                               scan_filter=self.scan_filter)
+                self.count = len(lines)
+                if lines:
+                    self.entries_ready.emit([(0, name) for name in lines])
+            else:
+                self._stream(start)
+        except Exception as e:
+            self.failed.emit(str(e))
+        self.elapsed = time.perf_counter() - start
+
+    def _stream(self, start):
+        batch = []
+        last_emit = start
+        if self.collect_stats:
+            entries = structify.stats.walk_stats(self.root_path, cancel=self._cancel,
+                                                 scan_filter=self.scan_filter, sizes=self.sizes)
+            # The first item carries the root's own files and is not a folder
+            batch.append(next(entries))
+        elif self.scan_cache is not None:
+            entries = self.scan_cache.walk(self.root_path, cancel=self._cancel, stats=self.stats,
+                                           scan_filter=self.scan_filter)
+        else:
+            entries = structify.scanner.walk_structure(self.root_path, cancel=self._cancel,
+                                                       scan_filter=self.scan_filter)
+        for entry in entries:
+            batch.append(entry)
+            self.count += 1
+            # Only look at the clock every few hundred lines
+            if len(batch) >= SCAN_BATCH_LINES or (self.count & 0xFF) == 0:
+                now = time.perf_counter()
+                if len(batch) >= SCAN_BATCH_LINES or now - last_emit >= SCAN_BATCH_SECONDS:
+                    self.entries_ready.emit(batch)
+                    self.progress.emit(self.count, self.count / max(now - start, 1e-9))
+                    batch = []
+                    last_emit = now
+        if batch:
+            self.entries_ready.emit(batch)
+
+
+class WatchRelay(QObject):
+    # FolderWatcher calls back on its own thread; the signal hands each
+    # batch over to the GUI thread.
+    events_ready = pyqtSignal(list)
+
+
+class IndexWorker(QThread):
+    # Builds the search index of a preview off the GUI thread
+    def __init__(self, tree, edits, parent=None):
+        super().__init__(parent)
+        self.tree = tree
+        self.edits = edits
+        self.index = None
+
+    def run(self):
+        self.index = NameIndex(self.tree)
+
+
+class HistoryWorker(QThread):
+    # Adds an exported structure to the snapshot history off the GUI thread
+    def __init__(self, root, entries, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.entries = entries
+        self.snapshot = None
+        self.error = None
+
+    def run(self):
+        try:
+            with structify.history.HistoryStore(HISTORY_FILE) as store:
+                self.snapshot = store.add(self.root, self.entries)
+        except Exception as e:
+            self.error = str(e)
+        self.entries = None
+
+
+class ComparisonDialog(QDialog):
+    def __init__(self, left_tree, right_tree, parent=None, timings=None):
+        super().__init__(parent)
+        self.setWindowTitle("Structure Comparison")
+        self.resize(1000, 700)
+
+        layout = QVBoxLayout(self)
+        label = QLabel("Comparison: Left vs Right preview (by full folder path)")
+        label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(label)
+
+        self.preview = QTextEdit()
+        self.preview.setReadOnly(True)
+        self.preview.setFont(QFont("SF Mono", 12))
+        self.preview.setStyleSheet("""
+            QTextEdit {
+                background-color: #fafafa;
+                color: #000000;
+                border: 1px solid #c0c0c0;
+                border-radius: 6px;
+                padding: 10px;
+            }
+        """)
+        layout.addWidget(self.preview, stretch=1)
+
+        btn_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
+        btn_box.accepted.connect(self.accept)
+        layout.addWidget(btn_box)
+
+        self.timings = timings or Timings("compare", enabled=False)
+        self._compare_and_highlight(left_tree, right_tree)
+
+    def _compare_and_highlight(self, left_tree, right_tree):
+        with self.timings.phase(DIFF):
+            diff = structify.diff.diff_trees(left_tree, right_tree)
+        self.timings.count("folders descended", diff.compared)
+
+        green = QColor("#e6ffe6")
+        red = QColor("#ffe6e6")
+        gray = QColor("#f0f0f0")
+
+        summary = (f"Left: {diff.left_count:,} folders    Right: {diff.right_count:,} folders\n"
+                   f"Only in Left: {diff.removed_folders():,}    "
+                   f"Only in Right: {diff.added_folders():,}    "
+                   f"Moved: {diff.moved_folders():,}\n")
+        if diff.identical:
+            summary += "\nThe structures are identical.\n"
+        sections = [(None, summary)]
+        format_path = structify.diff.format_path
+        if diff.removed:
+            sections.append((red, self._section(
+                "Only in Left", [f"L {format_path(path)}{self._size_note(size)}"
+                                 for path, size in diff.removed])))
+        if diff.added:
+            sections.append((green, self._section(
+                "Only in Right", [f"R {format_path(path)}{self._size_note(size)}"
+                                  for path, size in diff.added])))
+        if diff.moved:
+            sections.append((gray, self._section(
+                "Moved", [f"M {format_path(src)}  ->  {format_path(dst)}{self._size_note(size)}"
+                          for src, dst, size in diff.moved])))
+
+        # One insertText per section keeps the document build cheap even for
+        # very large diffs.
+        with self.timings.phase(RENDER):
+            cursor = QTextCursor(self.preview.document())
+            cursor.beginEditBlock()
+            for color, text in sections:
+                fmt = QTextCharFormat()
+                if color is not None:
+                    fmt.setBackground(color)
+                cursor.setCharFormat(fmt)
+                cursor.insertText(text)
+            cursor.endEditBlock()
+            cursor.movePosition(QTextCursor.MoveOperation.Start)
+            self.preview.setTextCursor(cursor)
+
+    @staticmethod
+    def _size_note(size):
+        return f"  ({size:,} folders)" if size > 1 else ""
+
+    @staticmethod
+    def _section(title, lines):
+        shown = lines[:COMPARE_DISPLAY_LIMIT]
+        text = f"\n{title} ({len(lines):,})\n" + "\n".join(shown) + "\n"
+        if len(lines) > len(shown):
+            text += f"... {len(lines) - len(shown):,} more\n"
+        return text
+
+
+class ReplicateWorker(QThread):
+    # Runs structify.replicate off the GUI thread; the tree is a copy, so
+    # the preview stays editable (and watchable) meanwhile. With entries
+    # instead of a tree the (depth, name) stream is replicated as it comes.
+    def __init__(self, tree, destination, dry_run, journal, timings, parent=None, entries=None):
+        super().__init__(parent)
+        self.tree = tree
+        self.entries = entries
+        self.destination = destination
+        self.dry_run = dry_run
+        self.journal = journal
+        self.timings = timings
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            replicate = structify.replicate
+            with self.timings.phase(MKDIR):
+                if self.entries is not None:
+                    self.result = replicate.replicate_entries(
+                        self.timings.iterate(self.entries, BUILD, "folders"), self.destination,
+                        dry_run=self.dry_run, journal=self.journal)
+                else:
+                    self.result = replicate.replicate_tree(
+                        self.tree, self.destination, dry_run=self.dry_run, journal=self.journal)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+        self.tree = None
+        self.entries = None
+
+
+class BatchWorker(QThread):
+    report_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, template, roots, recursive, jobs, scan_filter, limit, parent=None):
+        super().__init__(parent)
+        self.template = template
+        self.roots = roots
+        self.recursive = recursive
+        self.jobs = jobs
+        self.scan_filter = scan_filter
+        self.limit = limit
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        import multiprocessing
+        try:
+            # Forking from a process running Qt threads is unsafe; spawned
+            # workers start clean and only import structify
+            batch = structify.batch
+            for report in batch.batch_compare(self.template, self.roots, self.recursive, self.jobs,
+                                              batch.DEFAULT_SCAN_WORKERS, self.scan_filter,
+                                              self.limit, self._cancel,
+                                              multiprocessing.get_context("spawn")):
+                self.report_ready.emit(report)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class BatchCompareDialog(QDialog):
+    COLUMNS = ("Root", "Status", "Folders", "Missing", "Extra", "First differences")
+
+    def __init__(self, template_tree, recursive, scan_filter, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Batch Compare")
+        self.resize(1100, 700)
+        self.template_tree = template_tree
+        self.recursive = recursive
+        self.scan_filter = scan_filter
+        self.reports = []
+        self.worker = None
+
+        layout = QVBoxLayout(self)
+        label = QLabel(f"Template: Left preview ({len(template_tree):,} folders)")
+        label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(label)
+
+        layout.addWidget(QLabel("Folders to check, one per line (glob patterns like /projects/* are expanded):"))
+        self.roots_edit = QPlainTextEdit()
+        self.roots_edit.setMaximumHeight(120)
+        layout.addWidget(self.roots_edit)
+
+        options_layout = QHBoxLayout()
+        btn_add = QPushButton("Add Folder...")
+        btn_add.clicked.connect(self.add_folder)
+        options_layout.addWidget(btn_add)
+        options_layout.addWidget(QLabel("Processes:"))
+        self.jobs_spin = QSpinBox()
+        self.jobs_spin.setRange(1, 256)
+        self.jobs_spin.setValue(structify.batch.DEFAULT_JOBS)
+        options_layout.addWidget(self.jobs_spin)
+        options_layout.addWidget(QLabel("Differences per root:"))
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(1, 1000)
+        self.limit_spin.setValue(structify.batch.DEFAULT_LIMIT)
+        options_layout.addWidget(self.limit_spin)
+        options_layout.addStretch(1)
+        self.run_button = QPushButton("Run")
+        self.run_button.clicked.connect(self.toggle_run)
+        options_layout.addWidget(self.run_button)
+        layout.addLayout(options_layout)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        bottom_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        bottom_layout.addWidget(self.status_label, stretch=1)
+        self.save_button = QPushButton("Save Report...")
+        self.save_button.setEnabled(False)
+        self.save_button.clicked.connect(self.save_report)
+        bottom_layout.addWidget(self.save_button)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        buttons.rejected.connect(self.reject)
+        bottom_layout.addWidget(buttons)
+        layout.addLayout(bottom_layout)
+
+    def add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Check")
+        if folder:
+            self.roots_edit.appendPlainText(folder)
+
+    def toggle_run(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.run_button.setEnabled(False)
+            return
+        lines = [line.strip() for line in self.roots_edit.toPlainText().splitlines() if line.strip()]
+        self.roots = structify.batch.expand_roots(lines)
+        if not self.roots:
+            QMessageBox.warning(self, "Batch Compare", "No folders to check.")
+            return
+        self.reports = []
+        self.table.setRowCount(0)
+        self.save_button.setEnabled(False)
+        self.run_button.setText("Cancel")
+        self.status_label.setText(f"Checking {len(self.roots):,} folders...")
+        worker = BatchWorker(self.template_tree, self.roots, self.recursive, self.jobs_spin.value(),
+                             self.scan_filter, self.limit_spin.value(), self)
+        worker.report_ready.connect(self._add_report)
+        worker.failed.connect(lambda error: QMessageBox.critical(self, "Batch Compare", error))
+        worker.finished.connect(self._finish_run)
+        self.worker = worker
+        worker.start()
+
+    def _add_report(self, report):
+        self.reports.append(report)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        values = (report.root, report.status, f"{report.folders:,}", f"{report.missing:,}",
+                  f"{report.extra:,}", report.error or "; ".join(report.differences))
+        color = {structify.batch.DIFFERS: QColor("#ffe6e6"),
+                 structify.batch.FAILED: QColor("#f0f0f0")}.get(report.status)
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            if color is not None:
+                item.setBackground(color)
+            self.table.setItem(row, column, item)
+        self.status_label.setText(self._summary())
+
+    def _summary(self):
+        differs = sum(1 for r in self.reports if r.status == structify.batch.DIFFERS)
+        failed = sum(1 for r in self.reports if r.status == structify.batch.FAILED)
+        return (f"{len(self.reports):,} of {len(self.roots):,} checked: "
+                f"{len(self.reports) - differs - failed:,} match, {differs:,} differ, {failed:,} failed")
+
+    def _finish_run(self):
+        cancelled = self.worker._cancel.is_set()
+        self.worker.deleteLater()
+        self.worker = None
+        self.run_button.setText("Run")
+        self.run_button.setEnabled(True)
+        self.save_button.setEnabled(bool(self.reports))
+        self.status_label.setText(self._summary() + ("  (cancelled)" if cancelled else ""))
+
+    def save_report(self):
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Save Report", "", "CSV (*.csv);;JSON (*.json)")
+        if not path:
+            return
+        fmt = "json" if path.lower().endswith(".json") or selected.startswith("JSON") else "csv"
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                structify.batch.write_report(self.reports, f, fmt)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Saving the report failed:\n{e}")
+
+    def reject(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().reject()
+
+
+class TemplateDialog(QDialog):
+    EXAMPLE = ("# Example: one folder per day with 24 hour folders\n"
+               "{client}\n"
+               "  {day=2025-01-01..2025-12-31:%Y-%m-%d}\n"
+               "    {hour=0..23:02}\n"
+               "  @for dept in sales|hr\n"
+               "    {dept}\n")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Replicate Template")
+        self.resize(760, 560)
+        self.template = None
+        self.worker = None
+
+        layout = QVBoxLayout(self)
+        label = QLabel("Structure template")
+        label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(label)
+        layout.addWidget(QLabel(
+            "Indent two spaces per level. {name} or {name:03} inserts a variable, "
+            "{n=1..12:02} or {d=2025-01-01..2025-01-31} repeats a folder, "
+            "'@for x in a|b|c' repeats the block below it."))
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setFont(QFont("SF Mono", 12))
+        self.text_edit.setPlaceholderText(self.EXAMPLE)
+        self.text_edit.textChanged.connect(self._update_count)
+        layout.addWidget(self.text_edit)
+
+        vars_layout = QHBoxLayout()
+        vars_layout.addWidget(QLabel("Variables:"))
+        self.vars_edit = QLineEdit()
+        self.vars_edit.setPlaceholderText("client=ACME, year=2025")
+        vars_layout.addWidget(self.vars_edit)
+        layout.addLayout(vars_layout)
+
+        self.count_label = QLabel("")
+        layout.addWidget(self.count_label)
+
+        buttons_layout = QHBoxLayout()
+        btn_load = QPushButton("Load...")
+        btn_load.clicked.connect(self.load_template)
+        buttons_layout.addWidget(btn_load)
+        btn_save = QPushButton("Save...")
+        btn_save.clicked.connect(self.save_template)
+        buttons_layout.addWidget(btn_save)
+        buttons_layout.addStretch(1)
+        self.btn_replicate = QPushButton("Replicate...")
+        self.btn_replicate.setEnabled(False)
+        self.btn_replicate.clicked.connect(self.replicate)
+        buttons_layout.addWidget(self.btn_replicate)
+        btn_close = QPushButton("Close")
+        btn_close.clicked.connect(self.reject)
+        buttons_layout.addWidget(btn_close)
+        layout.addLayout(buttons_layout)
+
+    def _update_count(self):
+        # Templates are a handful of lines; parsing on every edit is cheap and
+        # counting never expands the folders
+        try:
+            self.template = structify.template.Template.from_text(self.text_edit.toPlainText())
+        except ValueError as e:
+            self.template = None
+            self.count_label.setText(f"Error: {e}")
+            self.btn_replicate.setEnabled(False)
+            return
+        count = self.template.count()
+        self.count_label.setText(f"Expands to {count:,} folders")
+        self.btn_replicate.setEnabled(count > 0 and self.worker is None)
+
+    def variables(self):
+        return structify.template.parse_variables(split_patterns(self.vars_edit.text()))
+
+    def load_template(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load Template", "",
+                                              "Templates (*.txt *.tpl);;All files (*.*)")
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.text_edit.setPlainText(f.read())
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Cannot load template:\n{e}")
+
+    def save_template(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Template", "",
+                                              "Templates (*.txt *.tpl);;All files (*.*)")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self.text_edit.toPlainText())
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Cannot save template:\n{e}")
+
+    def replicate(self):
+        if self.template is None:
+            return
+        try:
+            entries = self.template.expand(self.variables())
+        except ValueError as e:
+            QMessageBox.warning(self, "Template", str(e))
+            return
+        dest_folder = QFileDialog.getExistingDirectory(
+            self, "Select folder where you want to create the structure"
+        )
+        if not dest_folder:
+            return
+        # The expansion streams straight into the replication engine on the
+        # replicate worker
+        app = self.parent()
+        dry_run = app.dry_run_check.isChecked()
+        timings = app._begin_timings("replicate template", destination=dest_folder)
+        try:
+            journal = None if dry_run else app._open_journal(dest_folder)
+        except Exception as e:
+            app._end_timings(timings)
+            QMessageBox.critical(self, "Error", f"Failed to replicate:\n{str(e)}")
+            return
+        worker = ReplicateWorker(None, dest_folder, dry_run, journal, timings, app,
+                                 entries=entries)
+        worker.finished.connect(self._replicated)
+        self.worker = worker
+        self.btn_replicate.setEnabled(False)
+        self.count_label.setText(f"Replicating into {dest_folder}...")
+        app._start_replicate(worker, timings)
+
+    def _replicated(self):
+        self.worker = None
+        self._update_count()
+
+    def reject(self):
+        if self.worker is not None:
+            self.worker.wait()
+        super().reject()
+
+
+class SyncWorker(QThread):
+    # Plans a sync, or applies plan when one is given, off the GUI thread;
+    # the tree is a copy that the plan keeps until it is applied
+    def __init__(self, timings, tree=None, destination=None, extra_mode=None, scan_filter=None,
+                 plan=None, journal=None, parent=None):
+        super().__init__(parent)
+        self.timings = timings
+        self.tree = tree
+        self.destination = destination
+        self.extra_mode = extra_mode
+        self.scan_filter = scan_filter
+        self.plan = plan
+        self.journal = journal
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            if self.plan is None:
+                with self.timings.phase(DIFF):
+                    self.result = structify.sync.plan_sync(self.tree, self.destination,
+                                                           self.extra_mode,
+                                                           scan_filter=self.scan_filter)
+            else:
+                with self.timings.phase(MKDIR):
+                    self.result = structify.sync.apply_sync(self.plan, journal=self.journal)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if self.journal is not None:
+                self.journal.close()
+        self.tree = None
+
+
+class SyncDialog(QDialog):
+    # (label, structify.sync extra folder mode)
+    EXTRA_CHOICES = (("Keep them", "keep"), ("Remove them when empty", "remove"),
+                     ("Move the empty ones to a quarantine folder", "quarantine"))
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Sync Preview to Folder")
+        self.resize(900, 620)
+        self.plan = None
+        self.worker = None
+
+        layout = QVBoxLayout(self)
+        label = QLabel("Create only what the destination is missing")
+        label.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(label)
+
+        source_layout = QHBoxLayout()
+        source_layout.addWidget(QLabel("Preview:"))
+        self.left_radio = QRadioButton("Left")
+        self.right_radio = QRadioButton("Right")
+        self.right_radio.setChecked(True)
+        source_group = QButtonGroup(self)
+        for radio in (self.left_radio, self.right_radio):
+            source_group.addButton(radio)
+            radio.toggled.connect(self._invalidate)
+            source_layout.addWidget(radio)
+        source_layout.addStretch(1)
+        layout.addLayout(source_layout)
+
+        dest_layout = QHBoxLayout()
+        dest_layout.addWidget(QLabel("Destination:"))
+        self.dest_edit = QLineEdit()
+        self.dest_edit.textChanged.connect(self._invalidate)
+        dest_layout.addWidget(self.dest_edit, stretch=1)
+        btn_browse = QPushButton("Browse...")
+        btn_browse.clicked.connect(self.browse_dest)
+        dest_layout.addWidget(btn_browse)
+        layout.addLayout(dest_layout)
+
+        extra_layout = QHBoxLayout()
+        extra_layout.addWidget(QLabel("Folders the preview does not have:"))
+        self.extra_combo = QComboBox()
+        for text, mode in self.EXTRA_CHOICES:
+            self.extra_combo.addItem(text, mode)
+        self.extra_combo.currentIndexChanged.connect(self._invalidate)
+        extra_layout.addWidget(self.extra_combo)
+        extra_layout.addStretch(1)
+        layout.addLayout(extra_layout)
+
+        self.operations_view = QPlainTextEdit()
+        self.operations_view.setReadOnly(True)
+        self.operations_view.setFont(QFont("SF Mono", 12))
+        self.operations_view.setPlaceholderText("Plan the sync to see what it would do.")
+        layout.addWidget(self.operations_view)
+
+        buttons_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        buttons_layout.addWidget(self.status_label, stretch=1)
+        btn_plan = QPushButton("Plan")
+        btn_plan.clicked.connect(self.make_plan)
+        buttons_layout.addWidget(btn_plan)
+        self.btn_apply = QPushButton("Apply")
+        self.btn_apply.setEnabled(False)
+        self.btn_apply.clicked.connect(self.apply)
+        buttons_layout.addWidget(self.btn_apply)
+        btn_close = QPushButton("Close")
+        btn_close.clicked.connect(self.reject)
+        buttons_layout.addWidget(btn_close)
+        layout.addLayout(buttons_layout)
+        # Disabled while a plan or apply runs, so its settings stay put
+        self.controls = (self.left_radio, self.right_radio, self.dest_edit, btn_browse,
+                         self.extra_combo, btn_plan, btn_close)
+
+    def _prefix(self):
+        return "left" if self.left_radio.isChecked() else "right"
+
+    def _invalidate(self):
+        # A plan only holds for the settings it was made with
+        self.plan = None
+        self.btn_apply.setEnabled(False)
+
+    def browse_dest(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select the folder to sync",
+                                                  self.dest_edit.text())
+        if folder:
+            self.dest_edit.setText(folder)
+
+    def make_plan(self):
+        app = self.parent()
+        prefix = self._prefix()
+        tree = getattr(app, f"{prefix}_model").tree
+        if not tree:
+            QMessageBox.warning(self, "Sync", "The preview is empty.")
+            return
+        dest_folder = self.dest_edit.text().strip()
+        if not os.path.isdir(dest_folder):
+            QMessageBox.warning(self, "Sync", "Select an existing destination folder.")
+            return
+        timings = app._begin_timings(f"sync plan {prefix}", destination=dest_folder)
+        self._run(SyncWorker(timings, tree.copy(), dest_folder, self.extra_combo.currentData(),
+                             app._scan_filter(prefix), parent=self), self._planned,
+                  "Planning...")
+
+    def _run(self, worker, done, status):
+        worker.finished.connect(lambda: done(worker))
+        self.worker = worker
+        for control in self.controls:
+            control.setEnabled(False)
+        self.btn_apply.setEnabled(False)
+        self.status_label.setText(status)
+        worker.start()
+
+    def _finish_run(self, worker):
+        worker.deleteLater()
+        self.worker = None
+        for control in self.controls:
+            control.setEnabled(True)
+        self.status_label.setText("")
+
+    def _planned(self, worker):
+        self._finish_run(worker)
+        app = self.parent()
+        timings = worker.timings
+        if worker.error is not None:
+            app._end_timings(timings)
+            QMessageBox.critical(self, "Error", f"Planning the sync failed:\n{worker.error}")
+            return
+        plan = worker.result
+        timings.count("destination folders", plan.scanned)
+        app._end_timings(timings)
+        lines = []
+        for line in plan.operations():
+            if len(lines) == REPLICATE_DETAIL_LIMIT:
+                lines.append("...")
+                break
+            lines.append(line)
+        self.operations_view.setPlainText("\n".join([plan.summary(), ""] + lines))
+        self.plan = plan
+        self.btn_apply.setEnabled(not plan.empty)
+        if plan.empty:
+            self.status_label.setText("Only folders holding files differ." if plan.kept
+                                      else "Already in sync.")
+
+    def apply(self):
+        plan = self.plan
+        if plan is None:
+            return
+        if plan.clear:
+            verb = ("remove" if plan.extra_mode == structify.sync.REMOVE
+                    else "move to the quarantine folder")
+            text = (f"Create {plan.create_folders():,} folders and {verb} "
+                    f"{plan.clear_folders():,} empty folders the preview does not have?")
+            if plan.kept:
+                text += f"\n\n{len(plan.kept):,} folders that hold files stay where they are."
+            answer = QMessageBox.question(self, "Sync", text)
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        app = self.parent()
+        timings = app._begin_timings("sync", destination=plan.destination)
+        try:
+            # Created folders share the destination's journal, so Undo
+            # Replicate removes them again
+            journal = app._open_journal(plan.destination)
+        except Exception as e:
+            app._end_timings(timings)
+            QMessageBox.critical(self, "Error", f"Sync failed:\n{e}")
+            return
+        self._run(SyncWorker(timings, plan=plan, journal=journal, parent=self), self._applied,
+                  "Syncing...")
+
+    def _applied(self, worker):
+        self._finish_run(worker)
+        app = self.parent()
+        timings = worker.timings
+        if worker.error is not None:
+            app._end_timings(timings)
+            self.btn_apply.setEnabled(True)
+            QMessageBox.critical(self, "Error", f"Sync failed:\n{worker.error}")
+            return
+        result = worker.result
+        timings.count("failed", len(result.failed))
+        app._end_timings(timings)
+        self._invalidate()
+        details = [f"! {path}: {error}" for path, error in result.failed[:REPLICATE_DETAIL_LIMIT]]
+        self.operations_view.setPlainText("\n".join([result.summary(), ""] + details))
+        self.status_label.setText("Sync finished with errors." if result.failed
+                                  else "Sync finished.")
+
+    def reject(self):
+        if self.worker is not None:
+            self.worker.wait()
+        super().reject()
+
+
+class FolderStructureApp(QMainWindow):
+    PREVIEW_EDIT_TRIGGERS = (QAbstractItemView.EditTrigger.DoubleClicked
+                             | QAbstractItemView.EditTrigger.EditKeyPressed)
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Structify - Folder Structure Replicator")
+        self.resize(1440, 680)
+        self.setMinimumSize(QSize(1200, 580))
+        # Created by the first scan, which is also the first to need it
+        self.scan_cache = None
+        self.history_worker = None
+        # One preview replication at a time, so two never share a journal
+        self.replicate_worker = None
+        # Scan filter settings per root folder, saved with the last paths
+        self.scan_filters = {}
+        # Kept so the template text survives closing the dialog
+        self.template_dialog = None
+        self.sync_dialog = None
+        # Timings of recent operations, and the ExitStack of a running
+        # cProfile/tracemalloc capture (only one operation at a time)
+        self.timings_log = deque(maxlen=TIMINGS_LOG_SIZE)
+        self._capture = None
+        self._captured = None
+
+        if 'Fusion' in QStyleFactory.keys():
+            QApplication.setStyle('Fusion')
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.main_layout = QVBoxLayout(self.central_widget)
+        self.main_layout.setContentsMargins(16, 16, 16, 16)
+        self.main_layout.setSpacing(12)
+
+        panels_layout = QHBoxLayout()
+        panels_layout.setSpacing(16)
+        self.main_layout.addLayout(panels_layout, stretch=1)
+
+        # Left panel
+        self._setup_panel(panels_layout, "Source Folder 1", "left",
+                          self.scan_left, self.export_left, self.import_txt_left,
+                          self.browse_left_source)
+
+        # Right panel
+        self._setup_panel(panels_layout, "Source Folder 2", "right",
+                          self.scan_right, self.export_right, self.import_txt_right,
+                          self.browse_right_source)
+
+        # Bottom controls: only the three main action buttons in one row
+        bottom_layout = QHBoxLayout()
+        bottom_layout.setSpacing(40)
+        bottom_layout.setContentsMargins(0, 20, 0, 20)
+        bottom_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.main_layout.addLayout(bottom_layout)
+
+        btn_rep_left = QPushButton("Replicate Left Preview")
+        btn_rep_left.setStyleSheet("""
+            QPushButton {
+                background-color: #0066cc;
+                color: white;
+                font-weight: bold;
+                min-width: 220px;
+            }
+            QPushButton:hover { background-color: #0077e6; }
+            QPushButton:pressed { background-color: #0055b3; }
+        """)
+        btn_rep_left.setFixedHeight(48)
+        btn_rep_left.clicked.connect(self.replicate_left)
+        bottom_layout.addWidget(btn_rep_left)
+
+        btn_compare = QPushButton("Compare Structures")
+        btn_compare.setStyleSheet("""
+            QPushButton {
+                background-color: #4CAF50;
+                color: white;
+                font-weight: bold;
+                min-width: 220px;
+            }
+            QPushButton:hover { background-color: #66BB6A; }
+            QPushButton:pressed { background-color: #388E3C; }
+        """)
+        btn_compare.setFixedHeight(48)
+        btn_compare.clicked.connect(self.compare_previews)
+        bottom_layout.addWidget(btn_compare)
+
+        btn_batch = QPushButton("Batch Compare...")
+        btn_batch.setStyleSheet(btn_compare.styleSheet())
+        btn_batch.setFixedHeight(48)
+        btn_batch.clicked.connect(self.batch_compare)
+        bottom_layout.addWidget(btn_batch)
+
+        btn_rep_right = QPushButton("Replicate Right Preview")
+        btn_rep_right.setStyleSheet("""
+            QPushButton {
+                background-color: #0066cc;
+                color: white;
+                font-weight: bold;
+                min-width: 220px;
+            }
+            QPushButton:hover { background-color: #0077e6; }
+            QPushButton:pressed { background-color: #0055b3; }
+        """)
+        btn_rep_right.setFixedHeight(48)
+        btn_rep_right.clicked.connect(self.replicate_right)
+        bottom_layout.addWidget(btn_rep_right)
+        self.replicate_buttons = (btn_rep_left, btn_rep_right)
+
+        btn_template = QPushButton("Replicate Template...")
+        btn_template.setStyleSheet(btn_rep_right.styleSheet())
+        btn_template.setFixedHeight(48)
+        btn_template.clicked.connect(self.replicate_template)
+        bottom_layout.addWidget(btn_template)
+
+        btn_sync = QPushButton("Sync to Folder...")
+        btn_sync.setStyleSheet(btn_rep_right.styleSheet())
+        btn_sync.setFixedHeight(48)
+        btn_sync.clicked.connect(self.sync_to_folder)
+        bottom_layout.addWidget(btn_sync)
+
+        btn_undo = QPushButton("Undo Replicate...")
+        btn_undo.setStyleSheet(btn_rep_right.styleSheet())
+        btn_undo.setFixedHeight(48)
+        btn_undo.clicked.connect(self.undo_replicate)
+        bottom_layout.addWidget(btn_undo)
+
+        self.dry_run_check = QCheckBox("Dry run (only report what would be created)")
+        bottom_layout.addWidget(self.dry_run_check)
+
+        # Professional copyright notice at the very bottom
+        copyright_layout = QHBoxLayout()
+        copyright_layout.setContentsMargins(0, 10, 0, 10)
+        copyright_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        copyright_label = QLabel("Developed by Ivan Sicaja © 2026. All rights reserved.")
+        copyright_label.setStyleSheet("""
+            color: #666666;
+            font-size: 12px;
+            font-style: italic;
+        """)
+        copyright_layout.addWidget(copyright_label)
+
+        self.main_layout.addLayout(copyright_layout)
+
+        # Timings of the last operation; the full log can be saved as JSON
+        status_bar = self.statusBar()
+        self.timings_label = QLabel("")
+        self.timings_label.setStyleSheet("color: #666666; font-size: 12px;")
+        status_bar.addWidget(self.timings_label, 1)
+        self.profile_check = QCheckBox("Profile operations")
+        self.profile_check.setToolTip("Capture cProfile and tracemalloc data for each operation "
+                                      "(slower); included in Save Timings")
+        status_bar.addPermanentWidget(self.profile_check)
+        btn_save_timings = QPushButton("Save Timings...")
+        btn_save_timings.clicked.connect(self.save_timings)
+        status_bar.addPermanentWidget(btn_save_timings)
+
+        # Last used source paths and their filters are restored once the
+        # window is up, off the time to first paint
+        QTimer.singleShot(0, self._load_last_paths)
+
+    def _setup_panel(self, parent_layout, title_text, prefix, scan_cb, export_cb, import_cb, browse_source_cb):
+        layout = QVBoxLayout()
+        layout.setSpacing(12)
+        parent_layout.addLayout(layout, stretch=1)
+
+        title = QLabel(title_text)
+        title.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(title)
+
+        path_layout = QHBoxLayout()
+        path_layout.setSpacing(8)
+        path_label = QLabel("Source:")
+        path_label.setFixedWidth(70)
+        path_layout.addWidget(path_label)
+        edit = QLineEdit()
+        edit.setPlaceholderText("Select a folder...")
+        path_layout.addWidget(edit)
+        btn_browse = QPushButton("Browse")
+        btn_browse.setFixedWidth(90)
+        btn_browse.clicked.connect(browse_source_cb)
+        path_layout.addWidget(btn_browse)
+        layout.addLayout(path_layout)
+        setattr(self, f"{prefix}_path_edit", edit)
+
+        scan_mode_layout = QVBoxLayout()
+        scan_mode_layout.setSpacing(6)
+        radio_only_root = QRadioButton("Only direct subfolders (root level)")
+        radio_recursive = QRadioButton("All subfolders (recursive scan)")
+        radio_recursive.setChecked(True)
+        group = QButtonGroup(self)
+        group.addButton(radio_only_root)
+        group.addButton(radio_recursive)
+        scan_mode_layout.addWidget(radio_only_root)
+        scan_mode_layout.addWidget(radio_recursive)
+        layout.addLayout(scan_mode_layout)
+        setattr(self, f"{prefix}_radio_only_root", radio_only_root)
+        setattr(self, f"{prefix}_radio_recursive", radio_recursive)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setSpacing(8)
+        exclude_edit = QLineEdit()
+        exclude_edit.setPlaceholderText("Exclude: node_modules, .git, *.bak")
+        exclude_edit.setToolTip("Folders to skip, comma separated. Globs match folder names, "
+                                "patterns with '/' match the path below the root, re:... is a regex.")
+        include_edit = QLineEdit()
+        include_edit.setPlaceholderText("Include: all folders")
+        include_edit.setToolTip("Keep only matching folders, their subfolders and the folders leading to them.")
+        filter_layout.addWidget(exclude_edit)
+        filter_layout.addWidget(include_edit)
+        layout.addLayout(filter_layout)
+        setattr(self, f"{prefix}_exclude_edit", exclude_edit)
+        setattr(self, f"{prefix}_include_edit", include_edit)
+
+        options_layout = QHBoxLayout()
+        options_layout.setSpacing(8)
+        options_layout.addWidget(QLabel("Max depth:"))
+        depth_spin = QSpinBox()
+        depth_spin.setRange(0, 999)
+        depth_spin.setSpecialValueText("Unlimited")
+        options_layout.addWidget(depth_spin)
+        skip_hidden_check = QCheckBox("Skip hidden folders")
+        symlinks_check = QCheckBox("List symlinked folders")
+        options_layout.addWidget(skip_hidden_check)
+        options_layout.addWidget(symlinks_check)
+        stats_check = QCheckBox("File counts")
+        stats_check.setToolTip("Also count the files per folder (recursive scans only)")
+        options_layout.addWidget(stats_check)
+        sizes_check = QCheckBox("Sizes")
+        sizes_check.setToolTip("Also total the bytes and newest file per folder; "
+                               "reads the size of every file, so scans take longer")
+        sizes_check.setEnabled(False)
+        stats_check.toggled.connect(sizes_check.setEnabled)
+        options_layout.addWidget(sizes_check)
+        options_layout.addStretch(1)
+        layout.addLayout(options_layout)
+        setattr(self, f"{prefix}_depth_spin", depth_spin)
+        setattr(self, f"{prefix}_skip_hidden_check", skip_hidden_check)
+        setattr(self, f"{prefix}_symlinks_check", symlinks_check)
+        setattr(self, f"{prefix}_stats_check", stats_check)
+        setattr(self, f"{prefix}_sizes_check", sizes_check)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(10)
+        btn_scan = QPushButton("Scan")
+        btn_cancel = QPushButton("Cancel")
+        btn_export = QPushButton("Export Previewed TXT")
+        btn_import = QPushButton("Import TXT")
+        btn_scan.clicked.connect(scan_cb)
+        btn_cancel.clicked.connect(lambda: self._cancel_scan(prefix))
+        btn_cancel.setEnabled(False)
+        btn_export.clicked.connect(export_cb)
+        btn_import.clicked.connect(import_cb)
+        for btn in (btn_scan, btn_cancel, btn_export, btn_import):
+            btn.setFixedHeight(36)
+            btn_layout.addWidget(btn)
+        watch_check = QCheckBox("Watch")
+        watch_check.setToolTip("Keep the preview in sync with folders created, deleted or renamed on disk")
+        watch_check.toggled.connect(lambda checked: self._toggle_watch(prefix, checked))
+        btn_layout.addWidget(watch_check)
+        layout.addLayout(btn_layout)
+        setattr(self, f"{prefix}_watch_check", watch_check)
+        setattr(self, f"{prefix}_watcher", None)
+        setattr(self, f"{prefix}_watch_pending", [])
+        setattr(self, f"{prefix}_watch_changes", 0)
+        setattr(self, f"{prefix}_btn_scan", btn_scan)
+        setattr(self, f"{prefix}_btn_cancel", btn_cancel)
+        setattr(self, f"{prefix}_btn_export", btn_export)
+        setattr(self, f"{prefix}_btn_import", btn_import)
+
+        status_label = QLabel("")
+        status_label.setStyleSheet("color: #666666; font-size: 12px;")
+        layout.addWidget(status_label)
+        setattr(self, f"{prefix}_status_label", status_label)
+        setattr(self, f"{prefix}_scan_worker", None)
+        setattr(self, f"{prefix}_scan_timings", None)
+
+        preview_label = QLabel("Structure Preview (editable)")
+        preview_label.setStyleSheet("font-weight: bold; font-size: 13px;")
+        layout.addWidget(preview_label)
+
+        search_layout = QHBoxLayout()
+        search_layout.setSpacing(8)
+        search_edit = QLineEdit()
+        search_edit.setPlaceholderText(SEARCH_PLACEHOLDER)
+        search_edit.setClearButtonEnabled(True)
+        search_edit.setToolTip("Show only folders whose name matches, with the folders leading to them")
+        search_mode = QComboBox()
+        for label, mode in SEARCH_MODES:
+            search_mode.addItem(label, mode)
+        search_label = QLabel("")
+        search_label.setStyleSheet("color: #666666; font-size: 12px;")
+        search_timer = QTimer(self)
+        search_timer.setSingleShot(True)
+        search_timer.setInterval(SEARCH_DELAY_MS)
+        search_timer.timeout.connect(lambda: self._run_search(prefix))
+        search_edit.textChanged.connect(lambda _: search_timer.start())
+        search_edit.returnPressed.connect(lambda: self._run_search(prefix))
+        search_mode.currentIndexChanged.connect(lambda _: self._run_search(prefix))
+        search_layout.addWidget(search_edit, stretch=1)
+        search_layout.addWidget(search_mode)
+        search_layout.addWidget(search_label)
+        layout.addLayout(search_layout)
+        setattr(self, f"{prefix}_search_edit", search_edit)
+        setattr(self, f"{prefix}_search_mode", search_mode)
+        setattr(self, f"{prefix}_search_label", search_label)
+        setattr(self, f"{prefix}_search_timer", search_timer)
+        setattr(self, f"{prefix}_index_worker", None)
+
+        model = StructureModel(self)
+        preview = QTreeView()
+        preview.setModel(model)
+        preview.setHeaderHidden(True)
+        model.modelReset.connect(lambda: preview.setHeaderHidden(model.stats is None))
+        preview.setUniformRowHeights(True)
+        preview.setEditTriggers(self.PREVIEW_EDIT_TRIGGERS)
+        preview.setFont(QFont("SF Mono", 12))
+        preview.setStyleSheet("""
+            QTreeView {
+                background-color: #ffffff;
+                color: #000000;
+                border: 1px solid #d0d4d8;
+                border-radius: 6px;
+                padding: 8px;
+            }
+        """)
+        layout.addWidget(preview, stretch=1)
+        setattr(self, f"{prefix}_preview", preview)
+        setattr(self, f"{prefix}_model", model)
+
+        edit_layout = QHBoxLayout()
+        edit_layout.setSpacing(10)
+        btn_add = QPushButton("New Folder")
+        btn_add_sub = QPushButton("New Subfolder")
+        btn_delete = QPushButton("Delete")
+        btn_add.clicked.connect(lambda: self._add_folder(prefix, as_child=False))
+        btn_add_sub.clicked.connect(lambda: self._add_folder(prefix, as_child=True))
+        btn_delete.clicked.connect(lambda: self._delete_folder(prefix))
+        for btn in (btn_add, btn_add_sub, btn_delete):
+            btn.setFixedHeight(30)
+            edit_layout.addWidget(btn)
+        layout.addLayout(edit_layout)
+        setattr(self, f"{prefix}_edit_buttons", (btn_add, btn_add_sub, btn_delete))
+
+    def compare_previews(self):
+        left_tree = self.left_model.tree
+        right_tree = self.right_model.tree
+        if not left_tree and not right_tree:
+            QMessageBox.information(self, "Compare", "Both previews are empty.")
+            return
+        timings = self._begin_timings("compare", left=len(left_tree), right=len(right_tree))
+        dialog = ComparisonDialog(left_tree, right_tree, self, timings)
+        self._end_timings(timings)
+        dialog.exec()
+
+    def batch_compare(self):
+        if not self.left_model.tree:
+            QMessageBox.information(self, "Batch Compare",
+                                    "Scan or import the template structure into the Left preview first.")
+            return
+        recursive = self.left_radio_recursive.isChecked()
+        dialog = BatchCompareDialog(self.left_model.tree, recursive, self._scan_filter("left"), self)
+        dialog.exec()
+
+    def _write_export(self, tree, stats, path):
+        timings = self._begin_timings("export", path=path)
+        try:
+            with timings.phase(WRITE):
+                if stats is None:
+                    structify.textfile.write_structure(tree, path)
+                else:
+                    structify.textfile.write_entries(stats.annotated_entries(tree), path,
+                                                     stats.header)
+            timings.count("folders", len(tree))
+            timings.count("bytes written", os.path.getsize(path))
+        finally:
+            self._end_timings(timings)
+
+    def _safe_export(self, source_path, tree, stats=None):
+        if not tree:
+            QMessageBox.warning(self, "Nothing to export", "The preview is empty.")
+            return
+
+        txt_path = structify.textfile.export_path(source_path)
+
+        if not os.path.exists(txt_path):
+            try:
+                self._write_export(tree, stats, txt_path)
+                self._record_history(source_path, tree)
+                self._show_export_success(txt_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Export failed:\n{str(e)}")
+            return
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("File Already Exists")
+        msg.setIcon(QMessageBox.Icon.Question)
+        msg.setText(f"The file already exists:\n{txt_path}")
+        msg.setInformativeText("What would you like to do?")
+
+        overwrite_btn = msg.addButton("Overwrite", QMessageBox.ButtonRole.YesRole)
+        newfile_btn = msg.addButton("Create numbered copy", QMessageBox.ButtonRole.NoRole)
+        cancel_btn = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
+
+        msg.exec()
+
+        clicked = msg.clickedButton()
+
+        if clicked == overwrite_btn:
+            try:
+                self._write_export(tree, stats, txt_path)
+                self._record_history(source_path, tree)
+                self._show_export_success(txt_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Overwrite failed:\n{str(e)}")
+
+        elif clicked == newfile_btn:
+            new_path = structify.textfile.next_numbered_export_path(source_path)
+            try:
+                self._write_export(tree, stats, new_path)
+                self._record_history(source_path, tree)
+                self._show_export_success(new_path)
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Save failed:\n{str(e)}")
+
+    def _record_history(self, source_path, tree):
+        # Every export also lands in the snapshot history; the entries are
+        # copied here so later edits of the preview cannot race the store
+        if self.history_worker is not None:
+            self.history_worker.wait()
+        worker = HistoryWorker(structify.history.history_root(source_path),
+                               list(tree.iter_entries()), self)
+        worker.finished.connect(lambda: self._history_recorded(worker))
+        self.history_worker = worker
+        worker.start()
+
+    def _history_recorded(self, worker):
+        if self.history_worker is worker:
+            self.history_worker = None
+        worker.deleteLater()
+        if worker.error:
+            self.statusBar().showMessage(f"Could not add the export to the history: {worker.error}",
+                                         10000)
+        else:
+            snapshot = worker.snapshot
+            self.statusBar().showMessage(
+                f"Export saved to history as snapshot {snapshot.id} "
+                f"({snapshot.new_objects:,} new folder objects)", 10000)
+
+    def _show_export_success(self, txt_path):
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Export Successful")
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.setText("Current preview exported")
+        msg.setInformativeText(f"Location:\n{txt_path}")
+        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.ActionRole)
+        msg.exec()
+
+        if msg.clickedButton() == open_btn:
+            self._open_folder(os.path.dirname(txt_path))
+
+    def export_left(self):
+        path = self.left_path_edit.text().strip()
+        if not os.path.isdir(path):
+            QMessageBox.warning(self, "Error", "Invalid source folder.")
+            return
+        self._safe_export(path, self.left_model.tree, self.left_model.stats)
+
+    def export_right(self):
+        path = self.right_path_edit.text().strip()
+        if not os.path.isdir(path):
+            QMessageBox.warning(self, "Error", "Invalid source folder.")
+            return
+        self._safe_export(path, self.right_model.tree, self.right_model.stats)
+
+    # ── All other methods unchanged ────────────────────────────────────────
+    def browse_left_source(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Source Folder", self.left_path_edit.text())
+        if folder:
+            self.left_path_edit.setText(folder)
+            self._restore_scan_filter("left")
+
+    def scan_left(self):
+        self._start_scan("left")
+
+    def import_txt_left(self):
+        txt_file, _ = QFileDialog.getOpenFileName(
+            self, "Select structure file", "",
+            "Structure files (*.txt *.txt.gz *.txt.zst *.snap);;All files (*.*)"
+        )
+        if not txt_file:
+            return
+        self._import_structure("left", txt_file)
+
+    def replicate_left(self):
+        self._replicate("left")
+
+    def browse_right_source(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Source Folder", self.right_path_edit.text())
+        if folder:
+            self.right_path_edit.setText(folder)
+            self._restore_scan_filter("right")
+
+    def scan_right(self):
+        self._start_scan("right")
+
+    def import_txt_right(self):
+        txt_file, _ = QFileDialog.getOpenFileName(
+            self, "Select structure file", "",
+            "Structure files (*.txt *.txt.gz *.txt.zst *.snap);;All files (*.*)"
+        )
+        if not txt_file:
+            return
+        self._import_structure("right", txt_file)
+
+    def _import_structure(self, prefix, txt_file):
+        timings = self._begin_timings(f"import {prefix}", path=txt_file)
+        try:
+            with timings.phase(PARSE):
+                tree = structify.core.read_structure_file(txt_file)
+            getattr(self, f"{prefix}_watch_check").setChecked(False)
+            with timings.phase(BUILD):
+                getattr(self, f"{prefix}_model").set_tree(tree)
+            timings.count("folders", len(tree))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Cannot load structure file:\n{str(e)}")
+            return
+        finally:
+            self._end_timings(timings)
+        self._build_index(prefix)
+
+    def replicate_right(self):
+        self._replicate("right")
+
+    def _start_scan(self, prefix):
+        if getattr(self, f"{prefix}_scan_worker") is not None:
+            return
+        path = getattr(self, f"{prefix}_path_edit").text().strip()
+        if not os.path.isdir(path):
+            QMessageBox.warning(self, "Error", "Selected source path is not a valid folder.")
+            return
+        watcher = getattr(self, f"{prefix}_watcher")
+        if watcher is not None and os.path.abspath(watcher.root_path) != os.path.abspath(path):
+            getattr(self, f"{prefix}_watch_check").setChecked(False)
+        recursive = getattr(self, f"{prefix}_radio_recursive").isChecked()
+        scan_filter = self._scan_filter(prefix)
+        self._remember_scan_filter(path, scan_filter)
+        collect_stats = recursive and getattr(self, f"{prefix}_stats_check").isChecked()
+        sizes = getattr(self, f"{prefix}_sizes_check").isChecked()
+        stats = structify.stats.FolderStats(sizes) if collect_stats else None
+        getattr(self, f"{prefix}_model").set_tree(StructureTree(), stats)
+        self._set_panel_editable(prefix, False)
+        getattr(self, f"{prefix}_btn_scan").setEnabled(False)
+        getattr(self, f"{prefix}_btn_cancel").setEnabled(True)
+        getattr(self, f"{prefix}_status_label").setText("Scanning...")
+        getattr(self, f"{prefix}_search_label").setText("")
+
+        timings = self._begin_timings(f"scan {prefix}", root=path, recursive=recursive,
+                                      stats=collect_stats, sizes=collect_stats and sizes)
+        setattr(self, f"{prefix}_scan_timings", timings)
+        if self.scan_cache is None:
+            self.scan_cache = structify.scan_cache.ScanCache(SCAN_CACHE_DIR)
+        worker = ScanWorker(path, recursive, self.scan_cache, scan_filter, collect_stats, sizes,
+                            self)
+        worker.entries_ready.connect(lambda entries: self._append_scan_entries(prefix, entries))
+        worker.progress.connect(lambda count, rate: self._show_scan_progress(prefix, count, rate))
+        worker.failed.connect(
+            lambda error: QMessageBox.critical(self, "Error", f"Cannot read structure:\n{error}")
+        )
+        worker.finished.connect(lambda: self._finish_scan(prefix))
+        setattr(self, f"{prefix}_scan_worker", worker)
+        worker.start()
+
+    def _append_scan_entries(self, prefix, entries):
+        with getattr(self, f"{prefix}_scan_timings").phase(BUILD):
+            getattr(self, f"{prefix}_model").append_entries(entries)
+
+    def _scan_filter(self, prefix):
+        return ScanFilter(
+            split_patterns(getattr(self, f"{prefix}_include_edit").text()),
+            split_patterns(getattr(self, f"{prefix}_exclude_edit").text()),
+            getattr(self, f"{prefix}_depth_spin").value() or None,
+            getattr(self, f"{prefix}_skip_hidden_check").isChecked(),
+            getattr(self, f"{prefix}_symlinks_check").isChecked(),
+        )
+
+    def _remember_scan_filter(self, path, scan_filter):
+        key = structify.scan_cache.root_key(path)
+        if scan_filter.active:
+            self.scan_filters[key] = scan_filter.to_dict()
+        else:
+            self.scan_filters.pop(key, None)
+
+    def _restore_scan_filter(self, prefix):
+        path = getattr(self, f"{prefix}_path_edit").text().strip()
+        key = structify.scan_cache.root_key(path)
+        scan_filter = ScanFilter.from_dict(self.scan_filters.get(key, {}))
+        getattr(self, f"{prefix}_include_edit").setText(", ".join(scan_filter.include))
+        getattr(self, f"{prefix}_exclude_edit").setText(", ".join(scan_filter.exclude))
+        getattr(self, f"{prefix}_depth_spin").setValue(scan_filter.max_depth or 0)
+        getattr(self, f"{prefix}_skip_hidden_check").setChecked(scan_filter.skip_hidden)
+        getattr(self, f"{prefix}_symlinks_check").setChecked(scan_filter.include_symlinks)
+
+    def _set_panel_editable(self, prefix, editable):
+        triggers = self.PREVIEW_EDIT_TRIGGERS if editable else QAbstractItemView.EditTrigger.NoEditTriggers
+        getattr(self, f"{prefix}_preview").setEditTriggers(triggers)
+        for btn in getattr(self, f"{prefix}_edit_buttons"):
+            btn.setEnabled(editable)
+
+    def _add_folder(self, prefix, as_child):
+        preview = getattr(self, f"{prefix}_preview")
+        model = getattr(self, f"{prefix}_model")
+        current = preview.currentIndex()
+        if as_child and current.isValid():
+            parent, row = current, model.rowCount(current)
+            preview.expand(current)
+        elif current.isValid():
+            parent, row = current.parent(), current.row() + 1
+        else:
+            parent, row = QModelIndex(), model.rowCount()
+        index = model.insert_folder(parent, row)
+        preview.setCurrentIndex(index)
+        preview.edit(index)
+
+    def _delete_folder(self, prefix):
+        current = getattr(self, f"{prefix}_preview").currentIndex()
+        if current.isValid():
+            getattr(self, f"{prefix}_model").remove_folder(current)
+
+    def _show_scan_progress(self, prefix, count, rate):
+        getattr(self, f"{prefix}_status_label").setText(
+            f"Scanning... {count:,} folders ({rate:,.0f} folders/s)"
+        )
+
+    def _cancel_scan(self, prefix):
+        worker = getattr(self, f"{prefix}_scan_worker")
+        if worker is not None:
+            worker.cancel()
+            # A partial preview cannot be kept in sync
+            getattr(self, f"{prefix}_watch_check").setChecked(False)
+
+    def _toggle_watch(self, prefix, checked):
+        if checked:
+            self._start_watch(prefix)
+        else:
+            self._stop_watch(prefix)
+
+    def _start_watch(self, prefix):
+        if getattr(self, f"{prefix}_watcher") is not None:
+            return
+        path = getattr(self, f"{prefix}_path_edit").text().strip()
+        if not os.path.isdir(path):
+            QMessageBox.warning(self, "Error", "Selected source path is not a valid folder.")
+            getattr(self, f"{prefix}_watch_check").setChecked(False)
+            return
+        relay = WatchRelay(self)
+        relay.events_ready.connect(lambda events: self._apply_watch_events(prefix, events))
+        recursive = getattr(self, f"{prefix}_radio_recursive").isChecked()
+        watcher = structify.watch.FolderWatcher(path, relay.events_ready.emit, recursive,
+                                                scan_filter=self._scan_filter(prefix))
+        watcher.relay = relay
+        setattr(self, f"{prefix}_watcher", watcher)
+        setattr(self, f"{prefix}_watch_pending", [])
+        setattr(self, f"{prefix}_watch_changes", 0)
+        watcher.start()
+        # Rescan for a fresh baseline; batches arriving meanwhile are held
+        # back until the scan has finished.
+        self._start_scan(prefix)
+
+    def _stop_watch(self, prefix):
+        watcher = getattr(self, f"{prefix}_watcher")
+        if watcher is None:
+            return
+        setattr(self, f"{prefix}_watcher", None)
+        setattr(self, f"{prefix}_watch_pending", [])
+        watcher.stop()
+        watcher.relay.deleteLater()
+
+    def _apply_watch_events(self, prefix, events):
+        watcher = getattr(self, f"{prefix}_watcher")
+        if watcher is None:
+            return
+        if getattr(self, f"{prefix}_scan_worker") is not None:
+            getattr(self, f"{prefix}_watch_pending").extend(events)
+            return
+        if any(event[0] == structify.watch.RESCAN for event in events):
+            if os.path.isdir(watcher.root_path):
+                self._start_scan(prefix)
+            else:
+                getattr(self, f"{prefix}_watch_check").setChecked(False)
+                getattr(self, f"{prefix}_status_label").setText("Watched folder is no longer available")
+            return
+        model = getattr(self, f"{prefix}_model")
+        applied = structify.watch.apply_events(model.tree, events, model, watcher.scan_filter)
+        changes = getattr(self, f"{prefix}_watch_changes") + applied
+        setattr(self, f"{prefix}_watch_changes", changes)
+        getattr(self, f"{prefix}_status_label").setText(
+            f"Watching ({watcher.method}): {len(model.tree):,} folders, {changes:,} changes applied"
+        )
+
+    def _finish_scan(self, prefix):
+        worker = getattr(self, f"{prefix}_scan_worker")
+        setattr(self, f"{prefix}_scan_worker", None)
+        self._set_panel_editable(prefix, True)
+        getattr(self, f"{prefix}_btn_scan").setEnabled(True)
+        getattr(self, f"{prefix}_btn_cancel").setEnabled(False)
+        if worker.is_cancelled():
+            status = f"Cancelled after {worker.count:,} folders"
+        else:
+            status = f"{worker.count:,} folders in {worker.elapsed:.2f} s"
+            if worker.stats.cached:
+                status += (f" (incremental: {worker.stats.listed:,} re-listed, "
+                           f"{worker.stats.reused:,} unchanged)")
+        getattr(self, f"{prefix}_status_label").setText(status)
+        timings = getattr(self, f"{prefix}_scan_timings")
+        setattr(self, f"{prefix}_scan_timings", None)
+        with timings.phase(BUILD):
+            getattr(self, f"{prefix}_model").refresh_stats()
+        # The walk runs on the worker thread, so it is taken from there as a whole
+        timings.add(WALK, worker.elapsed)
+        timings.count("folders", worker.count)
+        if worker.stats.cached:
+            timings.count("re-listed", worker.stats.listed)
+            timings.count("unchanged", worker.stats.reused)
+        self._end_timings(timings)
+        worker.deleteLater()
+        self._build_index(prefix)
+        pending = getattr(self, f"{prefix}_watch_pending")
+        if pending and getattr(self, f"{prefix}_watcher") is not None:
+            setattr(self, f"{prefix}_watch_pending", [])
+            self._apply_watch_events(prefix, pending)
+
+    def _build_index(self, prefix):
+        # A running build notices when it went stale and starts over itself
+        if getattr(self, f"{prefix}_index_worker") is not None:
+            return
+        model = getattr(self, f"{prefix}_model")
+        worker = IndexWorker(model.tree, model.edits, self)
+        worker.finished.connect(lambda: self._index_ready(prefix))
+        setattr(self, f"{prefix}_index_worker", worker)
+        getattr(self, f"{prefix}_search_edit").setPlaceholderText("Indexing folder names...")
+        if getattr(self, f"{prefix}_search_edit").text().strip():
+            getattr(self, f"{prefix}_search_label").setText("Indexing...")
+        worker.start()
+
+    def _index_ready(self, prefix):
+        worker = getattr(self, f"{prefix}_index_worker")
+        setattr(self, f"{prefix}_index_worker", None)
+        worker.deleteLater()
+        model = getattr(self, f"{prefix}_model")
+        if worker.tree is model.tree and worker.edits == model.edits:
+            model.name_index = worker.index
+            getattr(self, f"{prefix}_search_edit").setPlaceholderText(SEARCH_PLACEHOLDER)
+            if getattr(self, f"{prefix}_search_edit").text().strip():
+                self._run_search(prefix)
+        elif getattr(self, f"{prefix}_scan_worker") is None:
+            # Edited or replaced while indexing; a running scan rebuilds when done
+            self._build_index(prefix)
+
+    def _run_search(self, prefix):
+        getattr(self, f"{prefix}_search_timer").stop()
+        model = getattr(self, f"{prefix}_model")
+        label = getattr(self, f"{prefix}_search_label")
+        query = getattr(self, f"{prefix}_search_edit").text().strip()
+        if not query:
+            if model.visible is not None:
+                model.set_filter(None)
+            label.setText("")
+            return
+        if model.name_index is None:
+            # Searched once the index is ready
+            if getattr(self, f"{prefix}_scan_worker") is None:
+                self._build_index(prefix)
+            label.setText("Indexing...")
+            return
+        start = time.perf_counter()
+        nodes = model.name_index.search(query, getattr(self, f"{prefix}_search_mode").currentData())
+        elapsed = time.perf_counter() - start
+        model.set_filter(nodes)
+        if len(nodes) <= SEARCH_EXPAND_LIMIT:
+            getattr(self, f"{prefix}_preview").expandAll()
+        label.setText(f"{len(nodes):,} matches in {elapsed * 1000:.0f} ms")
+
+    def _open_folder(self, path):
+        if sys.platform == "win32":
+            os.startfile(path)
+            return
+        import subprocess
+        subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path])
+
+    def create_from_lines(self, path, lines):
+        return self.create_from_tree(path, StructureTree.from_lines(lines))
+
+    def create_from_tree(self, path, tree, dry_run=False, journal=None):
+        return structify.replicate.replicate_tree(tree, path, dry_run=dry_run, journal=journal)
+
+    def _open_journal(self, dest_folder):
+        # Every destination has its own journal, so replicating into a
+        # folder again resumes a replication that was interrupted there
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        journal = structify.journal
+        return journal.ReplicationJournal(journal.journal_path_for(JOURNAL_DIR, dest_folder),
+                                          dest_folder)
+
+    def _replicate(self, prefix):
+        tree = getattr(self, f"{prefix}_model").tree
+        if not tree:
+            QMessageBox.warning(self, "Error", "No structure in preview to replicate.")
+            return
+        dest_folder = QFileDialog.getExistingDirectory(
+            self, "Select folder where you want to create the structure"
+        )
+        if not dest_folder:
+            return
+        if not os.path.isdir(dest_folder):
+            QMessageBox.warning(self, "Error", "Selected path is not a valid folder.")
+            return
+        dry_run = self.dry_run_check.isChecked()
+        timings = self._begin_timings(f"replicate {prefix}", destination=dest_folder)
+        try:
+            journal = None if dry_run else self._open_journal(dest_folder)
+        except Exception as e:
+            self._end_timings(timings)
+            QMessageBox.critical(self, "Error", f"Failed to replicate:\n{str(e)}")
+            return
+        self._start_replicate(ReplicateWorker(tree.copy(), dest_folder, dry_run, journal, timings,
+                                              self), timings)
+
+    def _start_replicate(self, worker, timings):
+        worker.finished.connect(lambda: self._replicated(worker, timings))
+        self.replicate_worker = worker
+        for btn in self.replicate_buttons:
+            btn.setEnabled(False)
+        self.timings_label.setText(f"Replicating into {worker.destination}...")
+        worker.start()
+
+    def _replicated(self, worker, timings):
+        self.replicate_worker = None
+        for btn in self.replicate_buttons:
+            btn.setEnabled(True)
+        if worker.error is None:
+            self._count_replication(timings, worker.result)
+        self._end_timings(timings)
+        if worker.error is not None:
+            QMessageBox.critical(self, "Error", f"Failed to replicate:\n{worker.error}")
+            return
+        self._show_replication_result(worker.result)
+
+    def _begin_timings(self, operation, **info):
+        timings = Timings(operation, **info)
+        if self.profile_check.isChecked() and self._capture is None:
+            # cProfile sees the GUI thread: model building, rendering, dialogs
+            self._capture = ExitStack()
+            self._capture.enter_context(profiled(timings, profile=True, trace_memory=True))
+            self._captured = timings
+        return timings
+
+    def _end_timings(self, timings):
+        if self._captured is timings:
+            self._capture.close()
+            self._capture = None
+            self._captured = None
+        timings.finish()
+        self.timings_log.append(timings)
+        self.timings_label.setText(timings.summary())
+
+    @staticmethod
+    def _count_replication(timings, result):
+        timings.count("mkdir" if not result.dry_run else "stat",
+                      result.created + result.existing + len(result.failed))
+        timings.count("failed", len(result.failed))
+
+    def save_timings(self):
+        if not self.timings_log:
+            QMessageBox.information(self, "Timings", "No operation has been timed yet.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Timings", "structify_timings.json",
+                                              "JSON (*.json)")
+        if not path:
+            return
+        try:
+            dump_timings(list(self.timings_log), path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Saving timings failed:\n{e}")
+
+    def replicate_template(self):
+        if self.template_dialog is None:
+            self.template_dialog = TemplateDialog(self)
+        self.template_dialog.exec()
+
+    def sync_to_folder(self):
+        if self.sync_dialog is None:
+            self.sync_dialog = SyncDialog(self)
+        self.sync_dialog.exec()
+
+    def undo_replicate(self):
+        dest_folder = QFileDialog.getExistingDirectory(
+            self, "Select the folder a structure was replicated into"
+        )
+        if not dest_folder:
+            return
+        path = structify.journal.journal_path_for(JOURNAL_DIR, dest_folder)
+        if not os.path.exists(path):
+            QMessageBox.information(self, "Undo Replicate",
+                                    "No replication into this folder has been recorded.")
+            return
+        try:
+            created = len(structify.journal.read_journal(path)[3])
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", f"Reading the replication journal failed:\n{e}")
+            return
+        answer = QMessageBox.question(
+            self, "Undo Replicate",
+            f"Remove the {created:,} folders the last replication created in\n{dest_folder}?\n\n"
+            "Folders that are no longer empty are kept."
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+        timings = self._begin_timings("rollback", destination=dest_folder)
+        try:
+            with timings.phase(RMDIR):
+                result = structify.journal.rollback(path)
+        except (OSError, ValueError) as e:
+            self._end_timings(timings)
+            QMessageBox.critical(self, "Error", f"Undo failed:\n{e}")
+            return
+        timings.count("folders", result.removed + result.missing + len(result.failed))
+        timings.count("failed", len(result.failed))
+        self._end_timings(timings)
+        self._show_rollback_result(result)
+
+    def _show_rollback_result(self, result):
+        msg = QMessageBox(self)
+        if result.failed:
+            msg.setWindowTitle("Undo Finished With Errors")
+            msg.setText("Some folders could not be removed. Undo again once they are empty.")
+            msg.setIcon(QMessageBox.Icon.Warning)
+            msg.setDetailedText("\n".join(f"! {path}: {error}" for path, error
+                                          in result.failed[:REPLICATE_DETAIL_LIMIT]))
+        else:
+            msg.setWindowTitle("Undo Successful")
+            msg.setText("The replicated folders were removed.")
+            msg.setIcon(QMessageBox.Icon.Information)
+        msg.setInformativeText(f"Destination:\n{result.destination}\n\n{result.summary()}")
+        msg.exec()
+
+    def _show_replication_result(self, result):
+        msg = QMessageBox(self)
+        if result.dry_run:
+            msg.setWindowTitle("Replication Dry Run")
+            msg.setText("Nothing was created. This is what replication would do.")
+            details = [f"+ {path}" for path in result.planned[:REPLICATE_DETAIL_LIMIT]]
+        elif result.failed:
+            msg.setWindowTitle("Replication Finished With Errors")
+            msg.setText("Some folders could not be created. Replicate into the same folder "
+                        "again to resume.")
+            details = []
+        else:
+            msg.setWindowTitle("Replication Successful")
+            msg.setText("Folder structure replicated.")
+            details = []
+        msg.setIcon(QMessageBox.Icon.Warning if result.failed else QMessageBox.Icon.Information)
+        msg.setInformativeText(f"Destination:\n{result.destination}\n\n{result.summary()}")
+        details += [f"! {path}: {error}" for path, error in result.failed[:REPLICATE_DETAIL_LIMIT]]
+        if details:
+            msg.setDetailedText("\n".join(details))
+        msg.setStandardButtons(QMessageBox.StandardButton.Ok)
+        open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.ActionRole)
+        msg.exec()
+        if msg.clickedButton() == open_btn:
+            self._open_folder(result.destination)
+
+    def _load_last_paths(self):
+        try:
+            if os.path.exists(LAST_PATHS_FILE):
+                with open(LAST_PATHS_FILE, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.scan_filters = data.get("filters", {})
+                if "left" in data and os.path.isdir(data["left"]):
+                    self.left_path_edit.setText(data["left"])
+                    self._restore_scan_filter("left")
+                if "right" in data and os.path.isdir(data["right"]):
+                    self.right_path_edit.setText(data["right"])
+                    self._restore_scan_filter("right")
+        except:
+            pass
+
+    def closeEvent(self, event):
+        for prefix in ("left", "right"):
+            self._stop_watch(prefix)
+            worker = getattr(self, f"{prefix}_scan_worker")
+            if worker is not None:
+                worker.cancel()
+                worker.wait()
+            worker = getattr(self, f"{prefix}_index_worker")
+            if worker is not None:
+                worker.wait()
+        if self.history_worker is not None:
+            self.history_worker.wait()
+        if self.replicate_worker is not None:
+            self.replicate_worker.wait()
+        paths = {
+            "left": self.left_path_edit.text().strip(),
+            "right": self.right_path_edit.text().strip(),
+            "filters": self.scan_filters,
+        }
+        try:
+            with open(LAST_PATHS_FILE, "w", encoding="utf-8") as f:
+                json.dump(paths, f, indent=2)
+        except:
+            pass
+        super().closeEvent(event)
+
+
+def main():
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+    window = FolderStructureApp()
+    window.show()
+    sys.exit(app.exec())
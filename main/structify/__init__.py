@@ -0,0 +1,38 @@
+# Public names and submodules are imported on first use, so "import
+# structify" (and every submodule import, which runs this file first) stays
+# cheap for the CLI and the GUI's startup
+_EXPORTS = {
+    "get_folder_structure": "scanner", "walk_structure": "scanner",
+    "StructureTree": "tree", "ScanFilter": "filters", "diff_trees": "diff",
+    "batch_compare": "batch", "replicate_tree": "replicate", "replicate_entries": "replicate",
+    "Template": "template",
+    "read_structure": "textfile", "write_structure": "textfile",
+    "Snapshot": "snapshot", "read_snapshot": "snapshot", "write_snapshot": "snapshot",
+    "scan_tree": "core", "load_structure": "core", "export_structure": "core",
+}
+
+_SUBMODULES = frozenset((
+    "batch", "cli", "core", "diff", "extsort", "filters", "history", "journal", "multiscan",
+    "profiling", "replicate", "scan_cache", "scanner", "search", "snapshot", "stats", "sync",
+    "template", "textfile", "tree", "watch",
+))
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    from importlib import import_module
+    if name in _SUBMODULES:
+        # structify.<module> works without importing it first; the import
+        # system stores the module here, so this runs once per module
+        return import_module(f".{name}", __name__)
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'structify' has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
@@ -0,0 +1,173 @@
+import csv
+import glob
+import heapq
+import json
+import os
+
+from .core import scan_tree
+from .diff import diff_trees, format_path, subtree_hashes
+from .filters import ScanFilter
+
+DEFAULT_JOBS = os.cpu_count() or 4
+# Threads per root scan; the parallelism comes from the process pool
+DEFAULT_SCAN_WORKERS = 4
+DEFAULT_LIMIT = 10
+
+MATCH = "match"
+DIFFERS = "differs"
+FAILED = "error"
+
+REPORT_FIELDS = ("root", "status", "folders", "missing", "extra", "differences", "error")
+
+
+class RootReport:
+    def __init__(self, root, status, folders=0, missing=0, extra=0, differences=(), error=""):
+        self.root = root
+        self.status = status
+        self.folders = folders
+        # Folders of the template absent from the root, and folders of the
+        # root absent from the template
+        self.missing = missing
+        self.extra = extra
+        # First differences by path: "-a/b" missing, "+a/c" extra
+        self.differences = list(differences)
+        self.error = error
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in REPORT_FIELDS}
+
+
+class TemplateIndex:
+    """Reference structure with its subtree hashes computed once.
+
+    Roots that conform end the diff at the root hash; the others only
+    descend into differing subtrees. The hashes build on hash() of the
+    names, which is salted per process, so every worker process builds its
+    own index from the pickled template.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.hashes = subtree_hashes(tree)
+
+    def check(self, root, tree, limit=DEFAULT_LIMIT):
+        diff = diff_trees(self.tree, tree, detect_moves=False, left_hashes=self.hashes)
+        if diff.identical:
+            return RootReport(root, MATCH, len(tree))
+        changes = [(path, "-") for path, _ in diff.removed]
+        changes.extend((path, "+") for path, _ in diff.added)
+        first = heapq.nsmallest(limit, changes)
+        return RootReport(root, DIFFERS, len(tree), diff.removed_folders(), diff.added_folders(),
+                          [sign + format_path(path) for path, sign in first])
+
+
+def expand_roots(patterns):
+    """Folders named by patterns, in order and without duplicates.
+
+    Glob patterns expand to the folders they match; plain entries are kept
+    as given so that a missing folder shows up as an error in the report.
+    """
+    seen = set()
+    roots = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = [path for path in sorted(glob.glob(pattern)) if os.path.isdir(path)]
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                roots.append(path)
+    return roots
+
+
+def read_root_list(f):
+    # One folder or glob per line; blank lines and "#" comments are skipped
+    return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _check_root(index, root, recursive, workers, scan_filter, limit):
+    if not os.path.isdir(root):
+        return RootReport(root, FAILED, error="not a folder")
+    try:
+        tree = scan_tree(root, recursive, workers, scan_filter=scan_filter)
+    except OSError as e:
+        return RootReport(root, FAILED, error=e.strerror or str(e))
+    return index.check(root, tree, limit)
+
+
+_worker = None
+
+
+def _init_worker(template, recursive, workers, filter_dict, limit):
+    global _worker
+    scan_filter = ScanFilter.from_dict(filter_dict) if filter_dict else None
+    _worker = (TemplateIndex(template), recursive, workers, scan_filter, limit)
+
+
+def _check_in_worker(root):
+    index, recursive, workers, scan_filter, limit = _worker
+    return _check_root(index, root, recursive, workers, scan_filter, limit)
+
+
+def batch_compare(template, roots, recursive=True, jobs=DEFAULT_JOBS,
+                  workers=DEFAULT_SCAN_WORKERS, scan_filter=None, limit=DEFAULT_LIMIT,
+                  cancel=None, mp_context=None):
+    """Yield a RootReport for every root, in the order of roots.
+
+    Roots are scanned and diffed against the template in a pool of jobs
+    processes; each process receives the template once and returns only
+    the compact report, never the scanned tree. The cancel event stops
+    handing out further roots.
+    """
+    roots = list(roots)
+    if jobs <= 1 or len(roots) <= 1:
+        index = TemplateIndex(template)
+        for root in roots:
+            if cancel is not None and cancel.is_set():
+                return
+            yield _check_root(index, root, recursive, workers, scan_filter, limit)
+        return
+    # concurrent.futures pulls in logging; keep it off the CLI startup path
+    from concurrent.futures import ProcessPoolExecutor
+
+    filter_dict = scan_filter.to_dict() if scan_filter is not None and scan_filter.active else None
+    with ProcessPoolExecutor(min(jobs, len(roots)), mp_context=mp_context,
+                             initializer=_init_worker,
+                             initargs=(template, recursive, workers, filter_dict, limit)) as pool:
+        futures = [pool.submit(_check_in_worker, root) for root in roots]
+        try:
+            for future in futures:
+                if cancel is not None and cancel.is_set():
+                    return
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def write_report(reports, f, fmt="csv"):
+    """Stream reports to an open text file as CSV or a JSON array.
+
+    Every row is flushed as soon as its root is done. Returns the number of
+    roots per status.
+    """
+    counts = {MATCH: 0, DIFFERS: 0, FAILED: 0}
+    if fmt == "csv":
+        writer = csv.writer(f)
+        writer.writerow(REPORT_FIELDS)
+    else:
+        f.write("[")
+    for report in reports:
+        if fmt == "csv":
+            row = report.to_dict()
+            row["differences"] = "; ".join(report.differences)
+            writer.writerow([row[field] for field in REPORT_FIELDS])
+        else:
+            f.write(",\n " if sum(counts.values()) else "\n ")
+            f.write(json.dumps(report.to_dict(), ensure_ascii=False))
+        counts[report.status] += 1
+        f.flush()
+    if fmt != "csv":
+        f.write("\n]\n")
+    return counts
@@ -0,0 +1,719 @@
+import argparse
+import os
+import sys
+
+from .batch import DEFAULT_JOBS, DEFAULT_LIMIT, DEFAULT_SCAN_WORKERS
+from .core import (export_entries, iter_structure_file, load_structure, read_structure_file,
+                   scan_entries, scan_tree_stats, structure_entries, write_structure_file)
+from .extsort import DEFAULT_MEMORY_LIMIT
+from .filters import ScanFilter
+from .multiscan import DEFAULT_PER_ROOT
+from .profiling import (BUILD, DIFF, MKDIR, PARSE, RMDIR, WALK, WRITE, Timings, dump_timings,
+                        profiled)
+from .snapshot import SNAPSHOT_SUFFIX
+from .stats import STATS_COUNTS, STATS_SIZES
+from .sync import EXTRA_MODES, KEEP
+from .scanner import DEFAULT_WORKERS
+from .textfile import open_text, write_entries_to
+
+
+def _open_output(path):
+    if path in (None, "-"):
+        return sys.stdout, False
+    return open_text(path, "w"), True
+
+
+def _scan_filter(args):
+    return ScanFilter(args.include, args.exclude, args.max_depth, args.skip_hidden,
+                      args.include_symlinks)
+
+
+def _scan_cache(args):
+    if not args.cache_dir:
+        return None
+    from .scan_cache import ScanCache
+    return ScanCache(args.cache_dir)
+
+
+def _scan_for_output(args):
+    # (entries, header) to write; with --stats every line carries the
+    # file totals of its subtree, which needs the whole tree first
+    timings = args.timings
+    if not args.stats:
+        entries = scan_entries(args.root, not args.root_only, args.workers,
+                               cache=_scan_cache(args), scan_filter=_scan_filter(args))
+        return timings.iterate(entries, WALK, "folders"), None
+    if args.root_only:
+        raise SystemExit("structify: --stats needs a recursive scan")
+    with timings.phase(WALK):
+        tree, stats = scan_tree_stats(args.root, args.workers, scan_filter=_scan_filter(args),
+                                      sizes=args.stats == STATS_SIZES)
+    timings.count("folders", len(tree))
+    return stats.annotated_entries(tree), stats.header
+
+
+def _load(args, source, scan_filter):
+    with args.timings.phase(WALK if os.path.isdir(source) else PARSE):
+        tree = load_structure(source, not args.root_only, args.workers, scan_filter=scan_filter)
+    args.timings.count("folders", len(tree))
+    return tree
+
+
+def _count_written(args, path):
+    if args.timings.enabled and os.path.isfile(path):
+        args.timings.count("bytes written", os.path.getsize(path))
+
+
+def _count_replication(args, result):
+    args.timings.count("mkdir" if not result.dry_run else "stat",
+                       result.created + result.existing + len(result.failed))
+    args.timings.count("failed", len(result.failed))
+
+
+def cmd_scan(args):
+    if not os.path.isdir(args.root):
+        raise SystemExit(f"structify: not a folder: {args.root}")
+    if args.output and args.output.lower().endswith(SNAPSHOT_SUFFIX):
+        if args.stats:
+            raise SystemExit("structify: snapshots do not store file statistics")
+        entries, _ = _scan_for_output(args)
+        with args.timings.phase(WRITE):
+            write_structure_file(entries, args.output)
+        _count_written(args, args.output)
+        return 0
+    entries, header = _scan_for_output(args)
+    out, close = _open_output(args.output)
+    try:
+        # Without --stats this streams straight to the output and the tree
+        # is never held in memory
+        with args.timings.phase(WRITE):
+            write_entries_to(out, entries, header)
+    finally:
+        if close:
+            out.close()
+    if close:
+        _count_written(args, args.output)
+    return 0
+
+
+def cmd_export(args):
+    if not os.path.isdir(args.root):
+        raise SystemExit(f"structify: not a folder: {args.root}")
+    entries, header = _scan_for_output(args)
+    with args.timings.phase(WRITE):
+        path, count = export_entries(entries, args.root, overwrite=args.overwrite, dest=args.dest,
+                                     header=header)
+    _count_written(args, path)
+    if not count:
+        os.remove(path)
+        print("structify: nothing to export, the folder has no subfolders", file=sys.stderr)
+        return 1
+    print(path)
+    if args.history:
+        from .history import HistoryStore, history_root
+        # Read back from the export, so the scan is still streamed once
+        with HistoryStore(args.history) as store, args.timings.phase(BUILD):
+            snapshot = store.add(history_root(args.root), iter_structure_file(path))
+        print(f"structify: history snapshot {snapshot.id}, "
+              f"{snapshot.new_objects:,} new folder objects", file=sys.stderr)
+    return 0
+
+
+def cmd_convert(args):
+    with args.timings.phase(PARSE):
+        tree = read_structure_file(args.source)
+    args.timings.count("folders", len(tree))
+    with args.timings.phase(WRITE):
+        write_structure_file(tree.iter_entries(), args.dest)
+    _count_written(args, args.dest)
+    return 0
+
+
+def cmd_diff(args):
+    if args.external:
+        return _diff_external(args)
+    from .diff import diff_trees
+    scan_filter = _scan_filter(args)
+    left = _load(args, args.left, scan_filter)
+    right = _load(args, args.right, scan_filter)
+    with args.timings.phase(DIFF):
+        diff = diff_trees(left, right, detect_moves=not args.no_moves)
+    return _print_diff(args, diff)
+
+
+def _print_diff(args, diff):
+    from .diff import format_path
+    args.timings.count("folders descended", diff.compared)
+    with args.timings.phase(WRITE):
+        for path, size in diff.removed:
+            print(f"L {format_path(path)}" + (f"  ({size} folders)" if size > 1 else ""))
+        for path, size in diff.added:
+            print(f"R {format_path(path)}" + (f"  ({size} folders)" if size > 1 else ""))
+        for src, dst, size in diff.moved:
+            print(f"M {format_path(src)} -> {format_path(dst)}" + (f"  ({size} folders)" if size > 1 else ""))
+    if not args.quiet:
+        print(f"{diff.removed_folders()} only in left, {diff.added_folders()} only in right, "
+              f"{diff.moved_folders()} moved", file=sys.stderr)
+    return 0 if diff.identical else 1
+
+
+def _diff_external(args):
+    # Sorted full-path streams merged from disk; memory stays bounded by
+    # --memory however large the structures are
+    from .extsort import external_diff
+    scan_filter = _scan_filter(args)
+    timings = args.timings
+    sources = []
+    for source in (args.left, args.right):
+        entries = structure_entries(source, not args.root_only, args.workers, scan_filter)
+        sources.append(timings.iterate(entries, WALK if os.path.isdir(source) else PARSE, "folders"))
+    only = {"L": 0, "R": 0}
+    with timings.phase(DIFF):
+        for side, path, size in external_diff(*sources, args.memory << 20, args.temp_dir):
+            print(f"{side} {path}" + (f"  ({size} folders)" if size > 1 else ""))
+            only[side] += size
+    if not args.quiet:
+        print(f"{only['L']} only in left, {only['R']} only in right", file=sys.stderr)
+    return 0 if not (only["L"] or only["R"]) else 1
+
+
+def _open_journal(args):
+    if not args.journal:
+        return None
+    if args.dry_run:
+        raise SystemExit("structify: --journal cannot be combined with --dry-run")
+    from .journal import ReplicationJournal
+    try:
+        journal = ReplicationJournal(args.journal, args.dest)
+    except ValueError as e:
+        raise SystemExit(f"structify: {e}")
+    if journal.resumed:
+        print(f"structify: resuming from {args.journal}", file=sys.stderr)
+    return journal
+
+
+def cmd_replicate(args):
+    from .replicate import replicate_tree
+    if not os.path.isdir(args.dest):
+        raise SystemExit(f"structify: destination is not a folder: {args.dest}")
+    tree = _load(args, args.source, _scan_filter(args))
+    journal = _open_journal(args)
+    try:
+        with args.timings.phase(MKDIR):
+            result = replicate_tree(tree, args.dest, args.workers, dry_run=args.dry_run,
+                                    journal=journal)
+    finally:
+        if journal is not None:
+            journal.close()
+    _count_replication(args, result)
+    if args.dry_run and args.list:
+        for path in result.planned:
+            print(path)
+    for path, error in result.failed:
+        print(f"structify: {path}: {error}", file=sys.stderr)
+    print(result.summary(), file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def cmd_sync(args):
+    from .sync import apply_sync, plan_sync
+    if args.root_only:
+        raise SystemExit("structify: sync needs the full structure, not --root-only")
+    if not os.path.isdir(args.dest):
+        raise SystemExit(f"structify: destination is not a folder: {args.dest}")
+    scan_filter = _scan_filter(args)
+    tree = _load(args, args.source, scan_filter)
+    # The destination is scanned with the same filter, so what it leaves
+    # out of the source is not taken for extra folders
+    with args.timings.phase(DIFF):
+        plan = plan_sync(tree, args.dest, args.extra, args.workers, scan_filter, args.quarantine)
+    args.timings.count("destination folders", plan.scanned)
+    if args.plan or args.list:
+        for line in plan.operations():
+            print(line)
+    print(plan.summary(), file=sys.stderr)
+    if args.plan:
+        return 0 if plan.empty else 1
+    if plan.empty:
+        return 0
+    journal = _open_journal(args)
+    try:
+        with args.timings.phase(MKDIR):
+            result = apply_sync(plan, args.workers, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+    args.timings.count("failed", len(result.failed))
+    for path, error in result.failed:
+        print(f"structify: {path}: {error}", file=sys.stderr)
+    print(result.summary(), file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def cmd_template(args):
+    from .replicate import replicate_entries
+    from .template import parse_variables, read_template
+    try:
+        template = read_template(args.template)
+        if args.count:
+            print(template.count())
+            return 0
+        entries = args.timings.iterate(template.expand(parse_variables(args.var)), BUILD, "folders")
+    except ValueError as e:
+        raise SystemExit(f"structify: {args.template}: {e}")
+    try:
+        if args.output:
+            with args.timings.phase(WRITE):
+                write_structure_file(entries, args.output)
+            _count_written(args, args.output)
+        elif args.dest:
+            if not os.path.isdir(args.dest):
+                raise SystemExit(f"structify: destination is not a folder: {args.dest}")
+            journal = _open_journal(args)
+            try:
+                with args.timings.phase(MKDIR):
+                    result = replicate_entries(entries, args.dest, args.workers,
+                                               dry_run=args.dry_run, journal=journal)
+            finally:
+                if journal is not None:
+                    journal.close()
+            _count_replication(args, result)
+            if args.dry_run and args.list:
+                for path in result.planned:
+                    print(path)
+            for path, error in result.failed:
+                print(f"structify: {path}: {error}", file=sys.stderr)
+            print(result.summary(), file=sys.stderr)
+            return 1 if result.failed else 0
+        else:
+            with args.timings.phase(WRITE):
+                write_entries_to(sys.stdout, entries)
+    except ValueError as e:
+        raise SystemExit(f"structify: {args.template}: {e}")
+    return 0
+
+
+def cmd_rollback(args):
+    from .journal import rollback
+    try:
+        with args.timings.phase(RMDIR):
+            result = rollback(args.journal, args.workers)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"structify: {e}")
+    args.timings.count("folders", result.removed + result.missing + len(result.failed))
+    args.timings.count("failed", len(result.failed))
+    for path, error in result.failed:
+        print(f"structify: {path}: {error}", file=sys.stderr)
+    print(result.summary(), file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def _gather_roots(args):
+    from .batch import expand_roots, read_root_list
+    patterns = list(args.roots)
+    if args.roots_from:
+        if args.roots_from == "-":
+            patterns.extend(read_root_list(sys.stdin))
+        else:
+            with open_text(args.roots_from) as f:
+                patterns.extend(read_root_list(f))
+    return expand_roots(patterns)
+
+
+def cmd_batch(args):
+    from .batch import batch_compare, write_report
+    roots = _gather_roots(args)
+    if not roots:
+        raise SystemExit("structify: no folders to compare")
+    template = _load(args, args.template, _scan_filter(args))
+    reports = batch_compare(template, roots, not args.root_only, args.jobs, args.workers,
+                            _scan_filter(args), args.limit)
+    out, close = _open_output(args.output)
+    try:
+        # Scanning happens in the worker processes; the parent only waits
+        with args.timings.phase(DIFF):
+            counts = write_report(reports, out, args.format)
+    finally:
+        if close:
+            out.close()
+    args.timings.count("roots", len(roots))
+    if not args.quiet:
+        print(f"{len(roots)} roots: {counts['match']} match, {counts['differs']} differ, "
+              f"{counts['error']} failed", file=sys.stderr)
+    return 0 if counts["match"] == len(roots) else 1
+
+
+def _root_file_name(root, suffix):
+    # Readable and unique: folder name plus a hash of the full path
+    import hashlib
+    path = os.path.abspath(root)
+    name = os.path.basename(path.rstrip(os.sep)) or "root"
+    digest = hashlib.sha1(path.encode("utf-8", "surrogateescape")).hexdigest()[:8]
+    return f"{name}-{digest}{suffix}"
+
+
+def cmd_multiscan(args):
+    from .multiscan import MultiRootScan
+    if args.root_only:
+        raise SystemExit("structify: multiscan always scans recursively")
+    roots = _gather_roots(args)
+    if not roots:
+        raise SystemExit("structify: no folders to scan")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    scan = MultiRootScan(roots, args.workers, args.per_root, _scan_filter(args))
+    failed = 0
+    # Roots come out as they finish; the walk runs on the pool meanwhile
+    for result in args.timings.iterate(scan, WALK, "roots"):
+        args.timings.count("folders", result.folders)
+        path = None
+        if result.error:
+            failed += 1
+        elif args.output_dir:
+            path = os.path.join(args.output_dir, _root_file_name(result.root, "." + args.format))
+            with args.timings.phase(WRITE):
+                write_structure_file(result.tree.iter_entries(), path)
+            _count_written(args, path)
+        else:
+            with args.timings.phase(WRITE):
+                write_entries_to(sys.stdout, result.tree.iter_entries(), header=result.root)
+        if not args.quiet:
+            line = result.summary()
+            if path:
+                line += f" -> {path}"
+            print(f"structify: {line}", file=sys.stderr)
+    if not args.quiet:
+        print(f"structify: {len(roots)} roots, {scan.listed:,} folders listed in "
+              f"{scan.elapsed:.2f} s ({scan.rate:,.0f} dirs/s), {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _open_history(args):
+    from .history import HistoryStore
+    if args.action != "add" and not os.path.exists(args.store):
+        raise SystemExit(f"structify: no history store: {args.store}")
+    return HistoryStore(args.store)
+
+
+def _history_snapshot(store, snapshot_id):
+    try:
+        return store.get(snapshot_id)
+    except KeyError as e:
+        raise SystemExit(f"structify: {e.args[0]} in {store.path}")
+
+
+def cmd_history_add(args):
+    from .history import history_root
+    if os.path.isdir(args.source):
+        if args.root_only:
+            raise SystemExit("structify: history snapshots need a recursive scan")
+        entries = scan_entries(args.source, workers=args.workers, scan_filter=_scan_filter(args))
+        entries = args.timings.iterate(entries, WALK, "folders")
+    else:
+        entries = args.timings.iterate(iter_structure_file(args.source), PARSE, "folders")
+    root = history_root(args.root or args.source)
+    with _open_history(args) as store, args.timings.phase(BUILD):
+        snapshot = store.add(root, entries, args.label)
+    args.timings.count("new objects", snapshot.new_objects)
+    print(snapshot.summary())
+    if not args.quiet:
+        print(f"structify: {snapshot.new_objects:,} new folder objects", file=sys.stderr)
+    return 0
+
+
+def _history_root(args):
+    from .history import history_root
+    return history_root(args.root) if args.root else None
+
+
+def cmd_history_list(args):
+    with _open_history(args) as store:
+        for snapshot in store.snapshots(_history_root(args)):
+            print(snapshot.summary())
+    return 0
+
+
+def cmd_history_diff(args):
+    with _open_history(args) as store:
+        old = _history_snapshot(store, args.old)
+        if args.new is None:
+            # Latest snapshot of the same folder
+            new = store.snapshots(old.root)[-1]
+        else:
+            new = _history_snapshot(store, args.new)
+        with args.timings.phase(DIFF):
+            diff = store.diff(old.id, new.id, detect_moves=not args.no_moves)
+    return _print_diff(args, diff)
+
+
+def cmd_history_show(args):
+    with _open_history(args) as store:
+        _history_snapshot(store, args.id)
+        entries = store.iter_entries(args.id)
+        with args.timings.phase(WRITE):
+            if args.output:
+                count = write_structure_file(entries, args.output)
+            else:
+                count = write_entries_to(sys.stdout, entries)
+    args.timings.count("folders", count)
+    return 0
+
+
+def cmd_history_prune(args):
+    rules = (args.keep_last, args.keep_daily, args.keep_weekly, args.keep_monthly)
+    if not any(rules):
+        raise SystemExit("structify: give at least one --keep-* rule")
+    with _open_history(args) as store:
+        result = store.prune(*rules, root=_history_root(args), dry_run=args.dry_run)
+    for snapshot in result.removed:
+        print(("would remove " if args.dry_run else "removed ") + snapshot.summary())
+    if not args.quiet:
+        print(f"structify: {result.summary()}", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="structify",
+        description="Scan, export, compare and replicate folder structures.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def instrument(p):
+        p.add_argument("--timings", nargs="?", const="-", dest="timings_to", metavar="FILE",
+                       help="report phase timings and counters on stderr, or as JSON to FILE")
+        p.add_argument("--profile", action="store_true",
+                       help="run under cProfile; with --timings FILE also writes FILE.prof")
+        p.add_argument("--trace-memory", action="store_true",
+                       help="track peak memory and the largest allocations with tracemalloc")
+
+    def common(p, workers=DEFAULT_WORKERS):
+        p.add_argument("--root-only", action="store_true",
+                       help="only direct subfolders instead of a recursive scan")
+        p.add_argument("--workers", type=int, default=workers,
+                       help="threads used to scan or create folders (default: %(default)s)")
+        p.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                       help="skip folders matching a glob (or re:REGEX); patterns with '/' "
+                            "match the path below the root; repeatable")
+        p.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                       help="keep only matching folders, their subtrees and ancestors; repeatable")
+        p.add_argument("--max-depth", type=int, metavar="N",
+                       help="descend at most N levels (1 = direct subfolders)")
+        p.add_argument("--skip-hidden", action="store_true", help="skip folders starting with '.'")
+        p.add_argument("--include-symlinks", action="store_true",
+                       help="list symlinked folders (never entered)")
+        instrument(p)
+
+    p = sub.add_parser("scan", help="print the indented folder structure of ROOT")
+    p.add_argument("root")
+    p.add_argument("-o", "--output",
+                   help=f"write to a file instead of stdout; .gz/.zst compress, {SNAPSHOT_SUFFIX} writes a snapshot")
+    p.add_argument("--cache-dir", help="use an incremental scan cache in this folder")
+    p.add_argument("--stats", action="store_const", const=STATS_SIZES,
+                   help="annotate folders with file count, bytes and newest file of their subtree")
+    p.add_argument("--file-counts", dest="stats", action="store_const", const=STATS_COUNTS,
+                   help="like --stats with file counts only, which needs no stat per file")
+    common(p)
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("export", help="scan ROOT and write the dated structure TXT")
+    p.add_argument("root")
+    p.add_argument("--dest", help="folder for the TXT file (default: ROOT)")
+    p.add_argument("--overwrite", action="store_true",
+                   help="replace today's export instead of writing a numbered copy")
+    p.add_argument("--history", metavar="STORE",
+                   help="also add the export to this snapshot history store")
+    p.add_argument("--cache-dir", help="use an incremental scan cache in this folder")
+    p.add_argument("--stats", action="store_const", const=STATS_SIZES,
+                   help="annotate folders with file count, bytes and newest file of their subtree")
+    p.add_argument("--file-counts", dest="stats", action="store_const", const=STATS_COUNTS,
+                   help="like --stats with file counts only, which needs no stat per file")
+    common(p)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("convert", help="convert between structure TXT and binary snapshots")
+    p.add_argument("source", help="structure TXT (.txt, .txt.gz, .txt.zst) or snapshot")
+    p.add_argument("dest", help=f"output file; a {SNAPSHOT_SUFFIX} suffix writes a snapshot")
+    instrument(p)
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("diff", help="compare two folders or structure TXT files")
+    p.add_argument("left")
+    p.add_argument("right")
+    p.add_argument("--no-moves", action="store_true", help="report moves as removed + added")
+    p.add_argument("--external", action="store_true",
+                   help="diff sorted path streams spilled to temp files instead of in-memory "
+                        "trees, for structures larger than RAM (no move detection, output in "
+                        "path order)")
+    p.add_argument("--memory", type=int, default=DEFAULT_MEMORY_LIMIT >> 20, metavar="MB",
+                   help="memory cap for --external sorting (default: %(default)s)")
+    p.add_argument("--temp-dir", help="folder for --external sort runs (default: system temp)")
+    p.add_argument("-q", "--quiet", action="store_true", help="no summary line")
+    common(p)
+    p.set_defaults(func=cmd_diff)
+
+    journal_help = ("record created folders in FILE; rerunning with the same FILE resumes an "
+                    "interrupted run, 'structify rollback FILE' undoes it")
+
+    p = sub.add_parser("template", help="expand a structure template and create it under DEST")
+    p.add_argument("template", help="template file: indented lines with {var}, {n=1..12:02}, "
+                                    "@for blocks")
+    p.add_argument("dest", nargs="?", help="create the folders here (default: print the structure)")
+    p.add_argument("--var", action="append", default=[], metavar="NAME=VALUE",
+                   help="define a template variable; repeatable")
+    p.add_argument("-o", "--output", help="write the expanded structure to a TXT or snapshot file")
+    p.add_argument("--count", action="store_true", help="only print how many folders it expands to")
+    p.add_argument("--dry-run", action="store_true", help="only report what would be created")
+    p.add_argument("--list", action="store_true", help="with --dry-run, print every planned folder")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                   help="threads used to create folders (default: %(default)s)")
+    p.add_argument("--journal", metavar="FILE", help=journal_help)
+    instrument(p)
+    p.set_defaults(func=cmd_template)
+
+    p = sub.add_parser("batch", help="check many folders against one template structure")
+    p.add_argument("template", help="reference folder or structure file")
+    p.add_argument("roots", nargs="*", metavar="ROOT",
+                   help="folders to check; glob patterns are expanded (quote them)")
+    p.add_argument("--roots-from", metavar="FILE",
+                   help="read further folders or globs from FILE, one per line ('-' = stdin)")
+    p.add_argument("-o", "--output", help="write the report to a file instead of stdout")
+    p.add_argument("--format", choices=("csv", "json"), default="csv",
+                   help="report format (default: %(default)s)")
+    p.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                   help="processes scanning roots in parallel (default: %(default)s)")
+    p.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                   help="differences listed per root (default: %(default)s)")
+    p.add_argument("-q", "--quiet", action="store_true", help="no summary line")
+    common(p, DEFAULT_SCAN_WORKERS)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("multiscan", help="scan many roots at once on one shared thread pool")
+    p.add_argument("roots", nargs="*", metavar="ROOT",
+                   help="folders to scan; glob patterns are expanded (quote them)")
+    p.add_argument("--roots-from", metavar="FILE",
+                   help="read further folders or globs from FILE, one per line ('-' = stdin)")
+    p.add_argument("-o", "--output-dir",
+                   help="write one structure file per root into this folder "
+                        "(default: print them one after another)")
+    p.add_argument("--format", choices=(SNAPSHOT_SUFFIX[1:], "txt", "txt.gz", "txt.zst"),
+                   default=SNAPSHOT_SUFFIX[1:], help="file format for --output-dir "
+                                                     "(default: %(default)s)")
+    p.add_argument("--per-root", type=int, default=DEFAULT_PER_ROOT,
+                   help="listings one root may have in flight, so a slow mount cannot starve "
+                        "the others (default: %(default)s)")
+    p.add_argument("-q", "--quiet", action="store_true", help="no per-root or summary lines")
+    common(p)
+    p.set_defaults(func=cmd_multiscan)
+
+    p = sub.add_parser("replicate", help="create the structure of SOURCE under DEST")
+    p.add_argument("source", help="folder or structure TXT file")
+    p.add_argument("dest")
+    p.add_argument("--dry-run", action="store_true", help="only report what would be created")
+    p.add_argument("--list", action="store_true", help="with --dry-run, print every planned folder")
+    p.add_argument("--journal", metavar="FILE", help=journal_help)
+    common(p)
+    p.set_defaults(func=cmd_replicate)
+
+    p = sub.add_parser("sync", help="make DEST match SOURCE: create only the missing folders and "
+                                    "optionally clear out extra ones")
+    p.add_argument("source", help="folder, structure TXT or snapshot")
+    p.add_argument("dest")
+    p.add_argument("--extra", choices=EXTRA_MODES, default=KEEP,
+                   help="folders only DEST has: keep them, remove them when empty, or move the "
+                        "file-free ones into the quarantine folder (default: %(default)s)")
+    p.add_argument("--quarantine", metavar="DIR",
+                   help="where --extra quarantine moves folders "
+                        "(default: DEST/.structify-quarantine/<time>)")
+    p.add_argument("--plan", action="store_true",
+                   help="only print the operations; exits 1 when DEST is out of sync")
+    p.add_argument("--list", action="store_true", help="print the operations before applying them")
+    p.add_argument("--journal", metavar="FILE",
+                   help="record created folders in FILE; 'structify rollback FILE' removes them")
+    common(p)
+    p.set_defaults(func=cmd_sync, dry_run=False)
+
+    p = sub.add_parser("rollback", help="remove the folders a journaled replicate created")
+    p.add_argument("journal", help="journal FILE given to replicate or template --journal")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                   help="threads used to remove folders (default: %(default)s)")
+    instrument(p)
+    p.set_defaults(func=cmd_rollback)
+
+    p = sub.add_parser("history", help="keep, compare and prune structure snapshots in a store "
+                                       "that shares unchanged subtrees")
+    p.add_argument("store", help="history store file (created by 'add' and 'export --history')")
+    actions = p.add_subparsers(dest="action", required=True)
+
+    q = actions.add_parser("add", help="scan a folder, or read a structure file, into the store")
+    q.add_argument("source")
+    q.add_argument("--root", help="file the snapshot under this folder, e.g. for old exports "
+                                  "(default: SOURCE)")
+    q.add_argument("--label", help="note stored with the snapshot")
+    q.add_argument("-q", "--quiet", action="store_true", help="no summary line")
+    common(q)
+    q.set_defaults(func=cmd_history_add)
+
+    q = actions.add_parser("list", help="list the stored snapshots, oldest first")
+    q.add_argument("--root", help="only snapshots of this folder")
+    instrument(q)
+    q.set_defaults(func=cmd_history_list)
+
+    q = actions.add_parser("diff", help="compare two snapshots (only changed subtrees are read)")
+    q.add_argument("old", type=int)
+    q.add_argument("new", type=int, nargs="?",
+                   help="default: the latest snapshot of the same folder")
+    q.add_argument("--no-moves", action="store_true", help="report moves as removed + added")
+    q.add_argument("-q", "--quiet", action="store_true", help="no summary line")
+    instrument(q)
+    q.set_defaults(func=cmd_history_diff)
+
+    q = actions.add_parser("show", help="print or write the structure of a snapshot")
+    q.add_argument("id", type=int)
+    q.add_argument("-o", "--output",
+                   help=f"write to a file; .gz/.zst compress, {SNAPSHOT_SUFFIX} writes a snapshot")
+    instrument(q)
+    q.set_defaults(func=cmd_history_show)
+
+    q = actions.add_parser("prune", help="remove the snapshots no --keep-* rule keeps, per folder")
+    for period in ("last", "daily", "weekly", "monthly"):
+        q.add_argument(f"--keep-{period}", type=int, default=0, metavar="N")
+    q.add_argument("--root", help="only prune snapshots of this folder")
+    q.add_argument("--dry-run", action="store_true", help="only list what would be removed")
+    q.add_argument("-q", "--quiet", action="store_true", help="no summary line")
+    instrument(q)
+    q.set_defaults(func=cmd_history_prune)
+    return parser
+
+
+def _report_timings(args):
+    timings = args.timings.finish()
+    if args.timings_to not in (None, "-"):
+        dump_timings(timings, args.timings_to)
+        return
+    print(f"structify: {timings.summary()}", file=sys.stderr)
+    if timings.profile:
+        print(timings.profile, file=sys.stderr)
+    if timings.memory:
+        for stat in timings.memory["top"]:
+            print(f"  {stat['bytes']:>12,} B  {stat['where']}", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.timings = Timings(args.command, enabled=bool(args.timings_to or args.profile
+                                                       or args.trace_memory))
+    profile_path = None
+    if args.profile and args.timings_to not in (None, "-"):
+        profile_path = os.path.splitext(args.timings_to)[0] + ".prof"
+    try:
+        with profiled(args.timings, args.profile, args.trace_memory, profile_path):
+            return args.func(args)
+    except BrokenPipeError:
+        return 0
+    except OSError as e:
+        print(f"structify: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.timings.enabled:
+            _report_timings(args)
@@ -0,0 +1,91 @@
+import os
+
+from .scanner import DEFAULT_WORKERS, get_folder_structure, walk_structure
+from .snapshot import SNAPSHOT_SUFFIX, Snapshot, is_snapshot, read_snapshot, write_snapshot_entries
+from .stats import FolderStats, walk_stats
+from .textfile import (export_path, next_numbered_export_path, read_entries, read_structure,
+                       write_entries)
+from .tree import StructureTree
+
+
+def scan_entries(root_path, recursive=True, workers=DEFAULT_WORKERS, cancel=None, cache=None,
+                 scan_filter=None):
+    # (depth, name) stream of a scan, for writers that never need the tree
+    if not recursive:
+        return ((0, name) for name in get_folder_structure(root_path, recursive=False,
+                                                           scan_filter=scan_filter))
+    if cache is not None:
+        return cache.walk(root_path, workers, cancel, scan_filter=scan_filter)
+    return walk_structure(root_path, workers, cancel, scan_filter)
+
+
+def scan_tree(root_path, recursive=True, workers=DEFAULT_WORKERS, cancel=None, cache=None,
+              scan_filter=None):
+    tree = StructureTree()
+    tree.extend(scan_entries(root_path, recursive, workers, cancel, cache, scan_filter))
+    return tree
+
+
+def scan_tree_stats(root_path, workers=DEFAULT_WORKERS, cancel=None, scan_filter=None,
+                    sizes=True):
+    # Recursive scan that also totals the files of every folder; returns
+    # the tree and its rolled-up FolderStats (file counts only without sizes)
+    tree = StructureTree()
+    stats = FolderStats(sizes)
+    tree.extend(stats.extend(walk_stats(root_path, workers, cancel, scan_filter, sizes)))
+    stats.rollup(tree)
+    return tree, stats
+
+
+def read_structure_file(path):
+    # Binary snapshots are recognised by their magic, anything else is TXT
+    if is_snapshot(path):
+        return read_snapshot(path)
+    return read_structure(path)
+
+
+def iter_structure_file(path):
+    # (depth, name) stream of a structure file that never builds the tree
+    if is_snapshot(path):
+        with Snapshot(path) as snapshot:
+            yield from snapshot.iter_entries()
+    else:
+        yield from read_entries(path)
+
+
+def write_structure_file(entries, path):
+    # Format follows the suffix: .snap, .txt.gz/.txt.zst or plain TXT
+    if path.lower().endswith(SNAPSHOT_SUFFIX):
+        return write_snapshot_entries(entries, path)
+    return write_entries(entries, path)
+
+
+def load_structure(source, recursive=True, workers=DEFAULT_WORKERS, cache=None, scan_filter=None):
+    # A folder is scanned, anything else is read as a structure file
+    if os.path.isdir(source):
+        return scan_tree(source, recursive, workers, cache=cache, scan_filter=scan_filter)
+    return read_structure_file(source)
+
+
+def structure_entries(source, recursive=True, workers=DEFAULT_WORKERS, scan_filter=None):
+    # Streaming counterpart of load_structure
+    if os.path.isdir(source):
+        return scan_entries(source, recursive, workers, scan_filter=scan_filter)
+    return iter_structure_file(source)
+
+
+def export_entries(entries, source_path, overwrite=False, dest=None, header=None):
+    """Stream entries to the dated export file inside source_path (or dest).
+
+    An existing file is overwritten when overwrite is set, otherwise the next
+    free numbered copy is used. Returns (path, number of lines written).
+    """
+    path = export_path(source_path, dest=dest)
+    if os.path.exists(path) and not overwrite:
+        path = next_numbered_export_path(source_path, dest=dest)
+    return path, write_entries(entries, path, header)
+
+
+def export_structure(tree, source_path, overwrite=False, dest=None):
+    return export_entries(tree.iter_entries(), source_path, overwrite, dest)[0]
+
@@ -0,0 +1,219 @@
+from array import array
+
+from .tree import ROOT
+
+
+def subtree_hashes(tree):
+    """Return (hashes, sizes) arrays indexed by node id.
+
+    A node's hash covers its name and the multiset of its children's hashes,
+    so two subtrees with the same folders hash equal regardless of sibling
+    order. Sizes count the node itself plus all descendants.
+    """
+    count = len(tree.parent)
+    # Plain lists while accumulating (list indexing is much cheaper than
+    # array indexing in the hot loop), packed into arrays at the end.
+    hashes = [0] * count
+    sizes = [0] * count
+    acc = [0] * count
+    names = tree.names
+    name_id = tree.name_id.tolist()
+    parent_of = tree.parent.tolist()
+    order = list(tree.iter_nodes())
+    order.reverse()
+    for node in order:
+        size = sizes[node]
+        h = hash((names[name_id[node]], acc[node], size))
+        hashes[node] = h
+        parent = parent_of[node]
+        acc[parent] += h
+        sizes[parent] += size + 1
+        sizes[node] = size + 1
+    hashes[ROOT] = hash(("", acc[ROOT], sizes[ROOT]))
+    return array("q", hashes), array("i", sizes)
+
+
+class TreeDiff:
+    def __init__(self):
+        # (path, folder count) for subtrees only on one side
+        self.removed = []
+        self.added = []
+        # (left path, right path, folder count) for subtrees found elsewhere
+        self.moved = []
+        self.left_count = 0
+        self.right_count = 0
+        self.compared = 0
+
+    @property
+    def identical(self):
+        return not (self.removed or self.added or self.moved)
+
+    def removed_folders(self):
+        return sum(size for _, size in self.removed)
+
+    def added_folders(self):
+        return sum(size for _, size in self.added)
+
+    def moved_folders(self):
+        return sum(size for _, _, size in self.moved)
+
+
+def _child_map(tree, node):
+    # Siblings are matched by name; a TXT file may repeat a name under one
+    # parent, so the second "a" is keyed ("a", 1), the third ("a", 2) and
+    # so on, and pairs up with the same occurrence on the other side
+    names = tree.names
+    name_id = tree.name_id
+    children = {}
+    for child in tree.children(node):
+        name = names[name_id[child]]
+        if name in children:
+            count = 1
+            while (name, count) in children:
+                count += 1
+            children[(name, count)] = child
+        else:
+            children[name] = child
+    return children
+
+
+def _key_name(key):
+    return key if key.__class__ is str else key[0]
+
+
+def diff_trees(left, right, detect_moves=True, left_hashes=None):
+    """Path-aware diff of two StructureTrees.
+
+    Children are matched by name under the same parent, repeated names by
+    their order among the siblings; equal subtree hashes end the descent,
+    so the work is proportional to the changed region.
+    Paths are tuples of folder names from the top level down. left_hashes
+    may pass subtree_hashes(left) when the same left tree is diffed many
+    times.
+    """
+    left_hashes, left_sizes = left_hashes or subtree_hashes(left)
+    right_hashes, right_sizes = subtree_hashes(right)
+    result = TreeDiff()
+    result.left_count = len(left)
+    result.right_count = len(right)
+    if left_hashes[ROOT] == right_hashes[ROOT]:
+        return result
+
+    # (node, path) of the topmost folders present on one side only
+    removed = []
+    added = []
+    stack = [(ROOT, ROOT, ())]
+    while stack:
+        left_node, right_node, path = stack.pop()
+        result.compared += 1
+        left_children = _child_map(left, left_node)
+        right_children = _child_map(right, right_node)
+        for key, left_child in left_children.items():
+            right_child = right_children.get(key)
+            if right_child is None:
+                removed.append((left_child, path + (_key_name(key),)))
+            elif left_hashes[left_child] != right_hashes[right_child]:
+                stack.append((left_child, right_child, path + (_key_name(key),)))
+        for key, right_child in right_children.items():
+            if key not in left_children:
+                added.append((right_child, path + (_key_name(key),)))
+
+    moved_left = set()
+    moved_right = set()
+    partial_left = set()
+    partial_right = set()
+    if detect_moves and removed and added:
+        _detect_moves(left, right, left_hashes, right_hashes, left_sizes, removed, added,
+                      result.moved, moved_left, moved_right, partial_left, partial_right)
+
+    result.removed = _collect(left, left_sizes, removed, moved_left, partial_left)
+    result.added = _collect(right, right_sizes, added, moved_right, partial_right)
+    result.removed.sort()
+    result.added.sort()
+    result.moved.sort()
+    return result
+
+
+def _walk_paths(tree, node, path):
+    stack = [(node, path)]
+    names = tree.names
+    name_id = tree.name_id
+    while stack:
+        node, path = stack.pop()
+        yield node, path
+        for child in tree.children(node):
+            stack.append((child, path + (names[name_id[child]],)))
+
+
+def _mark_ancestors(tree, node, marks):
+    parent_of = tree.parent
+    node = parent_of[node]
+    while node != ROOT and node not in marks:
+        marks.add(node)
+        node = parent_of[node]
+
+
+def _detect_moves(left, right, left_hashes, right_hashes, left_sizes, removed, added,
+                  moved, moved_left, moved_right, partial_left, partial_right):
+    # Every folder inside an added subtree is a potential destination; removed
+    # subtrees are searched top-down so the largest matching piece wins.
+    candidates = {}
+    for node, path in added:
+        for child, child_path in _walk_paths(right, node, path):
+            candidates.setdefault(right_hashes[child], []).append((child, child_path))
+
+    def available(node):
+        if node in moved_right or node in partial_right:
+            return False
+        parent_of = right.parent
+        node = parent_of[node]
+        while node != ROOT:
+            if node in moved_right:
+                return False
+            node = parent_of[node]
+        return True
+
+    for node, path in removed:
+        stack = [(node, path)]
+        while stack:
+            current, current_path = stack.pop()
+            match = None
+            pool = candidates.get(left_hashes[current])
+            while pool:
+                target, target_path = pool.pop()
+                if available(target):
+                    match = target, target_path
+                    break
+            if match is None:
+                for child in left.children(current):
+                    stack.append((child, current_path + (left.name(child),)))
+                continue
+            target, target_path = match
+            moved.append((current_path, target_path, left_sizes[current]))
+            moved_left.add(current)
+            moved_right.add(target)
+            _mark_ancestors(left, current, partial_left)
+            _mark_ancestors(right, target, partial_right)
+
+
+def _collect(tree, sizes, roots, moved, partial):
+    # Whole subtrees are reported once; folders that lost part of their
+    # contents to a move are reported on their own.
+    result = []
+    for node, path in roots:
+        stack = [(node, path)]
+        while stack:
+            current, current_path = stack.pop()
+            if current in moved:
+                continue
+            if current in partial:
+                result.append((current_path, 1))
+                for child in tree.children(current):
+                    stack.append((child, current_path + (tree.name(child),)))
+            else:
+                result.append((current_path, sizes[current]))
+    return result
+
+
+def format_path(path):
+    return "/".join(path)
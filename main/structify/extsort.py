@@ -0,0 +1,144 @@
+import heapq
+import os
+import tempfile
+
+# Path separator inside sorted streams. It sorts below every printable
+# character but above the "\n" line terminator, so plain string order is
+# folder order: a folder, then its whole subtree, then its next sibling.
+SEP = "\x1f"
+DEFAULT_MEMORY_LIMIT = 256 << 20
+# Rough bytes held per buffered path on top of its characters (str header
+# plus the list slot)
+LINE_OVERHEAD = 64
+MERGE_FAN_IN = 64
+RUN_BUFFER = 1 << 20
+
+
+def full_paths(entries):
+    """Turn (depth, name) entries in pre-order into "a<SEP>b<SEP>c\\n" lines.
+
+    Depths are clamped like StructureTree.extend does; only the open path
+    is kept in memory.
+    """
+    stack = []
+    for depth, name in entries:
+        if depth < len(stack):
+            del stack[depth:]
+        path = stack[-1] + SEP + name if stack else name
+        stack.append(path)
+        yield path + "\n"
+
+
+def _open_run(path, mode):
+    return open(path, mode, encoding="utf-8", newline="\n", buffering=RUN_BUFFER)
+
+
+def _write_run(lines, tmpdir):
+    fd, path = tempfile.mkstemp(prefix="structify-run-", suffix=".txt", dir=tmpdir)
+    os.close(fd)
+    with _open_run(path, "w") as f:
+        f.writelines(lines)
+    return path
+
+
+def _merge_runs(runs, tmpdir):
+    # Fold runs together until one merge can read them all at once
+    while len(runs) > MERGE_FAN_IN:
+        group, runs = runs[:MERGE_FAN_IN], runs[MERGE_FAN_IN:]
+        files = [_open_run(path, "r") for path in group]
+        try:
+            runs.append(_write_run(heapq.merge(*files), tmpdir))
+        finally:
+            for f in files:
+                f.close()
+            for path in group:
+                os.remove(path)
+    return runs
+
+
+def sorted_lines(lines, memory_limit=DEFAULT_MEMORY_LIMIT, tmpdir=None):
+    """Yield lines in sorted order holding at most about memory_limit bytes.
+
+    Lines are buffered and sorted in memory; whenever the buffer reaches the
+    limit it is written to a temporary run file. The runs and the last buffer
+    are then merged while streaming. Run files are removed when the generator
+    finishes or is closed.
+    """
+    runs = []
+    files = []
+    try:
+        buffer = []
+        used = 0
+        for line in lines:
+            buffer.append(line)
+            used += len(line) + LINE_OVERHEAD
+            if used >= memory_limit:
+                buffer.sort()
+                runs.append(_write_run(buffer, tmpdir))
+                buffer = []
+                used = 0
+        buffer.sort()
+        if not runs:
+            yield from buffer
+            return
+        runs = _merge_runs(runs, tmpdir)
+        files = [_open_run(path, "r") for path in runs]
+        yield from heapq.merge(*files, buffer)
+    finally:
+        for f in files:
+            f.close()
+        for path in runs:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def diff_sorted(left, right):
+    """Merge-join two sorted path streams from full_paths.
+
+    Yields ("L" or "R", path, folder count) for the topmost folders present
+    on one side only; their subtrees are folded into the count, like the
+    removed/added lists of diff_trees. Paths use "/" between names.
+    """
+    left = iter(left)
+    right = iter(right)
+    left_line = next(left, None)
+    right_line = next(right, None)
+    pending = None
+    while left_line is not None or right_line is not None:
+        if right_line is None or (left_line is not None and left_line < right_line):
+            side, line = "L", left_line
+            left_line = next(left, None)
+        elif left_line is None or right_line < left_line:
+            side, line = "R", right_line
+            right_line = next(right, None)
+        else:
+            left_line = next(left, None)
+            right_line = next(right, None)
+            continue
+        if pending is not None and pending[0] == side and line.startswith(pending[1]):
+            pending[2] += 1
+            continue
+        if pending is not None:
+            yield pending[0], pending[1][:-1].replace(SEP, "/"), pending[2]
+        # Everything below this folder starts with its path plus SEP
+        pending = [side, line[:-1] + SEP, 1]
+    if pending is not None:
+        yield pending[0], pending[1][:-1].replace(SEP, "/"), pending[2]
+
+
+def external_diff(left_entries, right_entries, memory_limit=DEFAULT_MEMORY_LIMIT, tmpdir=None):
+    """Diff two (depth, name) streams in bounded memory; see diff_sorted.
+
+    Each side is turned into full paths and sorted externally with half of
+    memory_limit, so neither structure is ever held as a tree. Moves are
+    not detected.
+    """
+    left = sorted_lines(full_paths(left_entries), memory_limit // 2, tmpdir)
+    right = sorted_lines(full_paths(right_entries), memory_limit // 2, tmpdir)
+    try:
+        yield from diff_sorted(left, right)
+    finally:
+        left.close()
+        right.close()
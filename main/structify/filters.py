@@ -0,0 +1,152 @@
+import fnmatch
+import os
+import re
+
+REGEX_PREFIX = "re:"
+
+
+def _compile(pattern):
+    # "re:<regex>" is searched, anything else is a case-sensitive glob that
+    # must match completely. Patterns containing "/" match the path relative
+    # to the scanned root, others only the folder name.
+    pattern = pattern.strip().rstrip("/")
+    if pattern.startswith(REGEX_PREFIX):
+        body = pattern[len(REGEX_PREFIX):]
+        return "/" in body, re.compile(body).search
+    return "/" in pattern, re.compile(fnmatch.translate(pattern)).match
+
+
+def split_patterns(text):
+    # "node_modules, .git; *.bak" -> ["node_modules", ".git", "*.bak"]
+    return [part.strip() for part in re.split(r"[,;\n]", text or "") if part.strip()]
+
+
+class ScanFilter:
+    """Folder rules applied while walking.
+
+    Excluded, hidden (dot-prefixed) and too-deep folders are pruned before
+    they are listed, so their subtrees are never visited. Include rules,
+    when given, keep only folders that match one of them, together with
+    their whole subtree and the ancestors leading to them; the walk still
+    has to descend to find matches, but max_depth and excludes bound it.
+    max_depth counts levels below the root (1 = direct subfolders only).
+    Symlinked folders are skipped unless include_symlinks is set, in which
+    case they are listed but never entered.
+    """
+
+    def __init__(self, include=(), exclude=(), max_depth=None, skip_hidden=False,
+                 include_symlinks=False):
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.max_depth = max_depth or None
+        self.skip_hidden = skip_hidden
+        self.include_symlinks = include_symlinks
+        self._include = [_compile(p) for p in self.include]
+        self._exclude = [_compile(p) for p in self.exclude]
+
+    @property
+    def active(self):
+        return bool(self.include or self.exclude or self.max_depth
+                    or self.skip_hidden or self.include_symlinks)
+
+    def key(self):
+        # Stable text for cache keys; equal filters give equal keys
+        return repr((self.include, self.exclude, self.max_depth, self.skip_hidden,
+                     self.include_symlinks))
+
+    def to_dict(self):
+        return {
+            "include": self.include,
+            "exclude": self.exclude,
+            "max_depth": self.max_depth,
+            "skip_hidden": self.skip_hidden,
+            "include_symlinks": self.include_symlinks,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("include", ()), data.get("exclude", ()), data.get("max_depth"),
+                   data.get("skip_hidden", False), data.get("include_symlinks", False))
+
+    @staticmethod
+    def _matches(rules, name, rel):
+        for on_path, match in rules:
+            if match(rel if on_path else name):
+                return True
+        return False
+
+    def prunes(self, name, rel, depth):
+        # True if the folder at rel ("a/b/name", depth 0 = direct subfolder)
+        # and everything below it are left out of the walk
+        if self.max_depth is not None and depth >= self.max_depth:
+            return True
+        if self.skip_hidden and name.startswith("."):
+            return True
+        return self._matches(self._exclude, name, rel)
+
+    def allows(self, path):
+        # Whether a folder given as a tuple of names survives every rule
+        for depth in range(len(path)):
+            if self.prunes(path[depth], "/".join(path[:depth + 1]), depth):
+                return False
+        if not self._include:
+            return True
+        return any(self._matches(self._include, path[depth], "/".join(path[:depth + 1]))
+                   for depth in range(len(path)))
+
+    def wrap_expand(self, root_path, expand, list_leaves=False):
+        """Return an expand(path, node) for the scanner that prunes children.
+
+        Folders at the depth limit are not listed unless list_leaves is set
+        (file statistics need their listing even though no child is kept).
+        """
+        prefix_len = len(os.path.join(root_path, ""))
+        sep = os.sep
+        max_depth = self.max_depth
+        include_symlinks = self.include_symlinks
+        prunes = self.prunes
+
+        def filtered(path, node):
+            rel = path[prefix_len:]
+            depth = rel.count(sep) + 1 if rel else 0
+            if max_depth is not None and depth >= max_depth:
+                # Children would be too deep: do not even list this folder
+                if list_leaves:
+                    expand(path, node)
+                return []
+            if include_symlinks and rel and os.path.islink(path):
+                return []
+            if rel and sep != "/":
+                rel = rel.replace(sep, "/")
+            children = expand(path, node)
+            if rel:
+                rel += "/"
+            return [child for child in children
+                    if not prunes(child.name, rel + child.name, depth)]
+
+        return filtered
+
+    def select(self, entries):
+        """Apply the include rules to a (depth, name) stream in pre-order."""
+        if not self._include:
+            yield from entries
+            return
+        rules = self._include
+        matches = self._matches
+        names = []
+        emitted = 0
+        keep_depth = None
+        for depth, name in entries:
+            del names[depth:]
+            emitted = min(emitted, depth)
+            if keep_depth is not None and depth <= keep_depth:
+                keep_depth = None
+            names.append(name)
+            if keep_depth is None and matches(rules, name, "/".join(names)):
+                keep_depth = depth
+            if keep_depth is not None:
+                # Ancestors are only written once something below them is kept
+                for pending in range(emitted, depth):
+                    yield pending, names[pending]
+                yield depth, name
+                emitted = depth + 1
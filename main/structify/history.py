@@ -0,0 +1,434 @@
+import hashlib
+import os
+import sqlite3
+import struct
+import time
+
+from .diff import TreeDiff, _key_name
+from .tree import StructureTree
+
+DIGEST_SIZE = 16
+_LENGTH = struct.Struct("<I")
+
+# One row per distinct folder content: its children as (name, digest) pairs
+# in listing order, packed as <u32 name length><UTF-8 name><digest> each. A
+# folder's digest covers only its contents, so every subtree that is
+# unchanged between exports (and every empty folder) is stored once. refs
+# counts the parent objects and snapshots that point at a row; it is
+# deleted when that reaches zero.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash BLOB PRIMARY KEY,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    label TEXT,
+    created REAL NOT NULL,
+    tree BLOB NOT NULL,
+    folders INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_root ON snapshots (root, created);
+"""
+
+
+class StoredSnapshot:
+    def __init__(self, id, root, label, created, tree, folders):
+        self.id = id
+        self.root = root
+        self.label = label
+        self.created = created
+        self.tree = tree
+        self.folders = folders
+        # Set by HistoryStore.add: objects this snapshot added to the store
+        self.new_objects = 0
+
+    def summary(self):
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+        text = f"{self.id:>5}  {when}  {self.folders:>10,} folders  {self.root}"
+        if self.label:
+            text += f"  [{self.label}]"
+        return text
+
+
+class PruneResult:
+    def __init__(self):
+        self.removed = []
+        self.kept = []
+        self.freed_objects = 0
+        self.freed_bytes = 0
+
+    def summary(self):
+        return (f"Removed {len(self.removed):,} snapshots, kept {len(self.kept):,}; "
+                f"freed {self.freed_objects:,} objects ({self.freed_bytes:,} bytes)")
+
+
+def _encode(children):
+    parts = []
+    for name, digest in children:
+        data = name.encode("utf-8", "surrogatepass")
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+        parts.append(digest)
+    return b"".join(parts)
+
+
+def _decode(data):
+    children = []
+    offset = 0
+    end = len(data)
+    unpack = _LENGTH.unpack_from
+    while offset < end:
+        (length,) = unpack(data, offset)
+        offset += 4
+        name = data[offset:offset + length].decode("utf-8", "surrogatepass")
+        offset += length
+        children.append((name, data[offset:offset + DIGEST_SIZE]))
+        offset += DIGEST_SIZE
+    return children
+
+
+def _keyed(children):
+    # Children keyed as diff._child_map keys them: a repeated sibling name
+    # becomes ("a", 1), ("a", 2), ... so every occurrence has its own path
+    keyed = {}
+    for name, child in children:
+        if name in keyed:
+            count = 1
+            while (name, count) in keyed:
+                count += 1
+            keyed[(name, count)] = child
+        else:
+            keyed[name] = child
+    return keyed
+
+
+def _names(path):
+    return tuple(map(_key_name, path))
+
+
+def retained(snapshots, keep_last=0, keep_daily=0, keep_weekly=0, keep_monthly=0):
+    """Ids of the snapshots a retention policy keeps.
+
+    keep_last keeps the newest snapshots; keep_daily, keep_weekly and
+    keep_monthly keep the newest snapshot of each of that many most recent
+    days, ISO weeks and months that have one. A snapshot kept by any rule is
+    kept. Apply it per root.
+    """
+    ordered = sorted(snapshots, key=lambda s: (s.created, s.id), reverse=True)
+    keep = {s.id for s in ordered[:keep_last]}
+    for count, period in ((keep_daily, "%Y-%m-%d"), (keep_weekly, "%G-W%V"),
+                          (keep_monthly, "%Y-%m")):
+        seen = set()
+        for snapshot in ordered:
+            if len(seen) >= count:
+                break
+            key = time.strftime(period, time.localtime(snapshot.created))
+            if key not in seen:
+                seen.add(key)
+                keep.add(snapshot.id)
+    return keep
+
+
+class HistoryStore:
+    """Local history of structure snapshots with shared, deduplicated subtrees.
+
+    Every folder is stored as a content-addressed object listing its
+    children, so a new snapshot only adds the folders whose subtree changed
+    since any stored one. diff() descends from both roots and stops at
+    equal digests, so its cost follows the changed region, not the tree
+    size. Snapshots are removed with remove() or prune(); objects no
+    snapshot reaches any more are deleted through their reference counts.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        # Must precede the first table for prune() to give pages back
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def _snapshot(self, row):
+        return StoredSnapshot(*row)
+
+    def snapshots(self, root=None):
+        # Oldest first
+        query = "SELECT id, root, label, created, tree, folders FROM snapshots"
+        if root is None:
+            rows = self._db.execute(query + " ORDER BY created, id")
+        else:
+            rows = self._db.execute(query + " WHERE root = ? ORDER BY created, id", (root,))
+        return [self._snapshot(row) for row in rows]
+
+    def get(self, snapshot_id):
+        row = self._db.execute("SELECT id, root, label, created, tree, folders FROM snapshots "
+                               "WHERE id = ?", (snapshot_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no snapshot {snapshot_id}")
+        return self._snapshot(row)
+
+    def add(self, root, entries, label=None, created=None):
+        """Store a (depth, name) pre-order stream as a snapshot of root.
+
+        Only the open path of the stream is held in memory; each folder is
+        written as it closes, children before parents, all in one
+        transaction. Returns the StoredSnapshot.
+        """
+        db = self._db
+        new_objects = 0
+
+        def store(children, size):
+            nonlocal new_objects
+            data = _encode(children)
+            digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).digest()
+            cursor = db.execute("INSERT OR IGNORE INTO objects VALUES (?, ?, 0, ?)",
+                                (digest, size, data))
+            if cursor.rowcount:
+                # Only a new object adds references to its children
+                new_objects += 1
+                db.executemany("UPDATE objects SET refs = refs + 1 WHERE hash = ?",
+                               [(child,) for _, child in children])
+            return digest
+
+        with db:
+            # Open path as [name, children, folder count below] per depth;
+            # index 0 is the root itself
+            stack = [[None, [], 0]]
+            for depth, name in entries:
+                if depth < len(stack) - 1:
+                    while len(stack) > depth + 1:
+                        folder, children, size = stack.pop()
+                        parent = stack[-1]
+                        parent[1].append((folder, store(children, size)))
+                        parent[2] += size + 1
+                stack.append([name, [], 0])
+            while len(stack) > 1:
+                folder, children, size = stack.pop()
+                parent = stack[-1]
+                parent[1].append((folder, store(children, size)))
+                parent[2] += size + 1
+            _, children, folders = stack[0]
+            tree = store(children, folders)
+            db.execute("UPDATE objects SET refs = refs + 1 WHERE hash = ?", (tree,))
+            created = time.time() if created is None else created
+            cursor = db.execute("INSERT INTO snapshots (root, label, created, tree, folders) "
+                                "VALUES (?, ?, ?, ?, ?)", (root, label, created, tree, folders))
+        snapshot = StoredSnapshot(cursor.lastrowid, root, label, created, tree, folders)
+        snapshot.new_objects = new_objects
+        return snapshot
+
+    def add_tree(self, root, tree, label=None, created=None):
+        return self.add(root, tree.iter_entries(), label, created)
+
+    def _object(self, digest, cache):
+        found = cache.get(digest)
+        if found is None:
+            row = self._db.execute("SELECT size, data FROM objects WHERE hash = ?",
+                                   (digest,)).fetchone()
+            if row is None:
+                raise ValueError(f"{self.path}: object {digest.hex()} is missing")
+            found = cache[digest] = (row[0], _decode(row[1]))
+        return found
+
+    def iter_entries(self, snapshot_id):
+        # (depth, name) pre-order of a stored snapshot
+        cache = {}
+        tree = self.get(snapshot_id).tree
+        stack = [iter(self._object(tree, cache)[1])]
+        while stack:
+            for name, digest in stack[-1]:
+                yield len(stack) - 1, name
+                stack.append(iter(self._object(digest, cache)[1]))
+                break
+            else:
+                stack.pop()
+
+    def to_tree(self, snapshot_id):
+        tree = StructureTree()
+        tree.extend(self.iter_entries(snapshot_id))
+        return tree
+
+    def diff(self, old_id, new_id, detect_moves=True):
+        """TreeDiff between two stored snapshots, as diff_trees reports it.
+
+        Subtrees with equal digests are never opened. Moves are found by
+        matching removed folders against the added ones by name and
+        content; only the changed subtrees are read for that.
+        """
+        old = self.get(old_id)
+        new = self.get(new_id)
+        cache = {}
+        result = TreeDiff()
+        result.left_count = old.folders
+        result.right_count = new.folders
+        if old.tree == new.tree:
+            return result
+
+        # (digest, path) of the topmost folders present on one side only;
+        # paths hold _keyed keys until they are reported
+        removed = []
+        added = []
+        stack = [(old.tree, new.tree, ())]
+        while stack:
+            left, right, path = stack.pop()
+            result.compared += 1
+            left_children = _keyed(self._object(left, cache)[1])
+            right_children = _keyed(self._object(right, cache)[1])
+            for key, left_child in left_children.items():
+                right_child = right_children.get(key)
+                if right_child is None:
+                    removed.append((left_child, path + (key,)))
+                elif left_child != right_child:
+                    stack.append((left_child, right_child, path + (key,)))
+            for key, right_child in right_children.items():
+                if key not in left_children:
+                    added.append((right_child, path + (key,)))
+
+        moved_left = set()
+        moved_right = set()
+        partial_left = set()
+        partial_right = set()
+        if detect_moves and removed and added:
+            self._detect_moves(removed, added, cache, result.moved, moved_left, moved_right,
+                               partial_left, partial_right)
+        result.removed = self._collect(removed, cache, moved_left, partial_left)
+        result.added = self._collect(added, cache, moved_right, partial_right)
+        result.removed.sort()
+        result.added.sort()
+        result.moved.sort()
+        return result
+
+    def _walk(self, digest, path, cache):
+        stack = [(digest, path)]
+        while stack:
+            digest, path = stack.pop()
+            yield digest, path
+            for key, child in _keyed(self._object(digest, cache)[1]).items():
+                stack.append((child, path + (key,)))
+
+    def _detect_moves(self, removed, added, cache, moved, moved_left, moved_right,
+                      partial_left, partial_right):
+        # Same matching as diff._detect_moves, on (name, digest) instead of
+        # subtree hashes and on paths instead of node ids
+        candidates = {}
+        for digest, path in added:
+            for child, child_path in self._walk(digest, path, cache):
+                candidates.setdefault((_key_name(child_path[-1]), child), []).append(child_path)
+
+        def available(path):
+            if path in moved_right or path in partial_right:
+                return False
+            return not any(path[:i] in moved_right for i in range(1, len(path)))
+
+        for digest, path in removed:
+            stack = [(digest, path)]
+            while stack:
+                current, current_path = stack.pop()
+                match = None
+                pool = candidates.get((_key_name(current_path[-1]), current))
+                while pool:
+                    target = pool.pop()
+                    if available(target):
+                        match = target
+                        break
+                if match is None:
+                    for key, child in _keyed(self._object(current, cache)[1]).items():
+                        stack.append((child, current_path + (key,)))
+                    continue
+                moved.append((_names(current_path), _names(match),
+                              self._object(current, cache)[0] + 1))
+                moved_left.add(current_path)
+                moved_right.add(match)
+                partial_left.update(current_path[:i] for i in range(1, len(current_path)))
+                partial_right.update(match[:i] for i in range(1, len(match)))
+
+    def _collect(self, roots, cache, moved, partial):
+        result = []
+        for digest, path in roots:
+            stack = [(digest, path)]
+            while stack:
+                current, current_path = stack.pop()
+                if current_path in moved:
+                    continue
+                size, children = self._object(current, cache)
+                if current_path in partial:
+                    result.append((_names(current_path), 1))
+                    for key, child in _keyed(children).items():
+                        stack.append((child, current_path + (key,)))
+                else:
+                    result.append((_names(current_path), size + 1))
+        return result
+
+    def _release(self, digest, result):
+        # Drop one reference; objects nobody points at go, with their children
+        db = self._db
+        stack = [digest]
+        while stack:
+            digest = stack.pop()
+            db.execute("UPDATE objects SET refs = refs - 1 WHERE hash = ?", (digest,))
+            row = db.execute("SELECT refs, data FROM objects WHERE hash = ?",
+                             (digest,)).fetchone()
+            if row is None or row[0] > 0:
+                continue
+            db.execute("DELETE FROM objects WHERE hash = ?", (digest,))
+            if result is not None:
+                result.freed_objects += 1
+                result.freed_bytes += len(row[1]) + DIGEST_SIZE
+            stack.extend(child for _, child in _decode(row[1]))
+
+    def remove(self, snapshot_id, result=None):
+        snapshot = self.get(snapshot_id)
+        with self._db:
+            self._db.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+            self._release(snapshot.tree, result)
+        self._vacuum()
+        return snapshot
+
+    def prune(self, keep_last=0, keep_daily=0, keep_weekly=0, keep_monthly=0, root=None,
+              dry_run=False):
+        """Remove the snapshots no retention rule keeps, per root.
+
+        With no rule at all nothing is removed. Returns a PruneResult; in a
+        dry run it lists what would go but frees nothing.
+        """
+        result = PruneResult()
+        by_root = {}
+        for snapshot in self.snapshots(root):
+            by_root.setdefault(snapshot.root, []).append(snapshot)
+        rules = (keep_last, keep_daily, keep_weekly, keep_monthly)
+        for snapshots in by_root.values():
+            keep = (retained(snapshots, *rules) if any(rules)
+                    else {s.id for s in snapshots})
+            for snapshot in snapshots:
+                (result.kept if snapshot.id in keep else result.removed).append(snapshot)
+        if dry_run or not result.removed:
+            return result
+        with self._db:
+            for snapshot in result.removed:
+                self._db.execute("DELETE FROM snapshots WHERE id = ?", (snapshot.id,))
+                self._release(snapshot.tree, result)
+        self._vacuum()
+        return result
+
+    def _vacuum(self):
+        # Return the pages of deleted objects to the file system
+        self._db.execute("PRAGMA incremental_vacuum").fetchall()
+
+
+def history_root(path):
+    # Snapshots of the same folder are grouped under this key
+    return os.path.normcase(os.path.abspath(path))
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import time
+
+from .replicate import CHUNK_SIZE, CREATED, DEFAULT_WORKERS, EXISTING
+
+REMOVED = 1
+GONE = 0
+
+# Journal files are line-oriented UTF-8:
+#
+#   # structify replication journal 1
+#   # destination "/abs/dest"
+#   C "a/b"          created by this replication
+#   E "a"            already existed, never removed by a rollback
+#   R "a/b"          removed by a rollback
+#   # complete       every folder was made; the next run starts afresh
+#
+# Paths are JSON strings relative to the destination; the last record of a
+# path wins. Records are appended as each chunk of folders finishes and the
+# file is synced after every level, so a crash loses at most the folders
+# in flight, which a rerun finds as existing.
+
+MAGIC = "# structify replication journal 1"
+COMPLETE = "# complete"
+
+
+class ReplicationJournal:
+    """Append-only record of one replication, shared by its resumed runs.
+
+    Opening the journal of an unfinished replication resumes it: done()
+    reports the folders an earlier run already made (or found), which
+    replicate_tree and replicate_entries then skip without touching the
+    disk. The journal of a finished replication is started over.
+    """
+
+    def __init__(self, path, destination):
+        self.path = path
+        self.destination = os.path.abspath(destination)
+        self.completed = set()
+        self.created = set()
+        self.resumed = False
+        self._prefix = len(os.path.join(destination, ""))
+        previous = None
+        if os.path.exists(path):
+            previous, finished, self.completed, self.created = read_journal(path)
+            if previous != self.destination:
+                raise ValueError(f"{path} is the journal of a replication into {previous}")
+            if finished:
+                self.completed = set()
+                self.created = set()
+            self.resumed = bool(self.completed)
+        if self.resumed:
+            self._file = _open_append(path)
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._file.write(f"{MAGIC}\n# destination {json.dumps(self.destination)}\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def done(self, path):
+        return path[self._prefix:] in self.completed
+
+    def record(self, path, status):
+        if status == CREATED:
+            code = "C"
+        elif status == EXISTING:
+            code = "E"
+        else:
+            return
+        self._file.write(f"{code} {json.dumps(path[self._prefix:], ensure_ascii=False)}\n")
+
+    def flush(self):
+        self._file.flush()
+
+    def checkpoint(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def finish(self, result):
+        # Marks the replication done unless folders are still missing
+        if not result.failed and not result.skipped:
+            self._file.write(f"{COMPLETE}\n")
+        self.checkpoint()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def journal_path_for(journal_dir, destination):
+    # One journal per destination folder, for callers that keep them together
+    key = os.path.normcase(os.path.abspath(destination)).encode("utf-8", "surrogateescape")
+    return os.path.join(journal_dir, hashlib.sha1(key).hexdigest()[:16] + ".journal")
+
+
+def _open_append(path):
+    # A crash can leave the last record without its newline
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        torn = f.read(1) != b"\n"
+    f = open(path, "a", encoding="utf-8")
+    if torn:
+        f.write("\n")
+    return f
+
+
+def read_journal(path):
+    """(destination, finished, completed paths, created paths) of a journal."""
+    completed = set()
+    created = set()
+    finished = False
+    with open(path, encoding="utf-8") as f:
+        if f.readline().rstrip("\n") != MAGIC:
+            raise ValueError(f"{path} is not a replication journal")
+        header = f.readline().rstrip("\n")
+        if not header.startswith("# destination "):
+            raise ValueError(f"{path} has no destination line")
+        destination = json.loads(header[len("# destination "):])
+        for number, line in enumerate(f, 3):
+            line = line.rstrip("\n")
+            if line == COMPLETE:
+                finished = True
+                continue
+            code, _, text = line.partition(" ")
+            try:
+                rel = json.loads(text)
+            except ValueError:
+                # A line torn by a crash; the records around it still count
+                continue
+            if code == "C":
+                completed.add(rel)
+                created.add(rel)
+            elif code == "E":
+                completed.add(rel)
+            elif code == "R":
+                completed.discard(rel)
+                created.discard(rel)
+            else:
+                raise ValueError(f"{path}:{number}: unknown record {code!r}")
+    return destination, finished, completed, created
+
+
+class RollbackResult:
+    def __init__(self, destination):
+        self.destination = destination
+        self.removed = 0
+        self.missing = 0
+        self.failed = []
+        self.elapsed = 0.0
+
+    def summary(self):
+        text = f"Removed: {self.removed:,}\nFailed: {len(self.failed):,}"
+        if self.missing:
+            text += f"\nAlready gone: {self.missing:,}"
+        return text + f"\n{self.elapsed:.2f} s"
+
+
+def _remove_dirs(paths):
+    statuses = []
+    for path in paths:
+        try:
+            os.rmdir(path)
+            statuses.append(REMOVED)
+        except FileNotFoundError:
+            statuses.append(GONE)
+        except OSError as e:
+            statuses.append(e.strerror or str(e))
+    return statuses
+
+
+def rollback(journal_path, workers=DEFAULT_WORKERS):
+    """Remove the folders a journaled replication created, deepest first.
+
+    Each depth is removed concurrently in chunks, like replicate_tree
+    creates them. Only empty folders go: anything that was put into a
+    created folder since keeps it (and its parents) in place and is
+    reported as failed. The journal is deleted once nothing is left to undo.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    destination, _, _, created = read_journal(journal_path)
+    result = RollbackResult(destination)
+    start = time.perf_counter()
+    levels = {}
+    for rel in created:
+        levels.setdefault(rel.count(os.sep), []).append(rel)
+    join = os.path.join
+    with _open_append(journal_path) as journal, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for depth in sorted(levels, reverse=True):
+            level = levels[depth]
+            chunks = [level[i:i + CHUNK_SIZE] for i in range(0, len(level), CHUNK_SIZE)]
+            futures = [pool.submit(_remove_dirs, [join(destination, rel) for rel in chunk])
+                       for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                for rel, status in zip(chunk, future.result()):
+                    if status == REMOVED or status == GONE:
+                        if status == REMOVED:
+                            result.removed += 1
+                        else:
+                            result.missing += 1
+                        journal.write(f"R {json.dumps(rel, ensure_ascii=False)}\n")
+                    else:
+                        result.failed.append((join(destination, rel), status))
+            journal.flush()
+    if not result.failed:
+        os.remove(journal_path)
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,223 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from .scanner import DEFAULT_WORKERS, ScanNode, filtered_expand, list_children
+from .tree import StructureTree
+
+# Listings one root may have in flight at once, so a slow mount cannot tie
+# up the whole pool
+DEFAULT_PER_ROOT = 8
+
+
+class RootScan:
+    """Outcome of one root of a multi-root scan."""
+
+    def __init__(self, root):
+        self.root = root
+        self.tree = None
+        self.listed = 0
+        # Directories below the root that could not be listed
+        self.unreadable = 0
+        self.error = None
+        self.started = None
+        self.elapsed = 0.0
+
+    @property
+    def folders(self):
+        return len(self.tree) if self.tree is not None else 0
+
+    @property
+    def rate(self):
+        return self.listed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        if self.error:
+            return f"{self.root}: {self.error}"
+        text = (f"{self.root}: {self.folders:,} folders in {self.elapsed:.2f} s "
+                f"({self.rate:,.0f} dirs/s)")
+        if self.unreadable:
+            text += f", {self.unreadable:,} unreadable"
+        return text
+
+
+class _Root:
+    __slots__ = ("result", "path", "expand", "node", "shared", "active", "cap", "scan_filter")
+
+    def __init__(self, path, cap, scan_filter):
+        self.result = RootScan(path)
+        self.path = path
+        self.expand = (filtered_expand(path, scan_filter)
+                       if scan_filter is not None and scan_filter.active else list_children)
+        self.scan_filter = scan_filter
+        self.node = ScanNode("")
+        # Directories waiting for any worker; workers pop their own work
+        # from the end of a local stack and take shared work from the front
+        self.shared = deque([(path, self.node)])
+        self.active = 0
+        self.cap = cap
+
+
+class MultiRootScan:
+    """Scan many roots on one shared pool of listing threads.
+
+    Every worker walks the subtree it picked up on a local stack and hands
+    its oldest pending directories back to the root's shared queue whenever
+    other workers are idle, as walk_nodes does for one root. An idle worker
+    takes work from the roots in turn, skipping any root that already has
+    per_root listings in flight, so a slow mount cannot starve the rest.
+
+    Iterating yields a RootScan for every root as soon as that root is
+    done, in completion order; listed, elapsed, rate and progress() give
+    the throughput of the whole pool, also while it is running.
+    """
+
+    def __init__(self, roots, workers=DEFAULT_WORKERS, per_root=DEFAULT_PER_ROOT,
+                 scan_filter=None, cancel=None):
+        self.roots = [_Root(root, max(1, per_root), scan_filter) for root in roots]
+        self.workers = max(1, workers)
+        self.cancel = cancel
+        self.listed = 0
+        self.started = None
+        self.elapsed = 0.0
+        self._lock = threading.Condition()
+        self._idle = 0
+        self._next = 0
+        self._remaining = len(self.roots)
+        self._finished = queue.Queue()
+        self._stop = threading.Event()
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        if not elapsed and self.started is not None:
+            elapsed = time.perf_counter() - self.started
+        return self.listed / elapsed if elapsed else 0.0
+
+    def progress(self):
+        # (root, directories listed, listings in flight, done) per root
+        with self._lock:
+            return [(root.path, root.result.listed, root.active, root.result.tree is not None)
+                    for root in self.roots]
+
+    def _take(self):
+        # The next shared directory of a root below its cap, or None to stop
+        with self._lock:
+            while not self._stop.is_set():
+                count = len(self.roots)
+                for offset in range(count):
+                    root = self.roots[(self._next + offset) % count]
+                    if root.shared and root.active < root.cap:
+                        self._next = (self._next + offset + 1) % count
+                        root.active += 1
+                        if root.result.started is None:
+                            root.result.started = time.perf_counter()
+                        return root, root.shared.popleft()
+                if not self._remaining:
+                    return None
+                self._idle += 1
+                self._lock.wait(0.05)
+                self._idle -= 1
+            return None
+
+    def _release(self, root, listed, unreadable):
+        with self._lock:
+            root.active -= 1
+            root.result.listed += listed
+            root.result.unreadable += unreadable
+            self.listed += listed
+            if not root.active and not root.shared:
+                root.result.elapsed = time.perf_counter() - root.result.started
+                self._remaining -= 1
+                self._finished.put(root)
+                self._lock.notify_all()
+
+    def _work(self):
+        join = os.path.join
+        while True:
+            task = self._take()
+            if task is None:
+                return
+            root, item = task
+            expand = root.expand
+            local = [item]
+            listed = 0
+            unreadable = 0
+            while local and not self._stop.is_set():
+                path, node = local.pop()
+                try:
+                    children = expand(path, node)
+                except OSError as e:
+                    children = None
+                    if node is root.node:
+                        root.result.error = e.strerror or str(e)
+                    else:
+                        unreadable += 1
+                node.children = children
+                listed += 1
+                if children:
+                    for child in reversed(children):
+                        local.append((join(path, child.name), child))
+                if len(local) > 1 and self._idle and root.active < root.cap:
+                    with self._lock:
+                        share = min(len(local) - 1, self._idle)
+                        root.shared.extend(local[:share])
+                        del local[:share]
+                        self._lock.notify(share)
+            self._release(root, listed, unreadable)
+
+    def _build(self, root):
+        def entries():
+            # Sorted pre-order; unreadable folders are left out like in walk_nodes
+            stack = [(child, 0) for child in reversed(root.node.children or ())]
+            while stack:
+                node, depth = stack.pop()
+                if node.children is None:
+                    continue
+                yield depth, node.name
+                for child in reversed(node.children):
+                    stack.append((child, depth + 1))
+
+        scan_filter = root.scan_filter
+        tree = StructureTree()
+        if scan_filter is not None and scan_filter.active:
+            tree.extend(scan_filter.select(entries()))
+        else:
+            tree.extend(entries())
+        root.node = None
+        root.result.tree = tree
+        return root.result
+
+    def __iter__(self):
+        self.started = time.perf_counter()
+        # More threads than all caps together could never be busy
+        count = max(1, min(self.workers, sum(root.cap for root in self.roots)))
+        threads = [threading.Thread(target=self._work, daemon=True) for _ in range(count)]
+        for t in threads:
+            t.start()
+        try:
+            done = 0
+            while done < len(self.roots):
+                if self.cancel is not None and self.cancel.is_set():
+                    return
+                try:
+                    root = self._finished.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                done += 1
+                yield self._build(root)
+        finally:
+            self._stop.set()
+            with self._lock:
+                self._lock.notify_all()
+            for t in threads:
+                t.join()
+            self.elapsed = time.perf_counter() - self.started
+
+
+def scan_roots(roots, workers=DEFAULT_WORKERS, per_root=DEFAULT_PER_ROOT, scan_filter=None,
+               cancel=None):
+    # RootScan per root in completion order; see MultiRootScan
+    return iter(MultiRootScan(roots, workers, per_root, scan_filter, cancel))
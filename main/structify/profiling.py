@@ -0,0 +1,183 @@
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Phase names used across the CLI and the GUI
+WALK = "walk"
+PARSE = "parse"
+BUILD = "build"
+DIFF = "diff"
+RENDER = "render"
+WRITE = "write"
+MKDIR = "mkdir"
+RMDIR = "rmdir"
+
+PROFILE_TOP = 30
+MEMORY_TOP = 15
+
+
+class Timings:
+    """Phase timings and counters for one operation (a scan, a diff, ...).
+
+    Phases are exclusive: time spent in a nested phase, or inside an
+    iterator wrapped with iterate(), is not charged to the enclosing phase
+    as well. A disabled instance costs nothing: phase() and iterate() hand
+    back plain no-ops. Phases may be timed from several threads.
+    """
+
+    def __init__(self, operation, enabled=True, **info):
+        self.operation = operation
+        self.enabled = enabled
+        self.info = info
+        self.started = time.time()
+        self.phases = {}
+        self.counters = {}
+        self.wall = None
+        # Filled in by profiled()
+        self.profile = None
+        self.memory = None
+        self._start = time.perf_counter()
+        self._local = threading.local()
+
+    def _open(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add(self, phase, seconds):
+        if self.enabled:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, counter, amount=1):
+        if self.enabled:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        stack = self._open()
+        # [start, seconds spent in nested phases]
+        frame = [time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.add(name, elapsed - frame[1])
+            if stack:
+                stack[-1][1] += elapsed
+
+    def iterate(self, iterable, phase, counter=None):
+        """Wrap iterable, charging the time spent producing items to phase."""
+        if not self.enabled:
+            return iterable
+        return self._iterate(iterable, phase, counter)
+
+    def _iterate(self, iterable, phase, counter):
+        clock = time.perf_counter
+        it = iter(iterable)
+        spent = 0.0
+        items = 0
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    spent += clock() - start
+                    break
+                spent += clock() - start
+                items += 1
+                yield item
+        finally:
+            self.add(phase, spent)
+            stack = self._open()
+            if stack:
+                stack[-1][1] += spent
+            if counter is not None:
+                self.count(counter, items)
+
+    def finish(self):
+        if self.wall is None:
+            self.wall = time.perf_counter() - self._start
+        return self
+
+    def summary(self):
+        # One line for a status bar or stderr
+        parts = [f"{name} {seconds:.3f} s" for name, seconds in self.phases.items()]
+        parts += [f"{name} {value:,}" for name, value in self.counters.items()]
+        if self.memory is not None:
+            parts.append(f"peak memory {self.memory['peak_bytes'] / (1 << 20):.1f} MB")
+        wall = f" in {self.wall:.3f} s" if self.wall is not None else ""
+        return f"{self.operation}{wall}: " + (", ".join(parts) or "no phases")
+
+    def to_dict(self):
+        data = {
+            "operation": self.operation,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "wall_seconds": self.wall,
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+        if self.info:
+            data["info"] = dict(self.info)
+        if self.profile is not None:
+            data["profile"] = self.profile
+        if self.memory is not None:
+            data["memory"] = self.memory
+        return data
+
+
+def dump_timings(timings, path):
+    # One Timings or a list of them as JSON
+    data = timings.to_dict() if isinstance(timings, Timings) else [t.to_dict() for t in timings]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+@contextmanager
+def profiled(timings, profile=False, trace_memory=False, profile_path=None):
+    """Run the block under cProfile and/or tracemalloc.
+
+    The top functions by cumulative time and the peak traced memory with
+    the largest allocation sites are stored on timings; profile_path also
+    receives the raw cProfile data for snakeviz/pstats. cProfile only sees
+    the calling thread; tracemalloc covers every thread.
+    """
+    profiler = None
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield timings
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            import pstats
+            out = io.StringIO()
+            stats = pstats.Stats(profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+            timings.profile = out.getvalue()
+            if profile_path:
+                stats.dump_stats(profile_path)
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:MEMORY_TOP]
+            tracemalloc.stop()
+            timings.memory = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [{"where": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                        for stat in top],
+            }
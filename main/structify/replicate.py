@@ -0,0 +1,251 @@
+import itertools
+import os
+import time
+from array import array
+
+from .tree import ROOT
+
+DEFAULT_WORKERS = 16
+CHUNK_SIZE = 256
+# Folders read from an entry stream before they are created
+STREAM_WINDOW = 8192
+
+CREATED = 1
+EXISTING = 0
+SKIPPED = -1
+
+
+class ReplicationResult:
+    def __init__(self, destination, dry_run=False):
+        self.destination = destination
+        self.dry_run = dry_run
+        # In a dry run "created" counts folders that would be created
+        self.created = 0
+        self.existing = 0
+        self.failed = []
+        self.skipped = 0
+        # Folders a journal showed as done by an earlier, interrupted run
+        self.resumed = 0
+        self.planned = []
+        self.elapsed = 0.0
+
+    @property
+    def total(self):
+        return self.created + self.existing + len(self.failed) + self.skipped + self.resumed
+
+    @property
+    def rate(self):
+        return (self.created + self.existing) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        verb = "Would create" if self.dry_run else "Created"
+        text = (f"{verb}: {self.created:,}\n"
+                f"Already existing: {self.existing:,}\n"
+                f"Failed: {len(self.failed):,}")
+        if self.skipped:
+            text += f"\nSkipped (parent failed): {self.skipped:,}"
+        if self.resumed:
+            text += f"\nDone by an earlier run: {self.resumed:,}"
+        text += f"\n{self.elapsed:.2f} s, {self.rate:,.0f} folders/s"
+        return text
+
+
+def _make_dirs(paths):
+    statuses = []
+    for path in paths:
+        try:
+            os.mkdir(path)
+            statuses.append(CREATED)
+        except FileExistsError:
+            statuses.append(EXISTING if os.path.isdir(path) else "Exists and is not a folder")
+        except OSError as e:
+            statuses.append(e.strerror or str(e))
+    return statuses
+
+
+def _probe_dirs(paths):
+    statuses = []
+    for path in paths:
+        if os.path.isdir(path):
+            statuses.append(EXISTING)
+        elif os.path.lexists(path):
+            statuses.append("Exists and is not a folder")
+        else:
+            statuses.append(CREATED)
+    return statuses
+
+
+def _levels(tree):
+    levels = []
+    depth = tree.depth
+    for node in tree.iter_nodes():
+        level = depth[node]
+        if level == len(levels):
+            levels.append(array("i"))
+        levels[level].append(node)
+    return levels
+
+
+def replicate_tree(tree, destination, workers=DEFAULT_WORKERS, dry_run=False, journal=None):
+    """Create every folder of tree under destination.
+
+    Folders are created level by level, so a parent always exists before its
+    children, and each level is split into chunks that run concurrently on a
+    thread pool. Every folder costs exactly one mkdir (or one stat in a dry
+    run); children of a failed folder are skipped.
+
+    With a ReplicationJournal (structify.journal) every finished folder is
+    recorded, and folders the journal already has from an interrupted run
+    are skipped without any system call.
+    """
+    # concurrent.futures pulls in logging; keep it off the CLI startup path
+    from concurrent.futures import ThreadPoolExecutor
+
+    if dry_run and journal is not None:
+        raise ValueError("a dry run cannot be journaled")
+
+    result = ReplicationResult(destination, dry_run)
+    start = time.perf_counter()
+    parent_of = tree.parent
+    names = tree.names
+    name_id = tree.name_id
+    join = os.path.join
+    # Folder path for every node of the previous level that now exists
+    paths = {ROOT: destination}
+    # Dry run only: nodes that would be created, whose children need no stat
+    new_nodes = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for level in _levels(tree):
+            items = []
+            known_new = []
+            resumed = []
+            for node in level:
+                parent = parent_of[node]
+                parent_path = paths.get(parent)
+                if parent_path is None:
+                    result.skipped += 1
+                    continue
+                path = join(parent_path, names[name_id[node]])
+                if journal is not None and journal.done(path):
+                    result.resumed += 1
+                    resumed.append((node, path))
+                elif dry_run and parent in new_nodes:
+                    known_new.append((node, path))
+                else:
+                    items.append((node, path))
+
+            task = _probe_dirs if dry_run else _make_dirs
+            chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+            futures = [pool.submit(task, [path for _, path in chunk]) for chunk in chunks]
+            outcomes = [(node, path, CREATED) for node, path in known_new]
+            for chunk, future in zip(chunks, futures):
+                statuses = future.result()
+                if journal is not None:
+                    for (_, path), status in zip(chunk, statuses):
+                        journal.record(path, status)
+                    journal.flush()
+                outcomes.extend((node, path, status)
+                                for (node, path), status in zip(chunk, statuses))
+            if journal is not None:
+                journal.checkpoint()
+
+            next_paths = dict(resumed)
+            next_new = set()
+            for node, path, status in outcomes:
+                if status == CREATED:
+                    result.created += 1
+                    next_paths[node] = path
+                    if dry_run:
+                        next_new.add(node)
+                        result.planned.append(path)
+                elif status == EXISTING:
+                    result.existing += 1
+                    next_paths[node] = path
+                else:
+                    result.failed.append((path, status))
+            paths = next_paths
+            new_nodes = next_new
+    if journal is not None:
+        journal.finish(result)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def replicate_entries(entries, destination, workers=DEFAULT_WORKERS, dry_run=False, journal=None):
+    """Create folders from a (depth, name) pre-order stream under destination.
+
+    The structure is never held as a whole: entries are read in windows of
+    STREAM_WINDOW folders and each window is created level by level on the
+    thread pool, as replicate_tree does for a whole tree. Between windows
+    only the open path of the stream is kept. journal works as for
+    replicate_tree.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if dry_run and journal is not None:
+        raise ValueError("a dry run cannot be journaled")
+
+    result = ReplicationResult(destination, dry_run)
+    start = time.perf_counter()
+    join = os.path.join
+    entries = iter(entries)
+    # Open path as (folder path, state) per depth; state is a one-item list
+    # that receives the folder's status once its level has run
+    stack = [(destination, [EXISTING])]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while True:
+            window = list(itertools.islice(entries, STREAM_WINDOW))
+            if not window:
+                break
+            levels = []
+            for depth, name in window:
+                if depth < len(stack) - 1:
+                    del stack[depth + 1:]
+                else:
+                    depth = len(stack) - 1
+                parent_path, parent_state = stack[depth]
+                path = join(parent_path, name)
+                state = [None]
+                stack.append((path, state))
+                while len(levels) <= depth:
+                    levels.append([])
+                levels[depth].append((path, state, parent_state))
+
+            task = _probe_dirs if dry_run else _make_dirs
+            for level in levels:
+                items = []
+                for path, state, parent_state in level:
+                    parent_status = parent_state[0]
+                    if parent_status != CREATED and parent_status != EXISTING:
+                        state[0] = SKIPPED
+                        result.skipped += 1
+                    elif journal is not None and journal.done(path):
+                        state[0] = EXISTING
+                        result.resumed += 1
+                    elif dry_run and parent_status == CREATED:
+                        state[0] = CREATED
+                        result.created += 1
+                        result.planned.append(path)
+                    else:
+                        items.append((path, state))
+                chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+                futures = [pool.submit(task, [path for path, _ in chunk]) for chunk in chunks]
+                for chunk, future in zip(chunks, futures):
+                    for (path, state), status in zip(chunk, future.result()):
+                        state[0] = status
+                        if journal is not None:
+                            journal.record(path, status)
+                        if status == CREATED:
+                            result.created += 1
+                            if dry_run:
+                                result.planned.append(path)
+                        elif status == EXISTING:
+                            result.existing += 1
+                        else:
+                            result.failed.append((path, status))
+                if journal is not None:
+                    journal.checkpoint()
+    if journal is not None:
+        journal.finish(result)
+    result.elapsed = time.perf_counter() - start
+    return result
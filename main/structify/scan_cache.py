@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+from .scanner import DEFAULT_WORKERS, ScanNode, _list_subdirs, filtered_expand, walk_nodes
+from .tree import StructureTree
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ROOTS = 20
+# Directories modified this close to the scan may change again within the
+# same mtime tick, so they are not trusted on the next rescan.
+RACY_WINDOW_NS = 2_000_000_000
+INDEX_FILE = "index.json"
+
+# Cache files are plain columns, never code, all little-endian:
+#
+#   header      MAGIC, version, key size, node count, name count, blob size
+#   key         UTF-8 root key the file belongs to
+#   depth       int16 per node below the root, pre-order
+#   name_id     int32 per node below the root
+#   mtime       int64 per node including the root (-1: not trusted)
+#   ino         uint64 per node including the root
+#   name_start  int64 per name + 1, offsets into the blob
+#   blob        UTF-8 names, back to back
+MAGIC = b"STRSCAN\0"
+_HEADER = struct.Struct("<8sIIIIQ")
+# Lone surrogates stand for undecodable bytes in POSIX file names
+_ENCODING = ("utf-8", "surrogatepass")
+
+
+class CachedScan:
+    # A previous scan of one root: a StructureTree plus mtime/inode per node
+    # (node 0 is the root folder itself).
+    def __init__(self, tree, mtime, ino):
+        self.tree = tree
+        self.mtime = mtime
+        self.ino = ino
+
+    def child_nodes(self, old):
+        tree = self.tree
+        return [ScanNode(tree.name(child), child) for child in tree.children(old)]
+
+    def child_ids(self, old):
+        tree = self.tree
+        return {tree.name(child): child for child in tree.children(old)}
+
+
+class ScanStats:
+    def __init__(self):
+        self.listed = 0
+        self.reused = 0
+        self.cached = False
+
+
+def _write_columns(path, key, names, depth, name_id, mtime, ino):
+    encoded = [name.encode(*_ENCODING) for name in names]
+    name_start = array("q", [0])
+    offset = 0
+    for data in encoded:
+        offset += len(data)
+        name_start.append(offset)
+    key_data = key.encode(*_ENCODING)
+    columns = (array("h", depth), array("i", name_id), array("q", mtime), array("Q", ino),
+               name_start)
+    if sys.byteorder != "little":
+        for column in columns:
+            column.byteswap()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, CACHE_VERSION, len(key_data), len(depth), len(names),
+                             offset))
+        f.write(key_data)
+        for column in columns:
+            column.tofile(f)
+        f.write(b"".join(encoded))
+
+
+def _read_columns(path, key):
+    # (names, depth, name_id, mtime, ino) of a cache file written for key;
+    # ValueError or EOFError if it is anything else
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("truncated header")
+        magic, version, key_size, count, name_count, blob_size = _HEADER.unpack(header)
+        if magic != MAGIC or version != CACHE_VERSION:
+            raise ValueError("not a scan cache file of this version")
+        if f.read(key_size).decode(*_ENCODING) != key:
+            raise ValueError("cache file of another root")
+        columns = []
+        for code, size in (("h", count), ("i", count), ("q", count + 1), ("Q", count + 1),
+                           ("q", name_count + 1)):
+            column = array(code)
+            column.fromfile(f, size)
+            columns.append(column)
+        blob = f.read(blob_size)
+        if len(blob) != blob_size or f.read(1):
+            raise ValueError("wrong file size")
+    if sys.byteorder != "little":
+        for column in columns:
+            column.byteswap()
+    depth, name_id, mtime, ino, start = columns
+    if start[-1] != blob_size:
+        raise ValueError("inconsistent name table")
+    if name_id and (min(name_id) < 0 or max(name_id) >= name_count):
+        raise ValueError("name id out of range")
+    names = [blob[start[i]:start[i + 1]].decode(*_ENCODING) for i in range(name_count)]
+    return names, depth, name_id, mtime, ino
+
+
+def root_key(root_path, scan_filter=None):
+    # Filtered scans of the same root are cached separately
+    key = os.path.normcase(os.path.abspath(root_path))
+    if scan_filter is not None and scan_filter.active:
+        key += "|" + scan_filter.key()
+    return key
+
+
+class ScanCache:
+    """Persistent per-root directory cache for incremental rescans.
+
+    Every directory seen in a scan is stored with its mtime and inode. On a
+    rescan each known directory is stat()ed, and only those whose mtime or
+    inode changed are listed again; the others reuse the cached child names.
+    Roots are evicted least-recently-used once the cache exceeds max_roots
+    or max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, max_roots=DEFAULT_MAX_ROOTS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_roots = max_roots
+        self._lock = threading.Lock()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        tmp_path = self._index_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+
+    @staticmethod
+    def _file_name(key):
+        return hashlib.sha1(key.encode(*_ENCODING)).hexdigest() + ".scan"
+
+    def load(self, root_path, scan_filter=None):
+        key = root_key(root_path, scan_filter)
+        with self._lock:
+            index = self._read_index()
+            entry = index.get(key)
+            if entry is None:
+                return None
+            try:
+                columns = _read_columns(os.path.join(self.cache_dir, entry["file"]), key)
+            except (OSError, ValueError, EOFError, KeyError, TypeError):
+                return None
+            entry["used"] = time.time()
+            try:
+                self._write_index(index)
+            except OSError:
+                pass
+        names, depth, name_id, mtime, ino = columns
+        tree = StructureTree()
+        tree.extend(zip(depth, (names[i] for i in name_id)))
+        return CachedScan(tree, mtime, ino)
+
+    def save(self, root_path, names, depth, name_id, mtime, ino, scan_filter=None):
+        key = root_key(root_path, scan_filter)
+        file_name = self._file_name(key)
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, file_name)
+            tmp_path = path + ".tmp"
+            _write_columns(tmp_path, key, names, depth, name_id, mtime, ino)
+            os.replace(tmp_path, path)
+            index = self._read_index()
+            index[key] = {"file": file_name, "size": os.path.getsize(path), "used": time.time()}
+            self._evict(index, keep=key)
+            self._write_index(index)
+
+    def _evict(self, index, keep):
+        by_age = sorted(index, key=lambda k: index[k].get("used", 0))
+        total = sum(entry.get("size", 0) for entry in index.values())
+        for key in by_age:
+            if len(index) <= self.max_roots and total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = index.pop(key)
+            total -= entry.get("size", 0)
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+
+    def forget(self, root_path, scan_filter=None):
+        key = root_key(root_path, scan_filter)
+        with self._lock:
+            index = self._read_index()
+            entry = index.pop(key, None)
+            if entry is None:
+                return
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+            self._write_index(index)
+
+    def walk(self, root_path, workers=DEFAULT_WORKERS, cancel=None, stats=None, scan_filter=None):
+        """Yield (depth, name) like walk_structure, reusing the cached scan.
+
+        The cache for root_path (and scan_filter) is replaced when the walk
+        runs to completion.
+        """
+        if scan_filter is not None and not scan_filter.active:
+            scan_filter = None
+        entries = self._walk(root_path, workers, cancel, stats, scan_filter)
+        if scan_filter is None:
+            return entries
+        return scan_filter.select(entries)
+
+    def _walk(self, root_path, workers, cancel, stats, scan_filter):
+        if stats is None:
+            stats = ScanStats()
+        previous = self.load(root_path, scan_filter)
+        follow_symlinks = scan_filter is not None and scan_filter.include_symlinks
+        stats.cached = previous is not None
+        scan_started = time.time_ns()
+
+        def expand(path, node):
+            st = os.stat(path)
+            node.mtime = st.st_mtime_ns
+            node.ino = st.st_ino
+            old = node.old
+            if (old >= 0 and previous.mtime[old] == st.st_mtime_ns
+                    and previous.ino[old] == st.st_ino):
+                stats.reused += 1
+                return previous.child_nodes(old)
+            stats.listed += 1
+            names = _list_subdirs(path, follow_symlinks)
+            if old < 0:
+                return [ScanNode(name) for name in names]
+            known = previous.child_ids(old)
+            return [ScanNode(name, known.get(name, -1)) for name in names]
+
+        if scan_filter is not None:
+            expand = filtered_expand(root_path, scan_filter, expand)
+        root = ScanNode("", 0 if previous is not None else -1)
+        names = []
+        name_ids = {}
+        depth_out = array("h", [-1])
+        name_id_out = array("i", [0])
+        mtime_out = array("q")
+        ino_out = array("Q")
+        trusted_before = scan_started - RACY_WINDOW_NS
+
+        def record(node):
+            mtime_out.append(node.mtime if node.mtime < trusted_before else -1)
+            ino_out.append(node.ino)
+
+        completed = False
+        first = True
+        for depth, node in walk_nodes(root_path, workers, cancel, expand, root):
+            if first:
+                # The root has been expanded by the time its first child shows up
+                record(root)
+                first = False
+            name = node.name
+            nid = name_ids.get(name)
+            if nid is None:
+                nid = name_ids[name] = len(names)
+                names.append(name)
+            depth_out.append(depth)
+            name_id_out.append(nid)
+            record(node)
+            yield depth, name
+        else:
+            completed = cancel is None or not cancel.is_set()
+
+        if completed:
+            if first:
+                if root.mtime < 0:
+                    # Root could not be listed; nothing worth caching
+                    return
+                record(root)
+            # Drop the root placeholder from the pre-order node arrays
+            self.save(root_path, names, depth_out[1:], name_id_out[1:], mtime_out, ino_out,
+                      scan_filter)
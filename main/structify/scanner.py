@@ -0,0 +1,200 @@
+import os
+import queue
+import threading
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_PENDING = object()
+
+
+class ScanNode:
+    __slots__ = ("name", "children", "old", "mtime", "ino", "stats")
+
+    def __init__(self, name, old=-1):
+        self.name = name
+        # _PENDING until listed, None if the directory could not be listed
+        self.children = _PENDING
+        # Node id in a previous scan of the same root, used by the scan cache
+        self.old = old
+        self.mtime = -1
+        self.ino = 0
+        # (files, bytes, newest mtime) of the folder itself, see structify.stats
+        self.stats = None
+
+
+def _list_subdirs(path, follow_symlinks=False):
+    names = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                # d_type from the listing is enough here, no extra stat()
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    names.append(entry.name)
+            except OSError:
+                pass
+    names.sort()
+    return names
+
+
+def list_children(path, node):
+    return [ScanNode(name) for name in _list_subdirs(path)]
+
+
+def list_children_and_links(path, node):
+    # Also lists symlinked folders; ScanFilter makes sure they are not entered
+    return [ScanNode(name) for name in _list_subdirs(path, follow_symlinks=True)]
+
+
+def filtered_expand(root_path, scan_filter, expand=None, list_leaves=False):
+    if expand is None:
+        expand = list_children_and_links if scan_filter.include_symlinks else list_children
+    return scan_filter.wrap_expand(root_path, expand, list_leaves)
+
+
+def _walk_serial(root_path, root, expand, cancel):
+    # Same rules as os.walk(topdown=True): symlinked directories are not
+    # entered and directories that cannot be listed are left out.
+    try:
+        children = expand(root_path, root)
+    except OSError:
+        return
+    join = os.path.join
+    stack = [(join(root_path, child.name), child, 0) for child in reversed(children)]
+    while stack:
+        if cancel is not None and cancel.is_set():
+            return
+        path, node, depth = stack.pop()
+        try:
+            children = expand(path, node)
+        except OSError:
+            continue
+        yield depth, node
+        child_depth = depth + 1
+        for child in reversed(children):
+            stack.append((join(path, child.name), child, child_depth))
+
+
+def _walk_parallel(root_path, root, expand, workers, cancel):
+    tasks = queue.Queue()
+    stop = threading.Event()
+    ready = threading.Condition()
+    waiting_on = [None]
+
+    def worker():
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            # Walk the subtree locally and only hand work back to the shared
+            # queue while other threads are starving; keeps queue traffic low.
+            local = [item]
+            while local and not stop.is_set():
+                path, node = local.pop()
+                try:
+                    children = expand(path, node)
+                except OSError:
+                    children = None
+                node.children = children
+                if waiting_on[0] is node:
+                    with ready:
+                        ready.notify()
+                if children:
+                    for child in children:
+                        local.append((os.path.join(path, child.name), child))
+                while len(local) > 1 and tasks.qsize() < workers:
+                    tasks.put(local.pop(0))
+
+    def wait_for(node):
+        # Listings usually finish well ahead of the emitter, so the lock is
+        # only taken when the pre-order walk catches up with the workers.
+        with ready:
+            waiting_on[0] = node
+            while node.children is _PENDING and not stop.is_set():
+                if cancel is not None and cancel.is_set():
+                    stop.set()
+                    break
+                ready.wait(0.05)
+            waiting_on[0] = None
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    tasks.put((root_path, root))
+    try:
+        # Emit in sorted pre-order while the workers are still listing
+        if root.children is _PENDING:
+            wait_for(root)
+        if root.children is _PENDING or not root.children:
+            # Cancelled before the root was listed, or nothing below it
+            return
+        stack = [(child, 0) for child in reversed(root.children)]
+        while stack:
+            if cancel is not None and cancel.is_set():
+                return
+            node, depth = stack.pop()
+            if node.children is _PENDING:
+                wait_for(node)
+                if node.children is _PENDING:
+                    return
+            if node.children is None:
+                continue
+            yield depth, node
+            child_depth = depth + 1
+            for child in reversed(node.children):
+                stack.append((child, child_depth))
+            # Emitted nodes are no longer needed; let the tree drain as we go
+            node.children = ()
+    finally:
+        stop.set()
+        for _ in threads:
+            tasks.put(None)
+        for t in threads:
+            t.join()
+
+
+def walk_nodes(root_path, workers=DEFAULT_WORKERS, cancel=None, expand=list_children, root=None):
+    """Yield (depth, ScanNode) for every subfolder of root_path in sorted pre-order.
+
+    expand(path, node) returns the child ScanNodes of one directory (sorted by
+    name) or raises OSError if it cannot be listed; the default lists it with
+    os.scandir.
+    """
+    if root is None:
+        root = ScanNode("")
+    if workers is None or workers <= 1:
+        return _walk_serial(root_path, root, expand, cancel)
+    return _walk_parallel(root_path, root, expand, workers, cancel)
+
+
+def walk_structure(root_path, workers=DEFAULT_WORKERS, cancel=None, scan_filter=None):
+    """Yield (depth, name) for every subfolder of root_path in sorted pre-order.
+
+    Results stream out while the walk is still running. Setting the optional
+    ``cancel`` event stops the walk at the next directory; an optional
+    ScanFilter prunes folders inside the walk.
+    """
+    if scan_filter is None or not scan_filter.active:
+        return ((depth, node.name) for depth, node in walk_nodes(root_path, workers, cancel))
+    expand = filtered_expand(root_path, scan_filter)
+    return scan_filter.select((depth, node.name)
+                              for depth, node in walk_nodes(root_path, workers, cancel, expand))
+
+
+def get_folder_structure(root_path, recursive=True, workers=DEFAULT_WORKERS, cancel=None,
+                         scan_filter=None):
+    if not recursive:
+        structure = []
+        with os.scandir(root_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        structure.append(entry.name)
+                except OSError:
+                    pass
+        structure.sort()
+        if scan_filter is not None and scan_filter.active:
+            structure = [name for name in structure if scan_filter.allows((name,))]
+        return structure
+
+    return [f"{'  ' * depth}{name}"
+            for depth, name in walk_structure(root_path, workers, cancel, scan_filter)]
@@ -0,0 +1,190 @@
+from array import array
+from collections import Counter
+
+from .tree import NO_NODE
+
+SUBSTRING = "substring"
+FUZZY = "fuzzy"
+EXACT = "exact"
+MODES = (SUBSTRING, FUZZY, EXACT)
+
+# Trigram similarity (shared / all distinct trigrams of both) a name needs
+# to count as a fuzzy match, as in PostgreSQL's pg_trgm
+FUZZY_THRESHOLD = 0.3
+_EMPTY = array("i")
+
+
+def trigrams(text):
+    # Padded like pg_trgm, so short names and word starts still have trigrams
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Search index over the folder names of a StructureTree.
+
+    Names are indexed once per distinct name, not per folder: a trigram
+    index over the casefolded names answers substring, fuzzy and exact
+    queries, and a name -> nodes map (one chain of nodes per name, kept in
+    two int arrays) turns matching names into folders. Edits are applied
+    incrementally with extend(), insert(), rename() and remove(); removed
+    folders are only flagged.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.postings = {}
+        self.folded = []
+        # Trigram count per name id, the denominator of fuzzy similarity
+        self.sizes = array("i")
+        # head[name id] is the first node of that name, next[node] the one after
+        self.head = array("i")
+        self.next = array("i", [NO_NODE]) * len(tree.parent)
+        self.dead = bytearray(b"\x01") * len(tree.parent)
+        self._index_names()
+        head = self.head
+        nxt = self.next
+        dead = self.dead
+        name_id = tree.name_id
+        for node in tree.iter_nodes():
+            dead[node] = 0
+            nid = name_id[node]
+            nxt[node] = head[nid]
+            head[nid] = node
+
+    def _index_names(self):
+        # Index names interned since the last call
+        names = self.tree.names
+        start = len(self.folded)
+        if start == len(names):
+            return
+        postings = self.postings
+        get = postings.get
+        folded = self.folded
+        sizes = self.sizes
+        for nid in range(start, len(names)):
+            name = names[nid]
+            text = name.casefold()
+            folded.append(name if text == name else text)
+            grams = trigrams(text)
+            sizes.append(len(grams))
+            for gram in grams:
+                posting = get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("i")
+                posting.append(nid)
+        self.head.extend([NO_NODE] * (len(names) - start))
+
+    def _grow(self):
+        missing = len(self.tree.parent) - len(self.next)
+        if missing > 0:
+            self.next.extend([NO_NODE] * missing)
+            self.dead.extend(b"\x01" * missing)
+        self._index_names()
+
+    def _link(self, node):
+        nid = self.tree.name_id[node]
+        self.next[node] = self.head[nid]
+        self.head[nid] = node
+        self.dead[node] = 0
+
+    def _unlink(self, node, nid):
+        head = self.head
+        nxt = self.next
+        if head[nid] == node:
+            head[nid] = nxt[node]
+            return
+        current = head[nid]
+        while current != NO_NODE:
+            if nxt[current] == node:
+                nxt[current] = nxt[node]
+                return
+            current = nxt[current]
+
+    def extend(self, first):
+        # Nodes first .. end of the tree were appended
+        self._grow()
+        for node in range(first, len(self.tree.parent)):
+            self._link(node)
+
+    def insert(self, node):
+        self._grow()
+        self._link(node)
+
+    def rename(self, node, old_name_id):
+        # Call after tree.rename() with the node's previous name id
+        if self.tree.name_id[node] == old_name_id:
+            return
+        self._grow()
+        self._unlink(node, old_name_id)
+        self._link(node)
+
+    def remove(self, node):
+        # node and its subtree left the tree
+        dead = self.dead
+        if node < len(dead):
+            dead[node] = 1
+            for child in self.tree.iter_nodes(node):
+                if child < len(dead):
+                    dead[child] = 1
+
+    def match_names(self, query, mode=SUBSTRING):
+        """Name ids matching query, best first for fuzzy queries."""
+        text = query.strip().casefold()
+        if not text:
+            return []
+        folded = self.folded
+        if mode == FUZZY:
+            return self._fuzzy(text)
+        if mode == EXACT:
+            grams = trigrams(text)
+        elif len(text) < 3:
+            # No trigram to look up; short queries scan the distinct names
+            return [nid for nid, name in enumerate(folded) if text in name]
+        else:
+            grams = {text[i:i + 3] for i in range(len(text) - 2)}
+        postings = sorted((self.postings.get(gram, _EMPTY) for gram in grams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(candidates) * 8 < len(posting):
+                # Cheaper to check the few candidates than to intersect
+                break
+            candidates.intersection_update(posting)
+        if mode == EXACT:
+            return sorted(nid for nid in candidates if folded[nid] == text)
+        return sorted(nid for nid in candidates if text in folded[nid])
+
+    def _fuzzy(self, text):
+        grams = trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, _EMPTY))
+        size = len(grams)
+        sizes = self.sizes
+        scored = []
+        for nid, common in shared.items():
+            similarity = common / (size + sizes[nid] - common)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((-similarity, nid))
+        scored.sort()
+        return [nid for _, nid in scored]
+
+    def nodes(self, name_ids, limit=None):
+        result = []
+        head = self.head
+        nxt = self.next
+        dead = self.dead
+        name_id = self.tree.name_id
+        for nid in name_ids:
+            node = head[nid]
+            while node != NO_NODE:
+                if not dead[node] and name_id[node] == nid:
+                    result.append(node)
+                    if limit is not None and len(result) >= limit:
+                        return result
+                node = nxt[node]
+        return result
+
+    def search(self, query, mode=SUBSTRING, limit=None):
+        # Folders whose name matches query
+        return self.nodes(self.match_names(query, mode), limit)
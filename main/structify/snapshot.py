@@ -0,0 +1,262 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from .tree import ROOT, NO_NODE, StructureTree
+
+# Binary snapshot layout, all little-endian:
+#
+#   header      MAGIC, version, node count, name count, blob size
+#   parent      int32 per node
+#   depth       int32 per node
+#   name_id     int32 per node
+#   size        int32 per node, subtree size including the node itself
+#   name_start  int64 per name + 1, offsets into the blob
+#   blob        UTF-8 names, back to back
+#
+# Nodes are stored in pre-order with node 0 as the unnamed root, so the
+# subtree of node k is exactly nodes k .. k + size[k] - 1 and children can be
+# found by hopping over sibling subtrees. Columns are read through memoryviews
+# on the mapping; nothing is parsed up front.
+MAGIC = b"STRUCTSN"
+VERSION = 1
+SNAPSHOT_SUFFIX = ".snap"
+_HEADER = struct.Struct("<8sIIIQ")
+
+
+def is_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _entry_columns(entries):
+    # Same depth clamping as StructureTree.extend
+    parent = array("i", [NO_NODE])
+    depth_col = array("i", [-1])
+    name_id = array("i", [NO_NODE])
+    size = array("i", [0])
+    names = []
+    name_ids = {}
+    stack = [ROOT]
+    node = 1
+    for depth, name in entries:
+        if depth < len(stack):
+            for done in stack[depth + 1:]:
+                size[done] = node - done
+            del stack[depth + 1:]
+        else:
+            depth = len(stack) - 1
+        nid = name_ids.get(name)
+        if nid is None:
+            nid = name_ids[name] = len(names)
+            names.append(name)
+        parent.append(stack[depth])
+        depth_col.append(depth)
+        name_id.append(nid)
+        size.append(0)
+        stack.append(node)
+        node += 1
+    for done in stack:
+        size[done] = node - done
+    return names, parent, depth_col, name_id, size
+
+
+def write_snapshot_entries(entries, path):
+    """Write (depth, name) entries as a binary snapshot; returns the folder count."""
+    names, parent, depth, name_id, size = _entry_columns(entries)
+    encoded = [name.encode("utf-8") for name in names]
+    name_start = array("q", [0])
+    offset = 0
+    for data in encoded:
+        offset += len(data)
+        name_start.append(offset)
+    columns = (parent, depth, name_id, size, name_start)
+    if sys.byteorder != "little":
+        for column in columns:
+            column.byteswap()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(parent), len(names), offset))
+        for column in columns:
+            column.tofile(f)
+        f.write(b"".join(encoded))
+    return len(parent) - 1
+
+
+def write_snapshot(tree, path):
+    return write_snapshot_entries(tree.iter_entries(), path)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a binary structure snapshot.
+
+    Opening only maps the file and checks the header. Node ids match the
+    StructureTree built by to_tree(), so ROOT is 0 and children(), name() and
+    iter_entries() work on any subtree without touching the rest of the file.
+    """
+
+    def __init__(self, path):
+        self.filename = path
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise OSError(f"Not a structure snapshot: {path}")
+        self._views = []
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        if len(self._map) < _HEADER.size:
+            raise OSError(f"Not a structure snapshot: {self.filename}")
+        magic, version, count, name_count, blob_size = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise OSError(f"Not a structure snapshot: {self.filename}")
+        if version != VERSION:
+            raise OSError(f"Unsupported snapshot version {version}: {self.filename}")
+        blob_offset = _HEADER.size + 16 * count + 8 * (name_count + 1)
+        if len(self._map) < blob_offset + blob_size:
+            raise OSError(f"Truncated structure snapshot: {self.filename}")
+        self.count = count - 1
+        self.name_count = name_count
+        offset = _HEADER.size
+        self.parent = self._column(offset, count, "i")
+        self.depth = self._column(offset + 4 * count, count, "i")
+        self.name_id = self._column(offset + 8 * count, count, "i")
+        self.size = self._column(offset + 12 * count, count, "i")
+        self._name_start = self._column(offset + 16 * count, name_count + 1, "q")
+        self._blob = self._view(blob_offset, blob_size)
+        self._names = None
+
+    def _view(self, offset, length):
+        view = memoryview(self._map)[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def _column(self, offset, count, code):
+        width = struct.calcsize(code)
+        view = self._view(offset, count * width).cast(code)
+        self._views.append(view)
+        if sys.byteorder != "little":
+            column = array(code, view)
+            column.byteswap()
+            return column
+        return view
+
+    def close(self):
+        # Slices held by an unfinished iter_entries() keep the mapping
+        # exported; then it is only dropped here and unmapped once they go
+        for view in reversed(self._views):
+            try:
+                view.release()
+            except BufferError:
+                pass
+        self._views = []
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
+            self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def name(self, node):
+        if self._names is not None:
+            return self._names[self.name_id[node]]
+        nid = self.name_id[node]
+        return str(self._blob[self._name_start[nid]:self._name_start[nid + 1]], "utf-8")
+
+    def names(self):
+        # Decodes the whole name table once; needed only for full iteration
+        if self._names is None:
+            blob = bytes(self._blob)
+            start = self._name_start
+            self._names = [str(blob[start[i]:start[i + 1]], "utf-8")
+                           for i in range(self.name_count)]
+        return self._names
+
+    def subtree_size(self, node):
+        return self.size[node]
+
+    def children(self, node=ROOT):
+        size = self.size
+        result = []
+        child = node + 1
+        end = node + size[node]
+        while child < end:
+            result.append(child)
+            child += size[child]
+        return result
+
+    def path(self, node):
+        parts = []
+        while node != ROOT and node != NO_NODE:
+            parts.append(self.name(node))
+            node = self.parent[node]
+        parts.reverse()
+        return parts
+
+    def find(self, parts):
+        # Node for a path of folder names, or NO_NODE
+        node = ROOT
+        for part in parts:
+            for child in self.children(node):
+                if self.name(child) == part:
+                    node = child
+                    break
+            else:
+                return NO_NODE
+        return node
+
+    def iter_entries(self, node=ROOT):
+        end = node + self.size[node]
+        base = self.depth[node] + 1
+        depth = self.depth[node + 1:end]
+        nodes = self.name_id[node + 1:end]
+        if base and self._names is None:
+            # A subtree decodes only the names it uses, each once
+            return self._iter_subtree(depth, nodes, base, self._blob[:], self._name_start[:])
+        names = self.names()
+        if base:
+            return ((d - base, names[n]) for d, n in zip(depth, nodes))
+        return zip(depth, map(names.__getitem__, nodes))
+
+    @staticmethod
+    def _iter_subtree(depth, nodes, base, blob, start):
+        decoded = {}
+        for d, n in zip(depth, nodes):
+            name = decoded.get(n)
+            if name is None:
+                name = decoded[n] = str(blob[start[n]:start[n + 1]], "utf-8")
+            yield d - base, name
+
+    def iter_lines(self, node=ROOT):
+        for depth, name in self.iter_entries(node):
+            yield f"{'  ' * depth}{name}"
+
+    def to_tree(self, node=ROOT):
+        if node == ROOT:
+            return StructureTree.from_preorder(self.names(), self.parent, self.depth,
+                                               self.name_id, self.size)
+        tree = StructureTree()
+        tree.extend(self.iter_entries(node))
+        return tree
+
+
+def read_snapshot(path):
+    with Snapshot(path) as snapshot:
+        return snapshot.to_tree()
@@ -0,0 +1,241 @@
+import os
+from array import array
+from datetime import datetime
+
+from .scanner import DEFAULT_WORKERS, ScanNode, filtered_expand, walk_nodes
+from .tree import ROOT, NO_NODE
+
+# What a stats scan collects per file: just the count, or also its size and mtime
+STATS_COUNTS = "counts"
+STATS_SIZES = "sizes"
+
+
+def _list_with_files(path, follow_symlinks=False):
+    # Like _list_subdirs, but also totals the plain files of the folder.
+    # d_type answers is_dir/is_file; only the sizes cost a stat per file,
+    # which DirEntry already holds on Windows and fetches once elsewhere.
+    names = []
+    files = 0
+    size = 0
+    newest = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    names.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    files += 1
+                    size += st.st_size
+                    if st.st_mtime_ns > newest:
+                        newest = st.st_mtime_ns
+            except OSError:
+                pass
+    names.sort()
+    return names, (files, size, newest)
+
+
+def _list_counting_files(path, follow_symlinks=False):
+    # File counts only: d_type is enough, so no stat at all
+    names = []
+    files = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    names.append(entry.name)
+                elif entry.is_file(follow_symlinks=False):
+                    files += 1
+            except OSError:
+                pass
+    names.sort()
+    return names, (files, 0, 0)
+
+
+def _expand_with(list_folder, follow_symlinks):
+    def expand(path, node):
+        names, node.stats = list_folder(path, follow_symlinks)
+        return [ScanNode(name) for name in names]
+    return expand
+
+
+def walk_stats(root_path, workers=DEFAULT_WORKERS, cancel=None, scan_filter=None, sizes=True):
+    """Yield (depth, name, files, bytes, newest_mtime_ns) in sorted pre-order.
+
+    The counts cover the files directly inside each folder. The first item
+    describes the root itself and has depth -1; see FolderStats.extend.
+    Without sizes only files are counted and bytes/newest stay 0, which
+    saves the stat of every file.
+    """
+    list_folder = _list_with_files if sizes else _list_counting_files
+    if scan_filter is not None and scan_filter.active:
+        expand = _expand_with(list_folder, scan_filter.include_symlinks)
+        expand = filtered_expand(root_path, scan_filter, expand, list_leaves=True)
+    else:
+        expand = _expand_with(list_folder, False)
+        scan_filter = None
+    root = ScanNode("")
+    entries = _walk_stats(root_path, workers, cancel, expand, root)
+    if scan_filter is None or not scan_filter.include:
+        return entries
+    return _select(entries, scan_filter)
+
+
+def _walk_stats(root_path, workers, cancel, expand, root):
+    first = True
+    for depth, node in walk_nodes(root_path, workers, cancel, expand, root):
+        if first:
+            yield (-1, "") + (root.stats or (0, 0, 0))
+            first = False
+        yield (depth, node.name) + (node.stats or (0, 0, 0))
+    if first:
+        yield (-1, "") + (root.stats or (0, 0, 0))
+
+
+def _select(entries, scan_filter):
+    # Include rules work on (depth, name); carry the stats alongside
+    entries = iter(entries)
+    root = next(entries)
+    yield root
+    stats_of = {}
+
+    def pairs():
+        for entry in entries:
+            stats_of[entry[0]] = entry[2:]
+            yield entry[0], entry[1]
+
+    for depth, name in scan_filter.select(pairs()):
+        yield (depth, name) + stats_of[depth]
+
+
+class FolderStats:
+    """File counts, bytes and newest file mtime per node of a StructureTree.
+
+    files/bytes/newest cover the files directly inside each folder and are
+    indexed like the tree's node arrays (node 0 is the scanned root).
+    rollup() adds the totals for whole subtrees in one post-order pass.
+    Without sizes only the file counts were collected.
+    """
+
+    def __init__(self, sizes=True):
+        self.sizes = sizes
+        self.files = array("q", [0])
+        self.bytes = array("q", [0])
+        self.newest = array("q", [0])
+        self.total_files = None
+        self.total_bytes = None
+        self.total_newest = None
+
+    def extend(self, entries):
+        """Append stats from walk_stats items and yield their (depth, name)."""
+        files = self.files
+        size = self.bytes
+        newest = self.newest
+        for depth, name, count, total, latest in entries:
+            if depth < 0:
+                files[ROOT] = count
+                size[ROOT] = total
+                newest[ROOT] = latest
+                continue
+            files.append(count)
+            size.append(total)
+            newest.append(latest)
+            yield depth, name
+
+    def grow(self, count):
+        # Folders added by edits have no files of their own
+        missing = count - len(self.files)
+        if missing > 0:
+            zeros = array("q", bytes(8 * missing))
+            for column in (self.files, self.bytes, self.newest):
+                column.extend(zeros)
+            if self.total_files is not None:
+                for column in (self.total_files, self.total_bytes, self.total_newest):
+                    column.extend(zeros)
+
+    def rollup(self, tree):
+        self.grow(len(tree.parent))
+        total_files = array("q", self.files)
+        total_bytes = array("q", self.bytes)
+        total_newest = array("q", self.newest)
+        parent_of = tree.parent
+        # Reversed pre-order visits every child before its parent
+        for node in reversed(list(tree.iter_nodes())):
+            parent = parent_of[node]
+            total_files[parent] += total_files[node]
+            total_bytes[parent] += total_bytes[node]
+            if total_newest[node] > total_newest[parent]:
+                total_newest[parent] = total_newest[node]
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.total_newest = total_newest
+
+    def detach(self, tree, node):
+        # Take a subtree's totals off its ancestors before it is removed or
+        # moved; the newest mtime of the ancestors is left as it was.
+        if self.total_files is None:
+            return
+        files = self.total_files[node]
+        size = self.total_bytes[node]
+        parent = tree.parent[node]
+        while parent != NO_NODE:
+            self.total_files[parent] -= files
+            self.total_bytes[parent] -= size
+            parent = tree.parent[parent]
+
+    def attach(self, tree, node):
+        if self.total_files is None:
+            return
+        files = self.total_files[node]
+        size = self.total_bytes[node]
+        newest = self.total_newest[node]
+        parent = tree.parent[node]
+        while parent != NO_NODE:
+            self.total_files[parent] += files
+            self.total_bytes[parent] += size
+            if newest > self.total_newest[parent]:
+                self.total_newest[parent] = newest
+            parent = tree.parent[parent]
+
+    def totals(self, node):
+        if self.total_files is None:
+            return self.files[node], self.bytes[node], self.newest[node]
+        return self.total_files[node], self.total_bytes[node], self.total_newest[node]
+
+    @property
+    def header(self):
+        return STATS_HEADER if self.sizes else COUNTS_HEADER
+
+    def annotated_entries(self, tree, node=ROOT):
+        """(depth, "name<TAB>files<TAB>bytes<TAB>newest") with subtree totals.
+
+        Without sizes the lines are "name<TAB>files". Readers drop
+        everything after the tab, so annotated exports still load as plain
+        structure files.
+        """
+        depth = tree.depth
+        base = depth[node] + 1
+        for current in tree.iter_nodes(node):
+            files, size, newest = self.totals(current)
+            if self.sizes:
+                yield (depth[current] - base,
+                       f"{tree.name(current)}\t{files}\t{size}\t{format_mtime(newest)}")
+            else:
+                yield depth[current] - base, f"{tree.name(current)}\t{files}"
+
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if size < 1024 or unit == "TB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+STATS_HEADER = "folder\tfiles\tbytes\tnewest file (subtree totals)"
+COUNTS_HEADER = "folder\tfiles (subtree totals)"
+
+
+def format_mtime(mtime_ns):
+    if not mtime_ns:
+        return ""
+    return datetime.fromtimestamp(mtime_ns / 1e9).strftime("%Y-%m-%d %H:%M")
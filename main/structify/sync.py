@@ -0,0 +1,389 @@
+import errno
+import os
+import time
+
+from .core import scan_tree
+from .replicate import CHUNK_SIZE, CREATED, DEFAULT_WORKERS, EXISTING, _make_dirs
+from .tree import ROOT
+
+# What happens to destination folders the preview does not have
+KEEP = "keep"
+REMOVE = "remove"
+QUARANTINE = "quarantine"
+EXTRA_MODES = (KEEP, REMOVE, QUARANTINE)
+QUARANTINE_DIR = ".structify-quarantine"
+
+REMOVED = 1
+GONE = 0
+NOT_EMPTY = -1
+
+
+class SyncPlan:
+    """Operations that make a destination match a preview structure.
+
+    create and extra hold (path, folder count) for the topmost folders that
+    only the preview or only the destination has; paths are tuples of names
+    below the destination, as in TreeDiff. Unless extras are kept, clear
+    holds the topmost extra folders with nothing but extra folders below
+    them, which are removed or quarantined, and kept the paths of extra
+    folders that hold files and so stay where they are.
+    """
+
+    def __init__(self, tree, destination, extra_mode=KEEP, quarantine=None):
+        self.tree = tree
+        self.destination = destination
+        self.extra_mode = extra_mode
+        # Folder the extra subtrees are moved into, for QUARANTINE
+        self.quarantine = quarantine
+        self.create = []
+        self.extra = []
+        self.clear = []
+        self.kept = []
+        self.matched = 0
+        self.scanned = 0
+        self.elapsed = 0.0
+        # Preview node of every create entry, destination node of every extra one
+        self._create_nodes = []
+        self._extra_nodes = []
+        self._dest_tree = None
+
+    @property
+    def empty(self):
+        return not self.create and not self.clear
+
+    def create_folders(self):
+        return sum(size for _, size in self.create)
+
+    def extra_folders(self):
+        return sum(size for _, size in self.extra)
+
+    def clear_folders(self):
+        return sum(size for _, size in self.clear)
+
+    def operations(self):
+        # "+ path", "- path", "> path" or "! path" lines, creations first
+        for path, size in self.create:
+            yield "+ " + "/".join(path) + (f"  ({size} folders)" if size > 1 else "")
+        if self.extra_mode == KEEP:
+            lines = [(path, "? " + "/".join(path) + (f"  ({size} folders)" if size > 1 else ""))
+                     for path, size in self.extra]
+        else:
+            sign = "-" if self.extra_mode == REMOVE else ">"
+            lines = [(path, f"{sign} " + "/".join(path) + (f"  ({size} folders)" if size > 1 else ""))
+                     for path, size in self.clear]
+            lines += [(path, "! " + "/".join(path) + "  (holds files, kept)")
+                      for path in self.kept]
+            lines.sort(key=lambda item: item[0])
+        for _, line in lines:
+            yield line
+
+    def summary(self):
+        text = (f"Already in place: {self.matched:,}\n"
+                f"To create: {self.create_folders():,}\n")
+        if self.extra_mode == KEEP:
+            text += f"Not in preview (kept): {self.extra_folders():,}"
+        else:
+            verb = "To remove" if self.extra_mode == REMOVE else "To quarantine"
+            text += (f"{verb}: {self.clear_folders():,}\n"
+                     f"Not in preview but holding files (kept): {len(self.kept):,}")
+        if self.extra_mode == QUARANTINE and self.clear:
+            text += f"\nQuarantine folder: {self.quarantine}"
+        return text + f"\nPlanned in {self.elapsed:.2f} s ({self.scanned:,} folders scanned)"
+
+
+class SyncResult:
+    def __init__(self, destination):
+        self.destination = destination
+        self.created = 0
+        self.existing = 0
+        self.skipped = 0
+        self.removed = 0
+        # Folders moved into the quarantine, counted with their subtrees
+        self.quarantined = 0
+        # Extra folders left in place because they hold files
+        self.not_empty = 0
+        self.failed = []
+        self.elapsed = 0.0
+
+    def summary(self):
+        text = f"Created: {self.created:,}"
+        if self.existing:
+            text += f"\nAlready existing: {self.existing:,}"
+        if self.removed:
+            text += f"\nRemoved: {self.removed:,}"
+        if self.quarantined:
+            text += f"\nQuarantined: {self.quarantined:,}"
+        if self.not_empty:
+            text += f"\nKept (not empty): {self.not_empty:,}"
+        text += f"\nFailed: {len(self.failed):,}"
+        if self.skipped:
+            text += f"\nSkipped (parent failed): {self.skipped:,}"
+        return text + f"\n{self.elapsed:.2f} s"
+
+
+def _child_map(tree, node):
+    names = tree.names
+    name_id = tree.name_id
+    return {names[name_id[child]]: child for child in tree.children(node)}
+
+
+def plan_sync(tree, destination, extra_mode=KEEP, workers=DEFAULT_WORKERS, scan_filter=None,
+              quarantine=None):
+    """Scan destination and plan what makes it match tree.
+
+    Both structures are walked together once, matching children by name,
+    and only the topmost differing folders are kept, so the plan is linear
+    in the two trees. quarantine defaults to a time-stamped folder inside
+    destination/.structify-quarantine, which is never planned as extra.
+    Pass the preview's scan_filter so folders it filtered out are not
+    taken for extra ones.
+    """
+    if extra_mode not in EXTRA_MODES:
+        raise ValueError(f"unknown extra folder mode {extra_mode!r}")
+    start = time.perf_counter()
+    if quarantine is None:
+        stamp = os.path.join(destination, QUARANTINE_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        quarantine = stamp
+        number = 1
+        while os.path.lexists(quarantine):
+            number += 1
+            quarantine = f"{stamp}-{number}"
+    plan = SyncPlan(tree, destination, extra_mode, quarantine)
+    dest_tree = scan_tree(destination, workers=workers, scan_filter=scan_filter)
+    plan.scanned = len(dest_tree)
+    plan._dest_tree = dest_tree
+
+    # Earlier quarantines below the destination are not part of it
+    inside = os.path.relpath(os.path.dirname(quarantine), destination)
+    skip = tuple(inside.split(os.sep)) if not inside.startswith(os.pardir) else None
+
+    stack = [(ROOT, ROOT, ())]
+    while stack:
+        node, dest_node, path = stack.pop()
+        wanted = _child_map(tree, node)
+        present = _child_map(dest_tree, dest_node)
+        for name, child in wanted.items():
+            dest_child = present.get(name)
+            if dest_child is None:
+                plan._create_nodes.append((child, path + (name,)))
+            else:
+                plan.matched += 1
+                stack.append((child, dest_child, path + (name,)))
+        folded = None
+        for name, dest_child in present.items():
+            if name in wanted or path + (name,) == skip:
+                continue
+            if folded is None:
+                folded = {wanted_name.casefold() for wanted_name in wanted}
+            # On a case-insensitive file system "Docs" is the wanted "docs"
+            if name.casefold() not in folded:
+                plan._extra_nodes.append((dest_child, path + (name,)))
+    plan._create_nodes.sort(key=lambda item: item[1])
+    plan._extra_nodes.sort(key=lambda item: item[1])
+    plan.create = [(path, tree.subtree_size(node)) for node, path in plan._create_nodes]
+    plan.extra = [(path, dest_tree.subtree_size(node)) for node, path in plan._extra_nodes]
+    if extra_mode != KEEP and plan.extra:
+        _split_extra(plan, workers)
+    plan.elapsed = time.perf_counter() - start
+    return plan
+
+
+def _split_extra(plan, workers):
+    # Fills plan.clear and plan.kept. Every extra folder is listed again:
+    # one holding anything besides the folders the scan found (files,
+    # links, folders the filter left out) is kept, and so are its ancestors
+    from concurrent.futures import ThreadPoolExecutor
+
+    dest_tree = plan._dest_tree
+    nodes = []
+    for node, path in plan._extra_nodes:
+        stack = [(node, path)]
+        while stack:
+            current, current_path = stack.pop()
+            nodes.append((current, current_path))
+            for child in reversed(dest_tree.children(current)):
+                stack.append((child, current_path + (dest_tree.name(child),)))
+    join = os.path.join
+    paths = [join(plan.destination, *path) for _, path in nodes]
+    occupied = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        listings = _run_chunks(pool, _list_contents, paths)
+        for (node, _), (_, (other, folders)) in zip(nodes, listings):
+            if other or folders.difference(dest_tree.name(child)
+                                           for child in dest_tree.children(node)):
+                occupied.add(node)
+    # Pre-order reversed visits children before their parents
+    parent_of = dest_tree.parent
+    for node, _ in reversed(nodes):
+        if node in occupied:
+            occupied.add(parent_of[node])
+    roots = {node for node, _ in plan._extra_nodes}
+    for node, path in nodes:
+        if node in occupied:
+            plan.kept.append(path)
+        elif node in roots or parent_of[node] in occupied:
+            plan.clear.append((path, dest_tree.subtree_size(node)))
+
+
+def _list_contents(paths):
+    # (holds anything but plain folders, folder names) per path
+    listings = []
+    for path in paths:
+        other = False
+        folders = set()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.add(entry.name)
+                        else:
+                            other = True
+                    except OSError:
+                        other = True
+        except FileNotFoundError:
+            pass
+        except OSError:
+            other = True
+        listings.append((other, folders))
+    return listings
+
+
+def _levels(tree, roots, destination):
+    # [(folder path, parent path)] per depth below destination for every
+    # folder of the (node, path) subtrees; parent path is None for the roots
+    join = os.path.join
+    depth_of = tree.depth
+    levels = []
+    for node, path in roots:
+        offset = len(path) - 1 - depth_of[node]
+        stack = [(node, join(destination, *path), None)]
+        while stack:
+            current, current_path, parent_path = stack.pop()
+            depth = offset + depth_of[current]
+            while len(levels) <= depth:
+                levels.append([])
+            levels[depth].append((current_path, parent_path))
+            for child in tree.children(current):
+                stack.append((child, join(current_path, tree.name(child)), current_path))
+    return levels
+
+
+def _remove_empty(paths):
+    statuses = []
+    for path in paths:
+        try:
+            os.rmdir(path)
+            statuses.append(REMOVED)
+        except FileNotFoundError:
+            statuses.append(GONE)
+        except OSError as e:
+            if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+                statuses.append(NOT_EMPTY)
+            else:
+                statuses.append(e.strerror or str(e))
+    return statuses
+
+
+def _move_dirs(moves):
+    statuses = []
+    for source, target, _ in moves:
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(source, target)
+            statuses.append(REMOVED)
+        except FileNotFoundError:
+            statuses.append(GONE)
+        except OSError as e:
+            statuses.append(e.strerror or str(e))
+    return statuses
+
+
+def _run_chunks(pool, task, items):
+    # Statuses of task over items, chunked across the pool, in item order
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    futures = [pool.submit(task, chunk) for chunk in chunks]
+    for chunk, future in zip(chunks, futures):
+        yield from zip(chunk, future.result())
+
+
+def apply_sync(plan, workers=DEFAULT_WORKERS, journal=None):
+    """Carry out a SyncPlan.
+
+    Missing folders are created level by level in parallel chunks, exactly
+    as replicate_tree does, and recorded in journal (a ReplicationJournal)
+    so a rollback can undo them. Then extra folders are removed deepest
+    first when empty (REMOVE), or the file-free subtrees in plan.clear are
+    moved whole into the quarantine folder (QUARANTINE); a folder that
+    holds files is never removed or moved.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    result = SyncResult(plan.destination)
+    start = time.perf_counter()
+    join = os.path.join
+    levels = _levels(plan.tree, plan._create_nodes, plan.destination)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # Paths whose folder failed, so their children are skipped
+        failed = set()
+        for level in levels:
+            items = []
+            for path, parent_path in level:
+                if parent_path in failed:
+                    failed.add(path)
+                    result.skipped += 1
+                else:
+                    items.append(path)
+            for path, status in _run_chunks(pool, _make_dirs, items):
+                if journal is not None:
+                    journal.record(path, status)
+                if status == CREATED:
+                    result.created += 1
+                elif status == EXISTING:
+                    result.existing += 1
+                else:
+                    failed.add(path)
+                    result.failed.append((path, status))
+            if journal is not None:
+                journal.checkpoint()
+
+        if plan.extra_mode == REMOVE:
+            _remove_extra(plan, pool, result)
+        elif plan.extra_mode == QUARANTINE:
+            moves = [(join(plan.destination, *path), join(plan.quarantine, *path), size)
+                     for path, size in plan.clear]
+            result.not_empty = len(plan.kept)
+            for (source, _, size), status in _run_chunks(pool, _move_dirs, moves):
+                if status == REMOVED:
+                    result.quarantined += size
+                elif status != GONE:
+                    result.failed.append((source, status))
+    if journal is not None:
+        journal.finish(result)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _remove_extra(plan, pool, result):
+    # Deepest level first; a folder that kept a child is known not empty
+    kept = set()
+    for level in reversed(_levels(plan._dest_tree, plan._extra_nodes, plan.destination)):
+        parents = {}
+        items = []
+        for path, parent_path in level:
+            if path in kept:
+                # Holds a folder that stayed, so it cannot be empty
+                result.not_empty += 1
+                kept.add(parent_path)
+            else:
+                parents[path] = parent_path
+                items.append(path)
+        for path, status in _run_chunks(pool, _remove_empty, items):
+            if status == REMOVED:
+                result.removed += 1
+            elif status != GONE:
+                if status == NOT_EMPTY:
+                    result.not_empty += 1
+                else:
+                    result.failed.append((path, status))
+                kept.add(parents[path])
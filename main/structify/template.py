@@ -0,0 +1,258 @@
+import itertools
+import re
+from datetime import date, timedelta
+
+from .textfile import open_text
+
+# Structure templates: indented lines like a structure TXT, where a folder
+# name may contain fields.
+#
+#   {name} / {name:spec}     value of a variable; spec is a format spec for
+#                            numbers ("03") or strftime for dates ("%Y%m%d")
+#   {name=RANGE[:spec]}      repeat this folder (and its subtree) for every
+#                            value, binding name for the subtree
+#   @for name in RANGE       repeat the indented block below at this level
+#   {{ and }}                literal braces
+#
+# RANGE is A..B or A..B..STEP over integers or ISO dates (STEP in days), or
+# a list a|b|c. Several ranges on one line repeat over every combination.
+# "#" starts a comment line. The variable "today" is always defined.
+
+_FIELD = re.compile(r"\{\{|\}\}|\{([^{}]*)\}")
+_SPEC = re.compile(r"\s*([A-Za-z_]\w*)\s*(?:=([^:]*))?(?::(.*))?\s*$")
+_FOR = re.compile(r"@for\s+([A-Za-z_]\w*)\s+in\s+(\S+?)\s*$")
+
+
+def _parse_value(text):
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return date.fromisoformat(text)
+
+
+def _parse_item(text):
+    try:
+        return _parse_value(text)
+    except ValueError:
+        return text.strip()
+
+
+def parse_range(text):
+    """Values of a RANGE as a re-iterable sequence."""
+    if "|" in text:
+        return [_parse_item(part) for part in text.split("|")]
+    parts = text.split("..")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"not a range: {text!r}")
+    try:
+        start = _parse_value(parts[0])
+        stop = _parse_value(parts[1])
+        step = int(parts[2]) if len(parts) == 3 else None
+    except ValueError:
+        raise ValueError(f"not a range: {text!r}") from None
+    if type(start) is not type(stop):
+        raise ValueError(f"range mixes numbers and dates: {text!r}")
+    if step is None:
+        step = 1 if stop >= start else -1
+    if step == 0 or (stop - start if isinstance(start, int) else (stop - start).days) * step < 0:
+        raise ValueError(f"empty range: {text!r}")
+    if isinstance(start, int):
+        return range(start, stop + (1 if step > 0 else -1), step)
+    days = (stop - start).days
+    return [start + timedelta(days=offset)
+            for offset in range(0, days + (1 if step > 0 else -1), step)]
+
+
+def _format(value, spec):
+    if isinstance(value, date):
+        return value.strftime(spec or "%Y-%m-%d")
+    return format(value, spec or "")
+
+
+class _Line:
+    __slots__ = ("parts", "ranges", "children", "number")
+
+    def __init__(self, text, number):
+        # parts: literal strings and (name, spec) fields; ranges: (name,
+        # values) for the fields that repeat the line
+        self.parts = []
+        self.ranges = []
+        self.children = []
+        self.number = number
+        pos = 0
+        for match in _FIELD.finditer(text):
+            self.parts.append(text[pos:match.start()])
+            pos = match.end()
+            token = match.group(0)
+            if token in ("{{", "}}"):
+                self.parts.append(token[0])
+                continue
+            field = _SPEC.match(match.group(1))
+            if field is None:
+                raise ValueError(f"bad field {token!r}")
+            name, values, spec = field.groups()
+            if values is not None:
+                if any(name == bound for bound, _ in self.ranges):
+                    raise ValueError(f"{name} is repeated twice")
+                self.ranges.append((name, _checked(parse_range(values), number)))
+            self.parts.append((name, (spec or "").strip()))
+        self.parts.append(text[pos:])
+        literal = "".join(part for part in self.parts if isinstance(part, str))
+        if "/" in literal or "\\" in literal:
+            raise ValueError("use indentation for subfolders, not slashes")
+
+    def bindings(self):
+        if not self.ranges:
+            return (None,)
+        names = [name for name, _ in self.ranges]
+        return (dict(zip(names, values))
+                for values in itertools.product(*(values for _, values in self.ranges)))
+
+    def render(self, scope):
+        out = []
+        for part in self.parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, spec = part
+            try:
+                out.append(_format(scope[name], spec))
+            except KeyError:
+                raise ValueError(f"line {self.number}: undefined variable {name!r}") from None
+        name = "".join(out).strip()
+        if not name or "/" in name or "\\" in name:
+            raise ValueError(f"line {self.number}: bad folder name {name!r}")
+        return name
+
+    def count(self):
+        repeats = 1
+        for _, values in self.ranges:
+            repeats *= len(values)
+        return repeats * (1 + sum(child.count() for child in self.children))
+
+
+class _Repeat:
+    __slots__ = ("name", "values", "children", "number")
+
+    def __init__(self, name, values, number):
+        self.name = name
+        self.values = values
+        self.children = []
+        self.number = number
+
+    def count(self):
+        return len(self.values) * sum(child.count() for child in self.children)
+
+
+def _checked(values, number):
+    for value in values:
+        if isinstance(value, str) and ("/" in value or "\\" in value):
+            raise ValueError(f"line {number}: value {value!r} contains a slash")
+    return values
+
+
+class Template:
+    """A parsed structure template; see the syntax notes above.
+
+    Parsing checks the whole template up front. expand() is a generator of
+    (depth, name) entries in pre-order, so even millions of folders are
+    produced one at a time and can be streamed into replicate_entries or a
+    structure file without ever being held as text.
+    """
+
+    def __init__(self, lines):
+        self.roots = []
+        # stack[d] holds the children list that depth-d lines append to;
+        # @for blocks do not add a level to the output
+        stack = [(self.roots, 0)]
+        for number, line in enumerate(lines, 1):
+            text = line.rstrip()
+            stripped = text.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            depth = (len(text) - len(text.lstrip())) // 2
+            if depth >= len(stack):
+                raise ValueError(f"line {number}: indented deeper than its parent")
+            del stack[depth + 1:]
+            siblings, out_depth = stack[depth]
+            try:
+                if stripped.startswith("@"):
+                    match = _FOR.match(stripped)
+                    if match is None:
+                        raise ValueError("expected '@for NAME in RANGE'")
+                    node = _Repeat(match.group(1), _checked(parse_range(match.group(2)), number),
+                                   number)
+                    stack.append((node.children, out_depth))
+                else:
+                    node = _Line(stripped, number)
+                    stack.append((node.children, out_depth + 1))
+            except ValueError as e:
+                message = str(e)
+                raise ValueError(message if message.startswith("line ")
+                                 else f"line {number}: {message}") from None
+            siblings.append(node)
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(text.splitlines())
+
+    def count(self):
+        # Number of folders expand() yields, without rendering any name
+        return sum(node.count() for node in self.roots)
+
+    def variables(self):
+        # Names the caller has to define (besides "today")
+        return _free(self.roots, {"today"})
+
+    def expand(self, variables=None):
+        scope = {"today": date.today()}
+        if variables:
+            scope.update(variables)
+        # Checked before the first folder is produced, not halfway through
+        missing = self.variables() - scope.keys()
+        if missing:
+            raise ValueError(f"undefined variable {', '.join(sorted(missing))}")
+        return _expand(self.roots, scope, 0)
+
+
+def _free(nodes, bound):
+    names = set()
+    for node in nodes:
+        if isinstance(node, _Repeat):
+            names |= _free(node.children, bound | {node.name})
+            continue
+        inner = bound | {name for name, _ in node.ranges}
+        names |= {part[0] for part in node.parts if isinstance(part, tuple)} - inner
+        names |= _free(node.children, inner)
+    return names
+
+
+def _expand(nodes, scope, depth):
+    for node in nodes:
+        if isinstance(node, _Repeat):
+            for value in node.values:
+                yield from _expand(node.children, {**scope, node.name: value}, depth)
+            continue
+        for bound in node.bindings():
+            inner = {**scope, **bound} if bound else scope
+            yield depth, node.render(inner)
+            if node.children:
+                yield from _expand(node.children, inner, depth + 1)
+
+
+def read_template(path):
+    with open_text(path) as f:
+        return Template(f)
+
+
+def parse_variables(items):
+    # ["client=ACME", "n=5"] -> {"client": "ACME", "n": 5}; ints and ISO
+    # dates are converted so specs like {n:03} work on them
+    variables = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"expected NAME=VALUE, got {item!r}")
+        variables[name.strip()] = _parse_item(value)
+    return variables
@@ -0,0 +1,98 @@
+import io
+import os
+from datetime import date
+
+from .tree import StructureTree, _parse_lines
+
+# Structure TXT files can be several GB; read through a large buffer and
+# write in joined chunks instead of one write() per line.
+READ_BUFFER = 1 << 20
+WRITE_CHUNK_LINES = 8192
+
+
+def open_text(path, mode="r"):
+    """Open a structure file for text I/O, (de)compressing .gz/.zst by suffix."""
+    binary_mode = mode[0] + "b"
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        import gzip
+        raw = gzip.open(path, binary_mode)
+    elif lower.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise OSError(f"Reading or writing .zst files needs the 'zstandard' package: {path}")
+        fileobj = open(path, binary_mode)
+        if mode[0] == "r":
+            raw = zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=True)
+        else:
+            raw = zstandard.ZstdCompressor().stream_writer(fileobj, closefd=True)
+    else:
+        return open(path, mode, encoding="utf-8", buffering=READ_BUFFER)
+    return io.TextIOWrapper(io.BufferedReader(raw, READ_BUFFER) if mode[0] == "r" else raw,
+                            encoding="utf-8")
+
+
+def read_lines(path):
+    # Structure lines of a TXT file, skipping blank lines and # comments
+    with open_text(path) as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                yield line.rstrip()
+
+
+def read_entries(path):
+    # (depth, name) pairs streamed from the file, never held as a whole
+    return _parse_lines(read_lines(path))
+
+
+def read_structure(path):
+    tree = StructureTree()
+    tree.extend(read_entries(path))
+    return tree
+
+
+def write_entries_to(f, entries, header=None):
+    if header:
+        f.write(f"# {header}\n")
+    count = 0
+    chunk = []
+    for depth, name in entries:
+        chunk.append(f"{'  ' * depth}{name}\n")
+        if len(chunk) >= WRITE_CHUNK_LINES:
+            f.write("".join(chunk))
+            count += len(chunk)
+            chunk.clear()
+    if chunk:
+        f.write("".join(chunk))
+        count += len(chunk)
+    return count
+
+
+def write_entries(entries, path, header=None):
+    """Stream (depth, name) entries to path; returns the number of lines."""
+    with open_text(path, "w") as f:
+        return write_entries_to(f, entries, header)
+
+
+def write_structure(tree, path):
+    return write_entries(tree.iter_entries(), path)
+
+
+def export_path(source_path, number=0, today=None, dest=None):
+    # <dest or source>/<yyyy.mm.dd>_folder-structure_<source folder name>[_NN].txt
+    stamp = (today or date.today()).strftime("%Y.%m.%d")
+    folder_name = os.path.basename(os.path.normpath(source_path))
+    safe_name = "".join(c if c.isalnum() or c in " -_" else "_" for c in folder_name).strip("_")
+    suffix = f"_{number:02d}" if number else ""
+    return os.path.join(dest or source_path, f"{stamp}_folder-structure_{safe_name}{suffix}.txt")
+
+
+def next_numbered_export_path(source_path, today=None, dest=None):
+    number = 1
+    while True:
+        path = export_path(source_path, number, today, dest)
+        if not os.path.exists(path):
+            return path
+        number += 1
@@ -0,0 +1,268 @@
+from array import array
+
+ROOT = 0
+NO_NODE = -1
+
+
+class StructureTree:
+    """Folder structure kept as parallel int arrays plus an interned name table.
+
+    Node 0 is an unnamed root; every other node is one folder. Children are
+    chained through first_child/next_sibling so edits never shift the arrays,
+    and deleted nodes are simply unlinked. That is 18 bytes per folder plus
+    one str per distinct name.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._name_ids = {}
+        self.parent = array("i", [NO_NODE])
+        self.depth = array("h", [-1])
+        self.name_id = array("i", [NO_NODE])
+        self.first_child = array("i", [NO_NODE])
+        self.next_sibling = array("i", [NO_NODE])
+        self.count = 0
+        # Open path for streaming appends: _stack[d] is the node at depth d - 1
+        # and _last[d] its most recently appended child.
+        self._stack = [ROOT]
+        self._last = [NO_NODE]
+
+    @classmethod
+    def from_lines(cls, lines):
+        tree = cls()
+        tree.extend_lines(lines)
+        return tree
+
+    @classmethod
+    def from_preorder(cls, names, parent, depth, name_id, size):
+        # Columns in pre-order with node 0 as the root and size[k] counting
+        # the subtree of k including itself, as stored in binary snapshots.
+        tree = cls()
+        count = len(parent)
+        tree.names = list(names)
+        tree._name_ids = {name: i for i, name in enumerate(tree.names)}
+        tree.parent = array("i", parent)
+        tree.depth = array("h", depth)
+        tree.name_id = array("i", name_id)
+        tree.first_child = array("i", [k + 1 if s > 1 else NO_NODE for k, s in enumerate(size)])
+        following = [k + s for k, s in enumerate(size)]
+        tree.next_sibling = array("i", [
+            nxt if nxt < count and parent[nxt] == p else NO_NODE
+            for nxt, p in zip(following, parent)])
+        tree.next_sibling[ROOT] = NO_NODE
+        tree.count = count - 1
+        tree._reset_stack()
+        return tree
+
+    def __len__(self):
+        return self.count
+
+    def copy(self):
+        # Independent tree with the same node ids; the columns are copied
+        # by slicing, which is a memcpy
+        tree = StructureTree()
+        tree.names = list(self.names)
+        tree._name_ids = dict(self._name_ids)
+        tree.parent = self.parent[:]
+        tree.depth = self.depth[:]
+        tree.name_id = self.name_id[:]
+        tree.first_child = self.first_child[:]
+        tree.next_sibling = self.next_sibling[:]
+        tree.count = self.count
+        tree._reset_stack()
+        return tree
+
+    def intern(self, name):
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+
+    def name(self, node):
+        return self.names[self.name_id[node]]
+
+    def _new_node(self, parent, name):
+        node = len(self.parent)
+        self.parent.append(parent)
+        self.depth.append(self.depth[parent] + 1)
+        self.name_id.append(self.intern(name))
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.count += 1
+        return node
+
+    def _reset_stack(self):
+        # After an edit, further appends continue at the end of the top level;
+        # the open path is rebuilt lazily so bursts of edits stay O(1) each.
+        self._stack = None
+
+    def _open_stack(self):
+        children = self.children(ROOT)
+        self._stack = [ROOT]
+        self._last = [children[-1] if children else NO_NODE]
+
+    def append(self, depth, name):
+        # Streaming append in pre-order: depth is relative to the root and is
+        # clamped to one below the previously appended node.
+        self.extend(((depth, name),))
+        return len(self.parent) - 1
+
+    def extend(self, entries):
+        if self._stack is None:
+            self._open_stack()
+        stack = self._stack
+        last = self._last
+        parent_of = self.parent
+        depth_of = self.depth
+        name_id = self.name_id
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        name_ids = self._name_ids
+        names = self.names
+        node = len(parent_of)
+        start = node
+        for depth, name in entries:
+            if depth < len(stack):
+                del stack[depth + 1:]
+                del last[depth + 1:]
+            else:
+                depth = len(stack) - 1
+            parent = stack[depth]
+            nid = name_ids.get(name)
+            if nid is None:
+                nid = name_ids[name] = len(names)
+                names.append(name)
+            parent_of.append(parent)
+            depth_of.append(depth)
+            name_id.append(nid)
+            first_child.append(NO_NODE)
+            next_sibling.append(NO_NODE)
+            prev = last[depth]
+            if prev == NO_NODE:
+                first_child[parent] = node
+            else:
+                next_sibling[prev] = node
+            last[depth] = node
+            stack.append(node)
+            last.append(NO_NODE)
+            node += 1
+        self.count += node - start
+
+    def extend_lines(self, lines):
+        self.extend(_parse_lines(lines))
+
+    def children(self, node=ROOT):
+        result = []
+        child = self.first_child[node]
+        next_sibling = self.next_sibling
+        while child != NO_NODE:
+            result.append(child)
+            child = next_sibling[child]
+        return result
+
+    def _link(self, node, parent, after):
+        if after == NO_NODE:
+            self.next_sibling[node] = self.first_child[parent]
+            self.first_child[parent] = node
+        else:
+            self.next_sibling[node] = self.next_sibling[after]
+            self.next_sibling[after] = node
+
+    def _unlink(self, node):
+        parent = self.parent[node]
+        prev = NO_NODE
+        child = self.first_child[parent]
+        while child != node:
+            prev = child
+            child = self.next_sibling[child]
+        following = self.next_sibling[node]
+        if prev == NO_NODE:
+            self.first_child[parent] = following
+        else:
+            self.next_sibling[prev] = following
+
+    def insert(self, parent, name, after=NO_NODE):
+        node = self._new_node(parent, name)
+        self._link(node, parent, after)
+        self._reset_stack()
+        return node
+
+    def remove(self, node):
+        self._unlink(node)
+        self.count -= self.subtree_size(node)
+        self.parent[node] = NO_NODE
+        self._reset_stack()
+
+    def move(self, node, parent, after=NO_NODE, name=None):
+        # Relink node (and its whole subtree) under parent, optionally renamed
+        self._unlink(node)
+        self.parent[node] = parent
+        self._link(node, parent, after)
+        if name is not None:
+            self.rename(node, name)
+        shift = self.depth[parent] + 1 - self.depth[node]
+        if shift:
+            depth = self.depth
+            depth[node] += shift
+            for child in self.iter_nodes(node):
+                depth[child] += shift
+        self._reset_stack()
+
+    def rename(self, node, name):
+        self.name_id[node] = self.intern(name)
+
+    def subtree_size(self, node):
+        size = 1
+        for _ in self.iter_nodes(node):
+            size += 1
+        return size
+
+    def iter_nodes(self, node=ROOT):
+        # Pre-order over the descendants of node, excluding node itself
+        first_child = self.first_child
+        next_sibling = self.next_sibling
+        pending = []
+        current = first_child[node]
+        while current != NO_NODE:
+            yield current
+            child = first_child[current]
+            if child != NO_NODE:
+                pending.append(next_sibling[current])
+                current = child
+            else:
+                current = next_sibling[current]
+            while current == NO_NODE and pending:
+                current = pending.pop()
+
+    def iter_entries(self, node=ROOT):
+        base = self.depth[node] + 1
+        depth = self.depth
+        names = self.names
+        name_id = self.name_id
+        for current in self.iter_nodes(node):
+            yield depth[current] - base, names[name_id[current]]
+
+    def iter_lines(self, node=ROOT):
+        for depth, name in self.iter_entries(node):
+            yield f"{'  ' * depth}{name}"
+
+    def path(self, node):
+        parts = []
+        while node != ROOT and node != NO_NODE:
+            parts.append(self.name(node))
+            node = self.parent[node]
+        parts.reverse()
+        return parts
+
+
+def _parse_lines(lines):
+    # Indented TXT -> (depth, name); two spaces per level, blank lines skipped.
+    # Anything after a tab is an annotation (file statistics) and is ignored.
+    for line in lines:
+        name = line.strip()
+        if name:
+            if "\t" in name:
+                name = name.split("\t", 1)[0].rstrip()
+            yield (len(line) - len(line.lstrip())) // 2, name
@@ -0,0 +1,585 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+from .scanner import _list_subdirs
+from .tree import ROOT, NO_NODE
+
+# Watcher events are tuples of a kind and folder paths relative to the
+# watched root, each path a tuple of names:
+#   ("created", path)    ("deleted", path)    ("moved", src, dst)
+#   ("rescan",)          the watcher lost track; rescan the whole root
+CREATED = "created"
+DELETED = "deleted"
+MOVED = "moved"
+RESCAN = "rescan"
+
+DEFAULT_DEBOUNCE = 0.25
+DEFAULT_MAX_DELAY = 1.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF
+              | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+_EVENT = struct.Struct("iIII")
+# A rename shows up as MOVED_FROM + MOVED_TO with the same cookie; a
+# MOVED_FROM left unpaired this long means the folder left the root.
+MOVE_PAIR_SECONDS = 0.05
+
+
+def _is_under(path, prefix):
+    return path[:len(prefix)] == prefix
+
+
+def _rebase(path, src, dst):
+    return dst + path[len(src):] if _is_under(path, src) else path
+
+
+def coalesce(events):
+    """Drop events made redundant by later ones in the same batch.
+
+    Folders created and deleted again within the batch vanish entirely, as do
+    events for anything below a folder that is deleted later on. A folder
+    renamed after it was created (or renamed before) keeps one event at its
+    final name, and a renamed folder that is then deleted is reported as
+    deleted under its original name.
+    """
+    result = []
+    for event in events:
+        kind = event[0]
+        if kind == DELETED:
+            result, new_here = _before_delete(result, event[1])
+            if new_here:
+                continue
+        elif kind == MOVED and _merge_move(result, event[1], event[2]):
+            continue
+        result.append(event)
+    return result
+
+
+def _before_delete(events, path):
+    # events without what a delete of path makes redundant, and whether the
+    # folder at path only came into being within them
+    kept = []
+    new_here = False
+    for event in events:
+        kind = event[0]
+        if kind == MOVED:
+            src, dst = event[1], event[2]
+            if _is_under(dst, path):
+                new_here = new_here or dst == path
+                if not _is_under(src, path):
+                    # The folder moved in goes too: it was deleted where it was
+                    kept, src_new = _before_delete(kept, src)
+                    if not src_new:
+                        kept.append((DELETED, src))
+                continue
+        elif kind == CREATED and _is_under(event[1], path):
+            new_here = new_here or event[1] == path
+            continue
+        elif kind == DELETED and len(event[1]) > len(path) and _is_under(event[1], path):
+            continue
+        kept.append(event)
+    return kept, new_here
+
+
+def _merge_move(events, src, dst):
+    # Fold a move of src into the event that made src, if it is in events
+    for i in range(len(events) - 1, -1, -1):
+        event = events[i]
+        kind = event[0]
+        if kind == CREATED and event[1] == src:
+            events[i] = (CREATED, dst)
+        elif kind == MOVED and event[2] == src:
+            if event[1] == dst:
+                # Moved back where it was
+                del events[i]
+                i -= 1
+            else:
+                events[i] = (MOVED, event[1], dst)
+        elif kind in (DELETED, MOVED) and event[1] == src:
+            return False
+        else:
+            continue
+        # Later events below src refer to the folder by its new name now
+        for j in range(i + 1, len(events)):
+            later = events[j]
+            if later[0] != RESCAN:
+                events[j] = (later[0],) + tuple(_rebase(path, src, dst) for path in later[1:])
+        return True
+    return False
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, root_path, recursive, emit, prune=None):
+        import ctypes
+        import ctypes.util
+        self.root_path = root_path
+        self.recursive = recursive
+        self.emit = emit
+        self.prune = prune
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = (ctypes.c_int, ctypes.c_int)
+        self._get_errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        self._wds = {}
+        self._moved_from = {}
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _watch(self, rel):
+        wd = self._add(self.fd, os.fsencode(os.path.join(self.root_path, *rel)), WATCH_MASK)
+        if wd < 0:
+            err = self._get_errno()
+            if err == 28:
+                # ENOSPC: out of inotify watches, let the caller fall back
+                raise OSError(err, "inotify watch limit reached")
+            return False
+        self._paths[wd] = rel
+        self._wds[rel] = wd
+        return True
+
+    def add_tree(self, rel, report=False):
+        # Watch rel and, when recursive, every folder below it. New folders
+        # can gain subfolders before their watch exists, so those found here
+        # are reported as created.
+        if not self._watch(rel):
+            return
+        if not self.recursive:
+            return
+        pending = [rel]
+        while pending:
+            current = pending.pop()
+            try:
+                names = _list_subdirs(os.path.join(self.root_path, *current))
+            except OSError:
+                continue
+            for name in names:
+                child = current + (name,)
+                if self.prune is not None and self.prune(child):
+                    continue
+                if report:
+                    self.emit((CREATED, child))
+                if self._watch(child):
+                    pending.append(child)
+
+    def _forget(self, rel, unwatch):
+        for path in [path for path in self._wds if _is_under(path, rel)]:
+            wd = self._wds.pop(path)
+            self._paths.pop(wd, None)
+            if unwatch:
+                self._rm(self.fd, wd)
+
+    def _rename(self, src, dst):
+        moved = [(path, wd) for path, wd in self._wds.items() if _is_under(path, src)]
+        for path, wd in moved:
+            del self._wds[path]
+        for path, wd in moved:
+            new_path = dst + path[len(src):]
+            self._wds[new_path] = wd
+            self._paths[wd] = new_path
+
+    def start(self):
+        self.add_tree(())
+
+    def run_once(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                data = b""
+            self._handle(data)
+        self._flush_moves(time.monotonic() - MOVE_PAIR_SECONDS)
+
+    def _handle(self, data):
+        offset = 0
+        size = _EVENT.size
+        now = time.monotonic()
+        while offset + size <= len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + size:offset + size + length].rstrip(b"\0"))
+            offset += size + length
+            if mask & IN_Q_OVERFLOW:
+                self.emit((RESCAN,))
+                continue
+            parent = self._paths.get(wd)
+            if mask & IN_IGNORED:
+                if parent is not None and self._wds.get(parent) == wd:
+                    del self._wds[parent]
+                self._paths.pop(wd, None)
+                continue
+            if parent is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                if parent == ():
+                    self.emit((RESCAN,))
+                continue
+            if not mask & IN_ISDIR:
+                continue
+            path = parent + (name,)
+            if self.prune is not None and self.prune(path):
+                if mask & IN_MOVED_TO:
+                    # Renamed into an excluded name: gone as far as we care
+                    source = self._moved_from.pop(cookie, None)
+                    if source is not None:
+                        self.emit((DELETED, source[0]))
+                        self._forget(source[0], unwatch=True)
+                continue
+            if mask & IN_CREATE:
+                self.emit((CREATED, path))
+                if self.recursive:
+                    self.add_tree(path, report=True)
+            elif mask & IN_DELETE:
+                self.emit((DELETED, path))
+                self._forget(path, unwatch=False)
+            elif mask & IN_MOVED_FROM:
+                self._moved_from[cookie] = (path, now)
+            elif mask & IN_MOVED_TO:
+                source = self._moved_from.pop(cookie, None)
+                if source is not None:
+                    self.emit((MOVED, source[0], path))
+                    self._forget(path, unwatch=True)
+                    self._rename(source[0], path)
+                else:
+                    self.emit((CREATED, path))
+                    if self.recursive:
+                        self.add_tree(path, report=True)
+
+    def _flush_moves(self, before):
+        for cookie, (path, seen) in list(self._moved_from.items()):
+            if seen <= before:
+                del self._moved_from[cookie]
+                self.emit((DELETED, path))
+                self._forget(path, unwatch=True)
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self, root_path, recursive, emit, interval=DEFAULT_POLL_INTERVAL, prune=None):
+        self.root_path = root_path
+        self.recursive = recursive
+        self.emit = emit
+        self.prune = prune
+        self.interval = interval
+        # rel path -> [mtime_ns, sorted child names]
+        self._state = {}
+        self._next_poll = 0.0
+
+    def close(self):
+        self._state = {}
+
+    def _record(self, rel, report):
+        path = os.path.join(self.root_path, *rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            names = self._list(rel, path)
+        except OSError:
+            return False
+        self._state[rel] = [mtime, names]
+        if self.recursive:
+            for name in names:
+                child = rel + (name,)
+                if report:
+                    self.emit((CREATED, child))
+                self._record(child, report)
+        return True
+
+    def _list(self, rel, path):
+        names = _list_subdirs(path)
+        if self.prune is not None:
+            names = [name for name in names if not self.prune(rel + (name,))]
+        return names
+
+    def _drop(self, rel):
+        entry = self._state.pop(rel, None)
+        if entry is not None:
+            for name in entry[1]:
+                self._drop(rel + (name,))
+
+    def start(self):
+        if not self._record((), report=False):
+            raise OSError(f"Cannot watch {self.root_path}")
+        self._next_poll = time.monotonic() + self.interval
+
+    def run_once(self, timeout):
+        delay = self._next_poll - time.monotonic()
+        if delay > 0:
+            time.sleep(min(delay, timeout))
+            return
+        self._next_poll = time.monotonic() + self.interval
+        for rel in list(self._state):
+            entry = self._state.get(rel)
+            if entry is None:
+                continue
+            path = os.path.join(self.root_path, *rel)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if mtime == entry[0]:
+                    continue
+                names = self._list(rel, path)
+            except OSError:
+                if rel == ():
+                    self.emit((RESCAN,))
+                continue
+            old = set(entry[1])
+            new = set(names)
+            entry[0] = mtime
+            entry[1] = names
+            for name in sorted(old - new):
+                self.emit((DELETED, rel + (name,)))
+                self._drop(rel + (name,))
+            for name in names:
+                if name not in old:
+                    self.emit((CREATED, rel + (name,)))
+                    if self.recursive:
+                        self._record(rel + (name,), report=True)
+
+
+class FolderWatcher:
+    """Watch a folder tree and report folder changes in debounced batches.
+
+    Uses inotify on Linux and falls back to polling (stat every known folder
+    every poll_interval seconds) elsewhere or when inotify runs out of
+    watches. callback(events) runs on the watcher thread with a coalesced
+    list of events once no new event arrived for debounce seconds, or at the
+    latest max_delay seconds after the first one.
+    """
+
+    def __init__(self, root_path, callback, recursive=True, debounce=DEFAULT_DEBOUNCE,
+                 max_delay=DEFAULT_MAX_DELAY, poll_interval=DEFAULT_POLL_INTERVAL,
+                 use_inotify=True, scan_filter=None):
+        self.root_path = root_path
+        self.callback = callback
+        self.recursive = recursive
+        self.scan_filter = scan_filter if scan_filter is not None and scan_filter.active else None
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.backend = None
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = []
+        self._first = 0.0
+        self._last = 0.0
+        self._thread = None
+
+    @property
+    def method(self):
+        return self.backend.name if self.backend is not None else None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _emit(self, event):
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending:
+                self._first = now
+            self._pending.append(event)
+            self._last = now
+
+    def _prune(self, path):
+        # Excluded, hidden or too deep folders are neither watched nor reported
+        return self.scan_filter.prunes(path[-1], "/".join(path), len(path) - 1)
+
+    def _polling_backend(self):
+        prune = self._prune if self.scan_filter is not None else None
+        return _PollingBackend(self.root_path, self.recursive, self._emit, self.poll_interval, prune)
+
+    def _open_backend(self):
+        if self.use_inotify:
+            backend = None
+            prune = self._prune if self.scan_filter is not None else None
+            try:
+                backend = _InotifyBackend(self.root_path, self.recursive, self._emit, prune)
+                backend.start()
+                return backend
+            except (OSError, AttributeError):
+                if backend is not None:
+                    backend.close()
+        backend = self._polling_backend()
+        backend.start()
+        return backend
+
+    def _run(self):
+        try:
+            self.backend = self._open_backend()
+        except OSError:
+            self.ready.set()
+            self.callback([(RESCAN,)])
+            return
+        self.ready.set()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.backend.run_once(min(self.debounce, 0.2))
+                except OSError:
+                    # Typically the inotify watch limit; carry on by polling
+                    # and let the consumer resynchronise with a rescan.
+                    self.backend.close()
+                    self.backend = self._polling_backend()
+                    self.backend.start()
+                    self._emit((RESCAN,))
+                self._deliver()
+        finally:
+            self.backend.close()
+
+    def _deliver(self):
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending:
+                return
+            if now - self._last < self.debounce and now - self._first < self.max_delay:
+                return
+            events = self._pending
+            self._pending = []
+        events = coalesce(events)
+        if events and not self._stop.is_set():
+            self.callback(events)
+
+
+class _Siblings:
+    # Children of one parent as parallel name/node lists plus a name index,
+    # built once per batch so repeated lookups stay cheap.
+    def __init__(self, tree, parent):
+        self.nodes = tree.children(parent)
+        self.names = [tree.name(node) for node in self.nodes]
+        self.index = dict(zip(self.names, self.nodes))
+
+    def slot(self, name):
+        # Scanned children are sorted by name; keep new ones in order
+        pos = bisect_left(self.names, name)
+        return pos, self.nodes[pos - 1] if pos else NO_NODE
+
+    def add(self, pos, name, node):
+        self.names.insert(pos, name)
+        self.nodes.insert(pos, node)
+        self.index[name] = node
+
+    def discard(self, name):
+        node = self.index.pop(name)
+        pos = self.nodes.index(node)
+        del self.nodes[pos]
+        del self.names[pos]
+
+
+def apply_events(tree, events, editor=None, scan_filter=None):
+    """Apply watcher events to tree and return the number of changes made.
+
+    Edits go through editor (default: the tree itself), which needs the
+    StructureTree insert/remove/move signatures; a Qt model can pass itself
+    to get row notifications. Events that no longer fit the tree (already
+    applied, or below a folder the tree does not know) are skipped, as are
+    folders the optional ScanFilter would have left out of the scan.
+    """
+    if scan_filter is not None and not scan_filter.active:
+        scan_filter = None
+    if editor is None:
+        editor = tree
+    siblings = {}
+
+    def children_of(node):
+        entry = siblings.get(node)
+        if entry is None:
+            entry = siblings[node] = _Siblings(tree, node)
+        return entry
+
+    def find(path):
+        node = ROOT
+        for name in path:
+            node = children_of(node).index.get(name, NO_NODE)
+            if node == NO_NODE:
+                break
+        return node
+
+    def remove(node, name):
+        children_of(tree.parent[node]).discard(name)
+        editor.remove(node)
+
+    applied = 0
+    for event in events:
+        kind = event[0]
+        if kind == CREATED:
+            path = event[1]
+            if scan_filter is not None and not scan_filter.allows(path):
+                continue
+            parent = find(path[:-1])
+            if parent == NO_NODE or find(path) != NO_NODE:
+                continue
+            entry = children_of(parent)
+            pos, after = entry.slot(path[-1])
+            entry.add(pos, path[-1], editor.insert(parent, path[-1], after))
+        elif kind == DELETED:
+            path = event[1]
+            node = find(path)
+            if node == NO_NODE:
+                continue
+            remove(node, path[-1])
+        elif kind == MOVED:
+            src, dst = event[1], event[2]
+            node = find(src)
+            parent = find(dst[:-1])
+            if scan_filter is not None and not scan_filter.allows(dst):
+                parent = NO_NODE
+            existing = find(dst) if parent != NO_NODE else NO_NODE
+            if node == NO_NODE and (parent == NO_NODE or existing != NO_NODE):
+                # Already applied, or nowhere to put it
+                continue
+            if existing != NO_NODE and existing != node:
+                remove(existing, dst[-1])
+            if node == NO_NODE:
+                entry = children_of(parent)
+                pos, after = entry.slot(dst[-1])
+                entry.add(pos, dst[-1], editor.insert(parent, dst[-1], after))
+            elif parent == NO_NODE:
+                remove(node, src[-1])
+            elif existing != node:
+                children_of(tree.parent[node]).discard(src[-1])
+                entry = children_of(parent)
+                pos, after = entry.slot(dst[-1])
+                editor.move(node, parent, after, dst[-1])
+                entry.add(pos, dst[-1], node)
+            else:
+                continue
+        else:
+            continue
+        applied += 1
+    return applied
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main"))
+
+
+def folders(root):
+    """Relative paths of every folder below root, with "/" separators."""
+    found = set()
+    for path, dirs, _ in os.walk(root):
+        for name in dirs:
+            found.add(os.path.relpath(os.path.join(path, name), root).replace(os.sep, "/"))
+    return found
+
+
+@pytest.fixture
+def dest(tmp_path):
+    path = str(tmp_path / "dest")
+    os.mkdir(path)
+    return path
@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from structify.batch import (DIFFERS, FAILED, MATCH, batch_compare, expand_roots, read_root_list,
+                             write_report)
+from structify.filters import ScanFilter
+from structify.tree import StructureTree
+
+TEMPLATE = ["docs", "  2024", "src", "  app"]
+
+
+def make(root, *paths):
+    os.mkdir(root)
+    for path in paths:
+        os.makedirs(os.path.join(root, *path.split("/")))
+    return root
+
+
+@pytest.fixture
+def roots(tmp_path):
+    base = str(tmp_path)
+    same = make(os.path.join(base, "same"), "docs/2024", "src/app")
+    # src/app is missing, tmp is extra
+    other = make(os.path.join(base, "other"), "docs/2024", "src", "tmp/cache")
+    missing = os.path.join(base, "missing")
+    not_a_folder = os.path.join(base, "file")
+    with open(not_a_folder, "w") as f:
+        f.write("not a folder")
+    return [same, other, missing, not_a_folder]
+
+
+def compare(roots, jobs, **kwargs):
+    return list(batch_compare(StructureTree.from_lines(TEMPLATE), roots, jobs=jobs, workers=2,
+                              **kwargs))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_reports_in_root_order(roots, jobs):
+    reports = compare(roots, jobs)
+    assert [r.root for r in reports] == roots
+    assert [r.status for r in reports] == [MATCH, DIFFERS, FAILED, FAILED]
+    same, other, missing, not_a_folder = reports
+    assert (same.folders, same.missing, same.extra, same.differences) == (4, 0, 0, [])
+    assert (other.folders, other.missing, other.extra) == (5, 1, 2)
+    assert other.differences == ["-src/app", "+tmp"]
+    assert missing.error == not_a_folder.error == "not a folder"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_filter_and_limit_reach_the_workers(roots, jobs):
+    reports = compare(roots[:2], jobs, scan_filter=ScanFilter(exclude=["tmp"]), limit=1)
+    assert [r.status for r in reports] == [MATCH, DIFFERS]
+    assert (reports[1].missing, reports[1].extra) == (1, 0)
+    assert reports[1].differences == ["-src/app"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_cancel(roots, jobs):
+    cancel = threading.Event()
+    cancel.set()
+    assert compare(roots, jobs, cancel=cancel) == []
+
+
+def test_expand_roots(tmp_path, roots):
+    pattern = os.path.join(str(tmp_path), "*")
+    # Globs only keep folders; plain entries stay so they can be reported
+    assert expand_roots([pattern, roots[0], roots[2]]) == sorted(roots[:2]) + [roots[2]]
+    assert read_root_list(["# roots\n", "\n", " /a \n", "/b/*\n"]) == ["/a", "/b/*"]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "json"])
+def test_write_report(roots, fmt):
+    out = io.StringIO()
+    counts = write_report(compare(roots, 1), out, fmt)
+    assert counts == {MATCH: 1, DIFFERS: 1, FAILED: 2}
+    if fmt == "json":
+        rows = json.loads(out.getvalue())
+        assert [row["status"] for row in rows] == [MATCH, DIFFERS, FAILED, FAILED]
+        assert rows[1]["differences"] == ["-src/app", "+tmp"]
+    else:
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "root,status,folders,missing,extra,differences,error"
+        assert lines[2].endswith(",differs,5,1,2,-src/app; +tmp,")
@@ -0,0 +1,90 @@
+from structify.diff import diff_trees, subtree_hashes
+from structify.tree import StructureTree
+
+LEFT = [
+    "docs",
+    "  2024",
+    "    q1",
+    "    q2",
+    "  old",
+    "src",
+    "  app",
+    "    views",
+    "    models",
+    "  lib",
+]
+
+
+def tree(lines):
+    return StructureTree.from_lines(lines)
+
+
+def test_identical_trees():
+    diff = diff_trees(tree(LEFT), tree(LEFT))
+    assert diff.identical
+    assert (diff.left_count, diff.right_count) == (10, 10)
+    assert diff.compared == 0
+
+
+def test_sibling_order_does_not_matter():
+    reordered = ["src", "  lib", "  app", "    models", "    views",
+                 "docs", "  old", "  2024", "    q2", "    q1"]
+    assert diff_trees(tree(LEFT), tree(reordered)).identical
+
+
+def test_removed_and_added_report_topmost_folders():
+    right = [line for line in LEFT if line.strip() not in ("2024", "q1", "q2")]
+    right += ["tests", "  unit", "  e2e"]
+    diff = diff_trees(tree(LEFT), tree(right))
+    assert diff.removed == [(("docs", "2024"), 3)]
+    assert diff.added == [(("tests",), 3)]
+    assert diff.moved == []
+    assert diff.removed_folders() == 3
+    assert diff.added_folders() == 3
+
+
+def test_moved_subtree():
+    right = ["docs", "  old", "  archive", "    2024", "      q1", "      q2",
+             "src", "  app", "    views", "    models", "  lib"]
+    diff = diff_trees(tree(LEFT), tree(right))
+    assert diff.moved == [(("docs", "2024"), ("docs", "archive", "2024"), 3)]
+    assert diff.removed == []
+    # The new parent of the moved folder is added on its own
+    assert diff.added == [(("docs", "archive"), 1)]
+    assert diff.moved_folders() == 3
+
+    plain = diff_trees(tree(LEFT), tree(right), detect_moves=False)
+    assert plain.moved == []
+    assert plain.removed == [(("docs", "2024"), 3)]
+    assert plain.added == [(("docs", "archive"), 4)]
+
+
+def test_changed_leaf_descends_only_the_changed_path():
+    right = list(LEFT)
+    right[right.index("    views")] = "    templates"
+    diff = diff_trees(tree(LEFT), tree(right))
+    assert diff.removed == [(("src", "app", "views"), 1)]
+    assert diff.added == [(("src", "app", "templates"), 1)]
+    # root, src and src/app; docs has an equal hash and is never opened
+    assert diff.compared == 3
+
+
+def test_duplicate_sibling_names_stay_apart():
+    # A TXT may repeat a name under one parent; each occurrence is compared
+    # with the same occurrence on the other side, not merged
+    left = ["a", "  x", "a", "  y"]
+    assert diff_trees(tree(left), tree(left)).identical
+    right = ["a", "  x", "a", "  z"]
+    diff = diff_trees(tree(left), tree(right), detect_moves=False)
+    assert diff.removed == [(("a", "y"), 1)]
+    assert diff.added == [(("a", "z"), 1)]
+    diff = diff_trees(tree(left), tree(["a", "  x"]))
+    assert diff.removed == [(("a",), 2)]
+    assert diff.added == []
+
+
+def test_left_hashes_can_be_reused():
+    left = tree(LEFT)
+    hashes = subtree_hashes(left)
+    right = tree(LEFT[:-1])
+    assert diff_trees(left, right, left_hashes=hashes).removed == [(("src", "lib"), 1)]
@@ -0,0 +1,83 @@
+import os
+import random
+
+import pytest
+
+from structify.diff import diff_trees, format_path
+from structify.extsort import diff_sorted, external_diff, full_paths, sorted_lines
+from structify.tree import StructureTree
+
+
+def random_entries(rng, count, changed=()):
+    # Pre-order (depth, name) with unique sibling names; names in `changed`
+    # get a suffix so the other side sees them (and their subtree) differ
+    entries = []
+    depth = 0
+    for i in range(count):
+        depth = rng.randint(0, depth + 1) if entries else 0
+        name = f"n{i}"
+        entries.append((depth, name + "_x" if name in changed else name))
+    return entries
+
+
+def expected(left, right):
+    diff = diff_trees(left, right, detect_moves=False)
+    return sorted([("L", format_path(path), size) for path, size in diff.removed]
+                  + [("R", format_path(path), size) for path, size in diff.added])
+
+
+def sorted_paths(entries):
+    return sorted(full_paths(entries))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_diff_sorted_agrees_with_diff_trees(seed):
+    count = 300
+    changed = {f"n{i}" for i in random.Random(seed + 100).sample(range(count), 12)}
+    left_entries = random_entries(random.Random(seed), count)
+    right_entries = random_entries(random.Random(seed), count, changed)
+    # Drop a few folders from the right side entirely
+    right_entries = [entry for i, entry in enumerate(right_entries) if i % 97 != 5]
+    left = StructureTree()
+    left.extend(left_entries)
+    right = StructureTree()
+    right.extend(right_entries)
+    got = sorted(diff_sorted(sorted_paths(left.iter_entries()),
+                             sorted_paths(right.iter_entries())))
+    assert got == expected(left, right)
+    assert got
+
+
+def test_identical_streams():
+    entries = [(0, "a"), (1, "b"), (0, "c")]
+    assert list(diff_sorted(sorted_paths(entries), sorted_paths(entries))) == []
+
+
+def test_prefix_names_are_not_subtrees():
+    # "ab" sorts right after "a" but is a sibling, not a child
+    left = [(0, "a"), (1, "x"), (0, "ab")]
+    right = [(0, "ab")]
+    assert list(diff_sorted(sorted_paths(left), sorted_paths(right))) == [("L", "a", 2)]
+
+
+def test_external_diff_spills_to_disk(tmp_path):
+    left_entries = random_entries(random.Random(7), 2000)
+    right_entries = random_entries(random.Random(7), 2000, {"n10", "n500", "n1999"})
+    left = StructureTree()
+    left.extend(left_entries)
+    right = StructureTree()
+    right.extend(right_entries)
+    # A 16 KB cap forces many run files and a merge
+    got = sorted(external_diff(left.iter_entries(), right.iter_entries(), 16 << 10,
+                               tmpdir=str(tmp_path)))
+    assert got == expected(left, right)
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_sorted_lines_removes_its_runs_when_closed(tmp_path):
+    lines = [f"{i:05d}\n" for i in range(5000, 0, -1)]
+    stream = sorted_lines(iter(lines), 4 << 10, str(tmp_path))
+    assert next(stream) == "00001\n"
+    assert os.listdir(str(tmp_path))
+    stream.close()
+    assert os.listdir(str(tmp_path)) == []
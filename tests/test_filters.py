@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from structify.filters import ScanFilter, split_patterns
+from structify.scanner import (filtered_expand, get_folder_structure, list_children,
+                               list_children_and_links, walk_nodes)
+
+FOLDERS = ("src/app/deep", "src/node_modules/pkg/inner", "build/out", ".git/objects",
+           "docs/2024/q1", "docs/old.bak")
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = str(tmp_path / "root")
+    for path in FOLDERS:
+        os.makedirs(os.path.join(root, *path.split("/")))
+    return root
+
+
+def scan(root, scan_filter, workers=1):
+    return get_folder_structure(root, workers=workers, scan_filter=scan_filter)
+
+
+def listed(root, scan_filter):
+    # Folders the filtered walk actually opens, relative to root
+    seen = []
+    children = list_children_and_links if scan_filter.include_symlinks else list_children
+
+    def expand(path, node):
+        seen.append(os.path.relpath(path, root).replace(os.sep, "/"))
+        return children(path, node)
+
+    list(walk_nodes(root, 1, expand=filtered_expand(root, scan_filter, expand)))
+    return seen
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_excluded_subtrees_are_never_listed(root, workers):
+    scan_filter = ScanFilter(exclude=["node_modules", "*.bak", "re:^bui"])
+    assert scan(root, scan_filter, workers) == [
+        ".git", "  objects", "docs", "  2024", "    q1", "src", "  app", "    deep"]
+    seen = listed(root, scan_filter)
+    assert not any(path.startswith(("src/node_modules", "build", "docs/old.bak"))
+                   for path in seen)
+    assert "src/app" in seen
+
+
+def test_path_patterns_match_from_the_root(root):
+    # Only src/app goes; a pattern with "/" never matches a bare name
+    assert scan(root, ScanFilter(exclude=["src/app"])) == [
+        ".git", "  objects", "build", "  out", "docs", "  2024", "    q1", "  old.bak",
+        "src", "  node_modules", "    pkg", "      inner"]
+    assert "deep" not in " ".join(scan(root, ScanFilter(exclude=["re:^src/a"])))
+
+
+def test_max_depth(root):
+    scan_filter = ScanFilter(max_depth=2)
+    assert scan(root, scan_filter) == [
+        ".git", "  objects", "build", "  out", "docs", "  2024", "  old.bak",
+        "src", "  app", "  node_modules"]
+    # Folders at the limit are never opened
+    assert sorted(listed(root, scan_filter)) == [".", ".git", "build", "docs", "src"]
+    assert scan_filter.allows(("src", "app"))
+    assert not scan_filter.allows(("src", "app", "deep"))
+
+
+def test_include_keeps_ancestors_of_matches(root):
+    assert scan(root, ScanFilter(include=["q1"])) == ["docs", "  2024", "    q1"]
+    # A matching folder brings its whole subtree
+    assert scan(root, ScanFilter(include=["node_modules", "out"])) == [
+        "build", "  out", "src", "  node_modules", "    pkg", "      inner"]
+    # Excludes still win inside an included subtree
+    assert scan(root, ScanFilter(include=["src"], exclude=["pkg"])) == [
+        "src", "  app", "    deep", "  node_modules"]
+    scan_filter = ScanFilter(include=["q1"])
+    assert scan_filter.allows(("docs", "2024", "q1"))
+    assert not scan_filter.allows(("docs", "2024"))
+
+
+def test_hidden_folders(root):
+    scan_filter = ScanFilter(skip_hidden=True)
+    assert scan(root, scan_filter)[:2] == ["build", "  out"]
+    assert not any(path.startswith(".git") for path in listed(root, scan_filter))
+    assert get_folder_structure(root, recursive=False, scan_filter=scan_filter) == [
+        "build", "docs", "src"]
+
+
+def test_symlinked_folders(root):
+    try:
+        os.symlink(os.path.join(root, "docs"), os.path.join(root, "link"),
+                   target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks are not supported here")
+    assert "link" not in scan(root, ScanFilter())
+    assert "link" not in scan(root, ScanFilter(skip_hidden=True))
+    # Listed, but never entered
+    lines = scan(root, ScanFilter(include_symlinks=True))
+    assert lines[lines.index("link") + 1] == "src"
+    seen = listed(root, ScanFilter(include_symlinks=True))
+    assert "docs/2024" in seen and "link" not in seen
+
+
+def test_dict_round_trip():
+    scan_filter = ScanFilter(["src"], ["node_modules", "re:\\.bak$"], 3, True, True)
+    copy = ScanFilter.from_dict(scan_filter.to_dict())
+    assert copy.to_dict() == scan_filter.to_dict()
+    assert copy.key() == scan_filter.key()
+    assert copy.active
+    empty = ScanFilter.from_dict({})
+    assert not empty.active
+    assert empty.key() == ScanFilter().key()
+    assert split_patterns("node_modules, .git; *.bak\n") == ["node_modules", ".git", "*.bak"]
@@ -0,0 +1,154 @@
+import time
+
+import pytest
+
+from structify.diff import diff_trees
+from structify.history import HistoryStore, retained
+from structify.tree import StructureTree
+
+LINES = [
+    "docs",
+    "  2024",
+    "    q1",
+    "    q2",
+    "  old",
+    "src",
+    "  app",
+    "  lib",
+]
+DAY = 86400
+
+
+def tree(lines):
+    return StructureTree.from_lines(lines)
+
+
+def object_count(store):
+    return store._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+
+def refs(store):
+    return dict(store._db.execute("SELECT hash, refs FROM objects"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        yield store
+
+
+def test_round_trip(store):
+    snapshot = store.add_tree("root", tree(LINES), label="first")
+    assert snapshot.folders == 8
+    assert list(store.to_tree(snapshot.id).iter_lines()) == LINES
+    assert [s.label for s in store.snapshots("root")] == ["first"]
+    assert store.snapshots("other") == []
+    with pytest.raises(KeyError):
+        store.get(snapshot.id + 1)
+
+
+def test_unchanged_subtrees_are_stored_once(store):
+    first = store.add_tree("root", tree(LINES))
+    # Every distinct folder content once: q1, q2 and old, lib and app are
+    # all empty and share one object
+    assert first.new_objects == object_count(store) == 5
+    again = store.add_tree("root", tree(LINES))
+    assert again.new_objects == 0
+    changed = LINES + ["    tests"]
+    third = store.add_tree("root", tree(changed))
+    # Only src, the changed lib and the new root
+    assert third.new_objects == 3
+    assert object_count(store) == 8
+
+
+def test_reference_counts(store):
+    store.add_tree("root", tree(LINES))
+    store.add_tree("root", tree(LINES))
+    counts = refs(store)
+    root = store.snapshots()[0].tree
+    assert counts[root] == 2
+    # One reference per child entry: the empty folder object stands for
+    # q1, q2, old, app and lib; 2024, docs and src have one parent each
+    assert sorted(counts.values()) == [1, 1, 1, 2, 5]
+
+
+def test_diff_matches_diff_trees(store):
+    left = LINES
+    right = ["docs", "  old", "  archive", "    2024", "      q1", "      q2",
+             "src", "  app", "  lib", "    new"]
+    old = store.add_tree("root", tree(left))
+    new = store.add_tree("root", tree(right))
+    stored = store.diff(old.id, new.id)
+    expected = diff_trees(tree(left), tree(right))
+    assert stored.removed == expected.removed
+    assert stored.added == expected.added
+    assert stored.moved == expected.moved
+    assert stored.moved == [(("docs", "2024"), ("docs", "archive", "2024"), 3)]
+    assert store.diff(old.id, old.id).identical
+
+
+@pytest.mark.parametrize("left, right", [
+    # The second "a" loses its child, the first keeps it
+    (["a", "  x", "a", "  y", "b"], ["a", "  x", "a", "b"]),
+    # A third "a" appears, and a copy of the first moves under b
+    (["a", "  x", "a", "b"], ["a", "  x", "a", "a", "  z", "b", "  a", "    x"]),
+    # One of two identical siblings is moved away
+    (["p", "  a", "    x", "  a", "    x", "q"], ["p", "  a", "    x", "q", "  a", "    x"]),
+])
+def test_diff_with_repeated_names_matches_diff_trees(store, left, right):
+    old = store.add_tree("root", tree(left))
+    new = store.add_tree("root", tree(right))
+    stored = store.diff(old.id, new.id)
+    expected = diff_trees(tree(left), tree(right))
+    assert (stored.removed, stored.added, stored.moved) == (
+        expected.removed, expected.added, expected.moved)
+    assert not stored.identical
+
+
+def test_remove_frees_unshared_objects(store):
+    first = store.add_tree("root", tree(LINES))
+    second = store.add_tree("root", tree(LINES + ["other"]))
+    before = object_count(store)
+    store.remove(second.id)
+    # Only the second root object was not shared
+    assert object_count(store) == before - 1
+    assert list(store.to_tree(first.id).iter_lines()) == LINES
+    store.remove(first.id)
+    assert object_count(store) == 0
+    assert store.snapshots() == []
+
+
+def test_prune(store):
+    now = time.time()
+    ids = [store.add_tree("root", tree(LINES + [f"day{i}"]), created=now - i * DAY).id
+           for i in range(5)]
+    other = store.add_tree("elsewhere", tree(LINES), created=now - 10 * DAY)
+    result = store.prune(keep_last=2, dry_run=True)
+    assert sorted(s.id for s in result.removed) == sorted(ids[2:])
+    assert result.freed_objects == 0
+    assert len(store.snapshots()) == 6
+
+    result = store.prune(keep_last=2)
+    assert sorted(s.id for s in result.kept) == sorted(ids[:2] + [other.id])
+    # Only the three pruned root objects go; the day folders are empty
+    # and share the empty folder object with the kept snapshots
+    assert result.freed_objects == 3
+    assert [s.id for s in store.snapshots("root")] == sorted(ids[:2], reverse=True)
+    for snapshot_id in ids[:2] + [other.id]:
+        assert len(store.to_tree(snapshot_id)) in (8, 9)
+    # No rule, nothing removed
+    assert store.prune().removed == []
+
+
+def test_retained_keeps_one_per_period():
+    class Stub:
+        def __init__(self, id, created):
+            self.id = id
+            self.created = created
+
+    now = time.mktime((2024, 6, 15, 12, 0, 0, 0, 0, -1))
+    snapshots = [Stub(1, now), Stub(2, now - 3600), Stub(3, now - DAY), Stub(4, now - 40 * DAY)]
+    assert retained(snapshots, keep_daily=2) == {1, 3}
+    assert retained(snapshots, keep_monthly=2) == {1, 4}
+    assert retained(snapshots, keep_last=1, keep_monthly=2) == {1, 4}
+    assert retained(snapshots) == set()
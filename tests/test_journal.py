@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+from conftest import folders
+from structify.journal import COMPLETE, ReplicationJournal, read_journal, rollback
+from structify.replicate import CREATED, replicate_tree
+from structify.tree import StructureTree
+
+LINES = ["a", "  x", "  y", "    deep", "b", "c", "  z"]
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "replication.journal")
+
+
+def replicate(dest, journal_path):
+    with ReplicationJournal(journal_path, dest) as journal:
+        return journal.resumed, replicate_tree(StructureTree.from_lines(LINES), dest, workers=2,
+                                               journal=journal)
+
+
+def test_finished_replication_is_marked_complete(dest, journal_path):
+    resumed, result = replicate(dest, journal_path)
+    assert not resumed
+    assert result.created == 7
+    destination, finished, completed, created = read_journal(journal_path)
+    assert destination == os.path.abspath(dest)
+    assert finished
+    assert created == completed == {os.path.join(*path.split("/")) for path in folders(dest)}
+    # A finished journal is started over, not resumed
+    resumed, result = replicate(dest, journal_path)
+    assert not resumed
+    assert (result.created, result.existing, result.resumed) == (0, 7, 0)
+
+
+def test_interrupted_replication_resumes(dest, journal_path):
+    # An earlier run made a and a/x, then stopped without finishing
+    with ReplicationJournal(journal_path, dest) as journal:
+        for rel in ("a", os.path.join("a", "x")):
+            path = os.path.join(dest, rel)
+            os.mkdir(path)
+            journal.record(path, CREATED)
+    resumed, result = replicate(dest, journal_path)
+    assert resumed
+    assert result.resumed == 2
+    assert (result.created, result.existing) == (5, 0)
+    assert len(folders(dest)) == 7
+    # The rollback undoes both runs
+    assert rollback(journal_path).removed == 7
+    assert folders(dest) == set()
+
+
+def test_rollback_keeps_existing_folders(dest, journal_path):
+    os.makedirs(os.path.join(dest, "a", "x"))
+    replicate(dest, journal_path)
+    result = rollback(journal_path, workers=2)
+    assert result.removed == 5
+    assert not result.failed
+    assert folders(dest) == {"a", "a/x"}
+    assert not os.path.exists(journal_path)
+
+
+def test_rollback_leaves_folders_with_new_contents(dest, journal_path):
+    replicate(dest, journal_path)
+    with open(os.path.join(dest, "a", "y", "deep", "notes.txt"), "w") as f:
+        f.write("keep me")
+    result = rollback(journal_path)
+    # The folder with the file and its parents stay
+    assert sorted(path for path, _ in result.failed) == [
+        os.path.join(dest, "a"), os.path.join(dest, "a", "y"),
+        os.path.join(dest, "a", "y", "deep")]
+    assert result.removed == 4
+    assert folders(dest) == {"a", "a/y", "a/y/deep"}
+    # The journal stays for another try; removed folders are not retried
+    assert os.path.exists(journal_path)
+    os.remove(os.path.join(dest, "a", "y", "deep", "notes.txt"))
+    result = rollback(journal_path)
+    assert (result.removed, result.missing) == (3, 0)
+    assert not result.failed
+    assert folders(dest) == set()
+    assert not os.path.exists(journal_path)
+
+
+def test_torn_last_record(dest, journal_path):
+    with ReplicationJournal(journal_path, dest) as journal:
+        path = os.path.join(dest, "a")
+        os.mkdir(path)
+        journal.record(path, CREATED)
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write('C "b')
+    resumed, result = replicate(dest, journal_path)
+    assert resumed
+    assert result.resumed == 1
+    _, finished, completed, _ = read_journal(journal_path)
+    assert finished
+    assert len(completed) == 7
+    with open(journal_path, encoding="utf-8") as f:
+        assert f.read().endswith(COMPLETE + "\n")
+
+
+def test_journal_of_another_destination(dest, journal_path, tmp_path):
+    replicate(dest, journal_path)
+    with pytest.raises(ValueError, match="journal of a replication into"):
+        ReplicationJournal(journal_path, str(tmp_path))
+
+
+def test_dry_run_cannot_be_journaled(dest, journal_path):
+    with ReplicationJournal(journal_path, dest) as journal:
+        with pytest.raises(ValueError):
+            replicate_tree(StructureTree.from_lines(LINES), dest, dry_run=True, journal=journal)
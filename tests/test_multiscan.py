@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+from structify.filters import ScanFilter
+from structify.multiscan import MultiRootScan, scan_roots
+from structify.scanner import get_folder_structure
+
+
+def lines(tree):
+    return list(tree.iter_lines())
+
+
+@pytest.fixture
+def roots(tmp_path):
+    roots = []
+    for index, paths in enumerate([("a/x/deep", "a/y", "b"), ("only",), (), ("p/q/r/s", "p/t")]):
+        root = str(tmp_path / f"root{index}")
+        os.mkdir(root)
+        for path in paths:
+            os.makedirs(os.path.join(root, *path.split("/")))
+        roots.append(root)
+    return roots
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_every_root_matches_its_own_scan(roots, tmp_path, workers):
+    # A missing root and a file in place of a root cannot be listed
+    missing = str(tmp_path / "missing")
+    not_a_folder = str(tmp_path / "file")
+    with open(not_a_folder, "w") as f:
+        f.write("not a folder")
+    all_roots = roots + [missing, not_a_folder]
+    scan = MultiRootScan(all_roots, workers=workers, per_root=1)
+    results = {result.root: result for result in scan}
+    assert sorted(results) == sorted(all_roots)
+    for root in all_roots:
+        assert lines(results[root].tree) == get_folder_structure(root, workers=1)
+    for root in roots:
+        assert results[root].error is None
+    assert results[missing].error and results[not_a_folder].error
+    assert results[missing].folders == 0
+    assert missing in results[missing].summary()
+    # Every listable folder was listed once, roots included
+    assert scan.listed == sum(results[root].folders + 1 for root in roots) + 2
+    assert all(done for _, _, _, done in scan.progress())
+
+
+def test_filter_applies_to_every_root(roots):
+    scan_filter = ScanFilter(exclude=["x", "q"], max_depth=2)
+    for result in scan_roots(roots, workers=2, per_root=1, scan_filter=scan_filter):
+        assert lines(result.tree) == get_folder_structure(result.root, workers=1,
+                                                          scan_filter=scan_filter)
+
+
+@pytest.mark.skipif(sys.platform == "win32" or os.geteuid() == 0,
+                    reason="needs a folder the current user cannot list")
+def test_unreadable_folders_are_left_out(roots):
+    locked = os.path.join(roots[0], "a", "x")
+    os.chmod(locked, 0)
+    try:
+        result = next(iter(MultiRootScan([roots[0]], workers=2, per_root=1)))
+        assert lines(result.tree) == get_folder_structure(roots[0], workers=1)
+        assert result.unreadable == 1
+        assert result.error is None
+    finally:
+        os.chmod(locked, 0o755)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from structify import profiling
+from structify.profiling import BUILD, DIFF, WALK, Timings, dump_timings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A clock that only moves when the test says so
+    now = [0.0]
+    monkeypatch.setattr(profiling.time, "perf_counter", lambda: now[0])
+    return now
+
+
+def test_nested_phases_are_exclusive(clock):
+    timings = Timings("op")
+    with timings.phase(WALK):
+        clock[0] += 1.0
+        with timings.phase(DIFF):
+            clock[0] += 2.0
+            with timings.phase(BUILD):
+                clock[0] += 4.0
+        clock[0] += 0.5
+    assert timings.phases == {BUILD: 4.0, DIFF: 2.0, WALK: 1.5}
+
+
+def test_iterate_time_is_not_charged_to_the_outer_phase(clock):
+    def produce():
+        for item in range(3):
+            clock[0] += 1.0
+            yield item
+
+    timings = Timings("op")
+    with timings.phase(WALK):
+        for _ in timings.iterate(produce(), BUILD, "items"):
+            # Time spent by the consumer stays with the enclosing phase
+            clock[0] += 0.25
+    assert timings.phases == {BUILD: 3.0, WALK: 0.75}
+    assert timings.counters == {"items": 3}
+
+
+def test_an_abandoned_iterator_still_counts(clock):
+    def produce():
+        while True:
+            clock[0] += 1.0
+            yield None
+
+    timings = Timings("op")
+    items = timings.iterate(produce(), BUILD, "items")
+    next(items)
+    next(items)
+    items.close()
+    assert timings.phases == {BUILD: 2.0}
+    assert timings.counters == {"items": 2}
+
+
+def test_disabled_timings_do_nothing():
+    timings = Timings("op", enabled=False)
+    data = [1, 2]
+    assert timings.iterate(data, BUILD) is data
+    with timings.phase(WALK):
+        timings.count("items")
+    assert timings.phases == {} and timings.counters == {}
+
+
+def test_dump(tmp_path, clock):
+    timings = Timings("scan", root="/data")
+    with timings.phase(WALK):
+        clock[0] += 1.0
+    timings.count("folders", 10)
+    clock[0] += 1.0
+    timings.finish()
+    assert timings.summary() == "scan in 2.000 s: walk 1.000 s, folders 10"
+    path = str(tmp_path / "timings.json")
+    dump_timings([timings], path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data[0]["phases"] == {WALK: 1.0}
+    assert data[0]["info"] == {"root": "/data"}
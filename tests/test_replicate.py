@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from conftest import folders
+from structify.replicate import replicate_entries, replicate_tree
+from structify.tree import StructureTree
+
+LINES = ["a", "  x", "  y", "    deep", "b", "c", "  z"]
+ALL = {"a", "a/x", "a/y", "a/y/deep", "b", "c", "c/z"}
+
+
+def tree_entries(lines):
+    return StructureTree.from_lines(lines).iter_entries()
+
+
+def replicate(kind, dest, **kwargs):
+    if kind == "tree":
+        return replicate_tree(StructureTree.from_lines(LINES), dest, workers=2, **kwargs)
+    return replicate_entries(tree_entries(LINES), dest, workers=2, **kwargs)
+
+
+@pytest.fixture(params=["tree", "entries"])
+def kind(request):
+    return request.param
+
+
+def test_creates_every_folder(kind, dest):
+    result = replicate(kind, dest)
+    assert (result.created, result.existing, result.failed, result.skipped) == (7, 0, [], 0)
+    assert folders(dest) == ALL
+    # A second run finds everything in place
+    result = replicate(kind, dest)
+    assert (result.created, result.existing) == (0, 7)
+
+
+def test_dry_run_creates_nothing(kind, dest):
+    os.makedirs(os.path.join(dest, "a", "y"))
+    result = replicate(kind, dest, dry_run=True)
+    assert result.dry_run
+    assert (result.created, result.existing) == (5, 2)
+    assert sorted(os.path.relpath(path, dest).replace(os.sep, "/")
+                  for path in result.planned) == ["a/x", "a/y/deep", "b", "c", "c/z"]
+    assert folders(dest) == {"a", "a/y"}
+    assert "Would create: 5" in result.summary()
+
+
+def test_existing_folders_are_kept(kind, dest):
+    os.makedirs(os.path.join(dest, "a", "x"))
+    with open(os.path.join(dest, "a", "x", "notes.txt"), "w") as f:
+        f.write("keep me")
+    result = replicate(kind, dest)
+    assert (result.created, result.existing) == (5, 2)
+    assert folders(dest) == ALL
+    assert os.path.exists(os.path.join(dest, "a", "x", "notes.txt"))
+
+
+@pytest.mark.parametrize("dry_run", [False, True])
+def test_failures_are_reported(kind, dest, dry_run):
+    # A file where a folder should go fails that folder and skips its children
+    with open(os.path.join(dest, "a"), "w") as f:
+        f.write("not a folder")
+    result = replicate(kind, dest, dry_run=dry_run)
+    assert result.failed == [(os.path.join(dest, "a"), "Exists and is not a folder")]
+    assert result.skipped == 3
+    assert result.created == 3
+    assert result.total == 7
+    expected = {"b", "c", "c/z"} if not dry_run else set()
+    assert folders(dest) == expected
+
+
+def test_dry_run_cannot_be_journaled(kind, dest):
+    with pytest.raises(ValueError):
+        replicate(kind, dest, dry_run=True, journal=object())
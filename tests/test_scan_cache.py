@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from structify.scan_cache import INDEX_FILE, ScanCache, ScanStats
+from structify.scanner import get_folder_structure
+
+# Well before any scan, so the cache trusts these mtimes
+OLD = 1_600_000_000
+
+
+def make_tree(root):
+    for path in ("a/x/deep", "a/y", "b/z", "c"):
+        os.makedirs(os.path.join(root, *path.split("/")))
+    age(root)
+
+
+def age(root):
+    for path, _, _ in os.walk(root):
+        os.utime(path, (OLD, OLD))
+
+
+def scan(cache, root, workers=1):
+    stats = ScanStats()
+    lines = [f"{'  ' * depth}{name}"
+             for depth, name in cache.walk(root, workers=workers, stats=stats)]
+    return lines, stats
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ScanCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = str(tmp_path / "root")
+    os.mkdir(root)
+    make_tree(root)
+    return root
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_rescan_lists_only_changed_folders(cache, root, workers):
+    lines, stats = scan(cache, root, workers)
+    assert not stats.cached
+    assert stats.listed == 8
+    assert lines == get_folder_structure(root, workers=1)
+
+    lines, stats = scan(cache, root, workers)
+    assert stats.cached
+    assert (stats.listed, stats.reused) == (0, 8)
+    assert lines == get_folder_structure(root, workers=1)
+
+    # A folder added under a/x changes only a/x's mtime
+    os.mkdir(os.path.join(root, "a", "x", "new"))
+    os.utime(os.path.join(root, "a", "x", "new"), (OLD, OLD))
+    lines, stats = scan(cache, root, workers)
+    # a/x and the new folder are listed, everything else comes from the cache
+    assert (stats.listed, stats.reused) == (2, 7)
+    assert lines == get_folder_structure(root, workers=1)
+    assert "    new" in lines
+
+
+def test_removed_and_renamed_folders_are_spliced(cache, root):
+    scan(cache, root)
+    os.rename(os.path.join(root, "b", "z"), os.path.join(root, "b", "renamed"))
+    os.rmdir(os.path.join(root, "a", "y"))
+    age(root)
+    # age() put every mtime back; give the two changed folders another
+    # old mtime so the cache sees them change
+    for path in (os.path.join(root, "b"), os.path.join(root, "a")):
+        os.utime(path, (OLD + 60, OLD + 60))
+    lines, stats = scan(cache, root)
+    assert lines == get_folder_structure(root, workers=1)
+    assert "  renamed" in lines and "  y" not in lines
+    # a and b are listed again, and b/renamed is new
+    assert stats.listed == 3
+
+
+def test_recent_changes_are_not_trusted(cache, root):
+    # A folder modified right before the scan may change again in the same
+    # mtime tick, so it is listed again next time
+    os.utime(os.path.join(root, "c"), None)
+    scan(cache, root)
+    _, stats = scan(cache, root)
+    assert stats.listed == 1
+
+
+def test_cache_files_hold_no_code(cache, root):
+    scan(cache, root)
+    files = [name for name in os.listdir(cache.cache_dir) if name.endswith(".scan")]
+    assert len(files) == 1
+    with open(os.path.join(cache.cache_dir, files[0]), "rb") as f:
+        assert f.read(8) == b"STRSCAN\0"
+
+
+def test_corrupt_cache_file_is_ignored(cache, root):
+    scan(cache, root)
+    name = next(name for name in os.listdir(cache.cache_dir) if name.endswith(".scan"))
+    path = os.path.join(cache.cache_dir, name)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-3])
+    lines, stats = scan(cache, root)
+    assert not stats.cached
+    assert lines == get_folder_structure(root, workers=1)
+
+
+def test_lru_evicts_the_oldest_root(tmp_path):
+    cache = ScanCache(str(tmp_path / "cache"), max_roots=2)
+    roots = []
+    for name in ("one", "two", "three"):
+        root = str(tmp_path / name)
+        os.mkdir(root)
+        make_tree(root)
+        roots.append(root)
+    scan(cache, roots[0])
+    scan(cache, roots[1])
+    # Using the first root again makes the second the least recently used
+    assert cache.load(roots[0]) is not None
+    scan(cache, roots[2])
+    assert cache.load(roots[1]) is None
+    assert cache.load(roots[0]) is not None
+    assert cache.load(roots[2]) is not None
+    scan_files = [name for name in os.listdir(cache.cache_dir) if name.endswith(".scan")]
+    assert len(scan_files) == 2
+    assert INDEX_FILE in os.listdir(cache.cache_dir)
+
+
+def test_size_limit_evicts_older_roots(tmp_path):
+    roots = []
+    for name in ("one", "two"):
+        root = str(tmp_path / name)
+        os.mkdir(root)
+        make_tree(root)
+        roots.append(root)
+    probe = ScanCache(str(tmp_path / "probe"))
+    scan(probe, roots[0])
+    size = sum(os.path.getsize(os.path.join(probe.cache_dir, name))
+               for name in os.listdir(probe.cache_dir) if name.endswith(".scan"))
+    # Room for one root's file but not two
+    cache = ScanCache(str(tmp_path / "cache"), max_bytes=size + size // 2)
+    scan(cache, roots[0])
+    scan(cache, roots[1])
+    assert cache.load(roots[0]) is None
+    assert cache.load(roots[1]) is not None
@@ -0,0 +1,64 @@
+import os
+import threading
+
+import pytest
+
+from structify.scanner import get_folder_structure, walk_structure
+
+
+def make_tree(root):
+    for path in ("b/y/deep/deeper", "b/x", "a", "c/z", "Upper/q", "with space/ünï"):
+        os.makedirs(os.path.join(root, *path.split("/")))
+    for path in ("file.txt", "b/file.txt", "c/z/file.txt"):
+        with open(os.path.join(root, *path.split("/")), "w") as f:
+            f.write("x")
+
+
+def os_walk_entries(root):
+    # What the os.walk scan this walker replaced reported: every folder
+    # os.walk enters (so no symlinked ones), as (depth, name) in sorted
+    # pre-order
+    paths = []
+    for path, dirs, _ in os.walk(root):
+        dirs.sort()
+        rel = os.path.relpath(path, root)
+        if rel != os.curdir:
+            paths.append(rel.split(os.sep))
+    paths.sort()
+    return [(len(parts) - 1, parts[-1]) for parts in paths]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_walk_structure_matches_os_walk(tmp_path, workers):
+    make_tree(str(tmp_path))
+    assert list(walk_structure(str(tmp_path), workers=workers)) == os_walk_entries(str(tmp_path))
+
+
+def test_get_folder_structure_lines(tmp_path):
+    make_tree(str(tmp_path))
+    lines = get_folder_structure(str(tmp_path), workers=2)
+    assert lines[:6] == ["Upper", "  q", "a", "b", "  x", "  y"]
+    assert "      deeper" in lines
+    assert get_folder_structure(str(tmp_path), recursive=False) == [
+        "Upper", "a", "b", "c", "with space"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="needs symlinks")
+def test_symlinked_folders_are_not_entered(tmp_path):
+    make_tree(str(tmp_path))
+    try:
+        os.symlink(os.path.join(str(tmp_path), "b"), os.path.join(str(tmp_path), "link"),
+                   target_is_directory=True)
+    except OSError:
+        pytest.skip("cannot create symlinks here")
+    entries = list(walk_structure(str(tmp_path), workers=2))
+    assert entries == os_walk_entries(str(tmp_path))
+    assert (0, "link") not in entries
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_cancel_stops_the_walk(tmp_path, workers):
+    make_tree(str(tmp_path))
+    cancel = threading.Event()
+    cancel.set()
+    assert list(walk_structure(str(tmp_path), workers=workers, cancel=cancel)) == []
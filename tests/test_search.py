@@ -0,0 +1,82 @@
+from structify.search import EXACT, FUZZY, NameIndex
+from structify.tree import StructureTree
+
+LINES = [
+    "Projects",
+    "  invoices",
+    "    2024",
+    "  Invoices-old",
+    "Photos",
+    "  2024",
+    "  holiday",
+]
+
+
+def paths(tree, nodes):
+    return sorted("/".join(tree.path(node)) for node in nodes)
+
+
+def node_at(tree, path):
+    for node in tree.iter_nodes():
+        if tree.path(node) == path:
+            return node
+    raise KeyError(path)
+
+
+def test_search_modes():
+    tree = StructureTree.from_lines(LINES)
+    index = NameIndex(tree)
+    assert paths(tree, index.search("invoice")) == ["Projects/Invoices-old", "Projects/invoices"]
+    assert paths(tree, index.search("INVOICES", EXACT)) == ["Projects/invoices"]
+    assert paths(tree, index.search("20")) == ["Photos/2024", "Projects/invoices/2024"]
+    assert paths(tree, index.search("holidya", FUZZY)) == ["Photos/holiday"]
+    assert index.search("   ") == []
+    assert index.search("missing") == []
+    assert len(index.search("2024", limit=1)) == 1
+
+
+def test_appended_folders():
+    tree = StructureTree.from_lines(LINES)
+    index = NameIndex(tree)
+    first = len(tree.parent)
+    tree.extend([(0, "Archive"), (1, "invoices-2019"), (1, "2024")])
+    index.extend(first)
+    assert paths(tree, index.search("invoices")) == [
+        "Archive/invoices-2019", "Projects/Invoices-old", "Projects/invoices"]
+    assert len(index.search("2024", EXACT)) == 3
+
+
+def test_inserted_folder():
+    tree = StructureTree.from_lines(LINES)
+    index = NameIndex(tree)
+    node = tree.insert(node_at(tree, ["Photos"]), "receipts")
+    index.insert(node)
+    assert paths(tree, index.search("receipt")) == ["Photos/receipts"]
+
+
+def test_renamed_folder():
+    tree = StructureTree.from_lines(LINES)
+    index = NameIndex(tree)
+    node = node_at(tree, ["Photos", "holiday"])
+    old = tree.name_id[node]
+    tree.rename(node, "vacation")
+    index.rename(node, old)
+    assert index.search("holiday") == []
+    assert paths(tree, index.search("vacation")) == ["Photos/vacation"]
+    # Renaming to a name other folders share keeps both findable
+    node = node_at(tree, ["Photos", "2024"])
+    old = tree.name_id[node]
+    tree.rename(node, "invoices")
+    index.rename(node, old)
+    assert paths(tree, index.search("invoices", EXACT)) == ["Photos/invoices", "Projects/invoices"]
+    assert paths(tree, index.search("2024", EXACT)) == ["Projects/invoices/2024"]
+
+
+def test_removed_subtree():
+    tree = StructureTree.from_lines(LINES)
+    index = NameIndex(tree)
+    node = node_at(tree, ["Projects", "invoices"])
+    index.remove(node)
+    tree.remove(node)
+    assert paths(tree, index.search("invoices")) == ["Projects/Invoices-old"]
+    assert paths(tree, index.search("2024")) == ["Photos/2024"]
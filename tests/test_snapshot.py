@@ -0,0 +1,102 @@
+import pytest
+
+from structify.snapshot import Snapshot, is_snapshot, read_snapshot, write_snapshot
+from structify.tree import NO_NODE, StructureTree
+
+LINES = [
+    "docs",
+    "  2024",
+    "    q1",
+    "    q2",
+    "  ünïcode",
+    "src",
+    "  app",
+    "  lib",
+    "empty",
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "structure.snap")
+    assert write_snapshot(StructureTree.from_lines(LINES), path) == len(LINES)
+    return path
+
+
+def test_round_trip(snapshot_path):
+    assert is_snapshot(snapshot_path)
+    tree = read_snapshot(snapshot_path)
+    assert list(tree.iter_lines()) == LINES
+    assert len(tree) == len(LINES)
+    # The tree is fully usable after the mapping is gone
+    tree.insert(tree.children()[0], "new")
+    assert "  new" in list(tree.iter_lines())
+
+
+def test_empty_tree_round_trip(tmp_path):
+    path = str(tmp_path / "empty.snap")
+    assert write_snapshot(StructureTree(), path) == 0
+    assert len(read_snapshot(path)) == 0
+
+
+def test_lazy_access(snapshot_path):
+    with Snapshot(snapshot_path) as snapshot:
+        assert len(snapshot) == len(LINES)
+        assert [snapshot.name(node) for node in snapshot.children()] == ["docs", "src", "empty"]
+        node = snapshot.find(["docs", "2024"])
+        assert snapshot.path(node) == ["docs", "2024"]
+        assert snapshot.subtree_size(node) == 3
+        assert list(snapshot.iter_lines(node)) == ["q1", "q2"]
+        assert list(snapshot.to_tree(node).iter_lines()) == ["q1", "q2"]
+        assert snapshot.find(["docs", "missing"]) == NO_NODE
+
+
+def test_subtree_iteration_decodes_only_its_names(snapshot_path):
+    with Snapshot(snapshot_path) as snapshot:
+        node = snapshot.find(["docs"])
+        assert list(snapshot.iter_lines(node)) == ["2024", "  q1", "  q2", "ünïcode"]
+        assert list(snapshot.to_tree(node).iter_lines()) == ["2024", "  q1", "  q2", "ünïcode"]
+        assert snapshot._names is None
+        # Full iteration decodes the table once and subtrees then reuse it
+        assert list(snapshot.iter_lines()) == LINES
+        assert snapshot._names is not None
+        assert list(snapshot.iter_lines(node)) == ["2024", "  q1", "  q2", "ünïcode"]
+
+
+def test_close_with_an_unfinished_subtree_iterator(snapshot_path):
+    snapshot = Snapshot(snapshot_path)
+    entries = snapshot.iter_entries(snapshot.find(["src"]))
+    assert next(entries) == (0, "app")
+    snapshot.close()
+    assert next(entries) == (0, "lib")
+    del entries
+
+
+def test_close_with_an_unfinished_iterator(snapshot_path):
+    snapshot = Snapshot(snapshot_path)
+    entries = snapshot.iter_entries()
+    assert next(entries) == (0, "docs")
+    snapshot.close()
+    snapshot.close()
+    del entries
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "structure.txt"
+    path.write_text("docs\n  2024\n", encoding="utf-8")
+    assert not is_snapshot(str(path))
+    with pytest.raises(OSError):
+        Snapshot(str(path))
+    empty = tmp_path / "empty.snap"
+    empty.write_bytes(b"")
+    with pytest.raises(OSError):
+        Snapshot(str(empty))
+
+
+def test_truncated_snapshot(snapshot_path):
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(data[:-4])
+    with pytest.raises(OSError, match="Truncated"):
+        Snapshot(snapshot_path)
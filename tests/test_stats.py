@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from structify.core import scan_tree_stats
+from structify.stats import COUNTS_HEADER, STATS_HEADER
+
+
+@pytest.fixture
+def root(tmp_path):
+    # a: 2 files (3 + 5 bytes), a/b: 1 file (7 bytes), c: none
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "a", "b"))
+    os.mkdir(os.path.join(root, "c"))
+    for path, size in (("top.txt", 1), ("a/x", 3), ("a/y", 5), ("a/b/z", 7)):
+        with open(os.path.join(root, *path.split("/")), "wb") as f:
+            f.write(b"x" * size)
+    return root
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_sizes(root, workers):
+    tree, stats = scan_tree_stats(root, workers=workers)
+    assert list(tree.iter_lines()) == ["a", "  b", "c"]
+    assert stats.header == STATS_HEADER
+    a, b, c = tree.iter_nodes()
+    assert stats.totals(a)[:2] == (3, 15)
+    assert stats.totals(b)[:2] == (1, 7)
+    assert stats.totals(c) == (0, 0, 0)
+    assert stats.totals(0)[:2] == (4, 16)
+    assert stats.totals(a)[2] == os.stat(os.path.join(root, "a", "b", "z")).st_mtime_ns
+    name, files, size, _ = next(stats.annotated_entries(tree))[1].split("\t")
+    assert (name, files, size) == ("a", "3", "15")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_counts_only(root, workers):
+    tree, stats = scan_tree_stats(root, workers=workers, sizes=False)
+    assert stats.header == COUNTS_HEADER
+    a, b, c = tree.iter_nodes()
+    assert [stats.totals(node)[0] for node in (0, a, b, c)] == [4, 3, 1, 0]
+    # No stat() per file, so no sizes or times
+    assert stats.totals(0)[1:] == (0, 0)
+    assert list(stats.annotated_entries(tree)) == [(0, "a\t3"), (1, "b\t1"), (0, "c\t0")]
+
+
+def test_edits_keep_totals(root):
+    tree, stats = scan_tree_stats(root, workers=1)
+    a, b, c = tree.iter_nodes()
+    stats.detach(tree, b)
+    tree.move(b, c)
+    stats.attach(tree, b)
+    assert stats.totals(a)[:2] == (2, 8)
+    assert stats.totals(c)[:2] == (1, 7)
+    assert stats.totals(0)[:2] == (4, 16)
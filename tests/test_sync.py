@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from conftest import folders
+from structify.sync import KEEP, QUARANTINE, QUARANTINE_DIR, REMOVE, apply_sync, plan_sync
+from structify.tree import StructureTree
+
+PREVIEW = ["docs", "  2024", "  2025", "src", "  app"]
+
+
+@pytest.fixture
+def dest(dest):
+    # docs/2024 and src are in place; docs/2025 and src/app are missing;
+    # old/ and src/tmp are extra, and old/notes holds a file
+    for path in ("docs/2024", "src/tmp/cache", "old/notes", "old/empty/inner"):
+        os.makedirs(os.path.join(dest, *path.split("/")))
+    with open(os.path.join(dest, "old", "notes", "todo.txt"), "w") as f:
+        f.write("keep me")
+    return dest
+
+
+def plan(dest, mode, tmp_path=None):
+    quarantine = str(tmp_path / "quarantine") if tmp_path is not None else None
+    return plan_sync(StructureTree.from_lines(PREVIEW), dest, mode, workers=2,
+                     quarantine=quarantine)
+
+
+def test_plan_keep(dest):
+    sync = plan(dest, KEEP)
+    assert sync.matched == 3
+    assert sync.create == [(("docs", "2025"), 1), (("src", "app"), 1)]
+    assert sync.extra == [(("old",), 4), (("src", "tmp"), 2)]
+    assert sync.clear == [] and sync.kept == []
+    assert list(sync.operations()) == [
+        "+ docs/2025", "+ src/app", "? old  (4 folders)", "? src/tmp  (2 folders)"]
+    assert not sync.empty
+
+
+def test_plan_splits_extras_holding_files(dest):
+    sync = plan(dest, REMOVE)
+    # old itself holds a folder with a file, so only its empty branch goes
+    assert sync.clear == [(("old", "empty"), 2), (("src", "tmp"), 2)]
+    assert sync.kept == [("old",), ("old", "notes")]
+    assert list(sync.operations()) == [
+        "+ docs/2025",
+        "+ src/app",
+        "! old  (holds files, kept)",
+        "- old/empty  (2 folders)",
+        "! old/notes  (holds files, kept)",
+        "- src/tmp  (2 folders)",
+    ]
+    assert sync.clear_folders() == 4
+
+
+def test_apply_remove(dest):
+    result = apply_sync(plan(dest, REMOVE), workers=2)
+    assert result.created == 2
+    assert result.removed == 4
+    assert result.not_empty == 2
+    assert not result.failed
+    assert folders(dest) == {"docs", "docs/2024", "docs/2025", "src", "src/app",
+                             "old", "old/notes"}
+    assert os.path.exists(os.path.join(dest, "old", "notes", "todo.txt"))
+
+
+def test_apply_quarantine_moves_only_file_free_folders(dest, tmp_path):
+    sync = plan(dest, QUARANTINE, tmp_path)
+    result = apply_sync(sync, workers=2)
+    assert result.quarantined == 4
+    assert result.not_empty == 2
+    assert not result.failed
+    assert folders(dest) == {"docs", "docs/2024", "docs/2025", "src", "src/app",
+                             "old", "old/notes"}
+    assert os.path.exists(os.path.join(dest, "old", "notes", "todo.txt"))
+    assert folders(sync.quarantine) == {"old", "old/empty", "old/empty/inner",
+                                        "src", "src/tmp", "src/tmp/cache"}
+
+
+def test_default_quarantine_is_never_extra(dest):
+    sync = plan(dest, QUARANTINE)
+    assert os.path.dirname(sync.quarantine) == os.path.join(dest, QUARANTINE_DIR)
+    apply_sync(sync, workers=2)
+    again = plan(dest, QUARANTINE)
+    assert again.extra == [(("old",), 2)]
+    assert again.clear == []
+    assert again.empty
+
+
+def test_matching_destination_is_empty(tmp_path):
+    root = str(tmp_path / "dest")
+    for path in ("docs/2024", "docs/2025", "src/app"):
+        os.makedirs(os.path.join(root, *path.split("/")))
+    sync = plan(root, REMOVE)
+    assert sync.empty
+    assert list(sync.operations()) == []
+
+
+def test_unknown_mode(dest):
+    with pytest.raises(ValueError):
+        plan(dest, "delete")
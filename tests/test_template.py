@@ -0,0 +1,95 @@
+from datetime import date
+
+import pytest
+
+from structify.template import Template, parse_range, parse_variables
+
+TEMPLATE = """\
+# Client project
+{client}
+  {year=2023..2024}
+    Q{q=1..4}
+  @for kind in raw|final
+    {kind}
+      v{n=1..3:02}
+"""
+
+
+def expand(text, **variables):
+    return list(Template.from_text(text).expand(variables))
+
+
+def test_expansion():
+    template = Template.from_text(TEMPLATE)
+    assert template.variables() == {"client"}
+    entries = list(template.expand({"client": "ACME"}))
+    assert entries[:7] == [
+        (0, "ACME"),
+        (1, "2023"), (2, "Q1"), (2, "Q2"), (2, "Q3"), (2, "Q4"),
+        (1, "2024"),
+    ]
+    assert entries[11:] == [
+        (1, "raw"), (2, "v01"), (2, "v02"), (2, "v03"),
+        (1, "final"), (2, "v01"), (2, "v02"), (2, "v03"),
+    ]
+
+
+@pytest.mark.parametrize("text", [
+    TEMPLATE,
+    "a{x=1..3}\n  b{y=1..2}{z=a|b}\n",
+    "@for i in 1..3\n  @for j in 1..2\n    d{i}{j}\n      inner\n",
+    "d{day=2024-02-27..2024-03-02:%m%d}\n",
+    "{n=10..1..-3}\n",
+])
+def test_count_matches_expansion(text):
+    template = Template.from_text(text)
+    assert template.count() == len(list(template.expand({"client": "c"})))
+
+
+def test_multiple_ranges_repeat_over_every_combination():
+    assert expand("{a=1..2}-{b=x|y}\n") == [(0, "1-x"), (0, "1-y"), (0, "2-x"), (0, "2-y")]
+
+
+def test_dates_and_specs():
+    assert expand("{d=2024-02-28..2024-03-01:%Y%m%d}\n") == [
+        (0, "20240228"), (0, "20240229"), (0, "20240301")]
+    assert expand("{when:%Y}\n", when=date(2020, 5, 1)) == [(0, "2020")]
+    assert expand("{{literal}} {n:03}\n", n=7) == [(0, "{literal} 007")]
+
+
+def test_today_is_always_defined():
+    assert expand("{today:%Y}\n") == [(0, str(date.today().year))]
+
+
+def test_parse_range():
+    assert list(parse_range("1..5..2")) == [1, 3, 5]
+    assert list(parse_range("3..1")) == [3, 2, 1]
+    assert parse_range("a|2|b") == ["a", 2, "b"]
+    for text in ("1..", "1..5..0", "1..5..-1", "1..2024-01-01", "x..y"):
+        with pytest.raises(ValueError):
+            parse_range(text)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("a\n    b\n", "line 2: indented deeper"),
+    ("a/b\n", "line 1: use indentation"),
+    ("{x=1..3}{x=1..2}\n", "line 1: x is repeated twice"),
+    ("@repeat 3\n", "line 1: expected '@for"),
+    ("{v=a/b|c}\n", "line 1: value 'a/b' contains a slash"),
+])
+def test_parse_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        Template.from_text(text)
+
+
+def test_missing_variable_is_reported_before_any_folder():
+    template = Template.from_text(TEMPLATE)
+    with pytest.raises(ValueError, match="undefined variable client"):
+        template.expand()
+
+
+def test_parse_variables():
+    assert parse_variables(["client=ACME", "n=5", "start=2024-01-31"]) == {
+        "client": "ACME", "n": 5, "start": date(2024, 1, 31)}
+    with pytest.raises(ValueError):
+        parse_variables(["novalue"])
@@ -0,0 +1,36 @@
+import sys
+
+import pytest
+
+from structify.textfile import read_entries, read_lines, read_structure, write_entries
+
+LINES = ["docs", "  2024", "    q1", "  ünïcode", "src", "  app"]
+ENTRIES = [(0, "docs"), (1, "2024"), (2, "q1"), (1, "ünïcode"), (0, "src"), (1, "app")]
+
+
+@pytest.mark.parametrize("suffix, magic", [(".txt", b"# exported"), (".txt.gz", b"\x1f\x8b"),
+                                           (".TXT.GZ", b"\x1f\x8b"),
+                                           (".txt.zst", b"\x28\xb5\x2f\xfd")])
+def test_round_trip(tmp_path, suffix, magic):
+    if suffix.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / f"structure{suffix}")
+    assert write_entries(iter(ENTRIES), path, header="exported") == len(ENTRIES)
+    with open(path, "rb") as f:
+        assert f.read(len(magic)) == magic
+    # The header comment is skipped on the way back
+    assert list(read_lines(path)) == LINES
+    assert list(read_entries(path)) == ENTRIES
+    assert list(read_structure(path).iter_lines()) == LINES
+
+
+def test_blank_lines_and_comments_are_skipped(tmp_path):
+    path = tmp_path / "structure.txt"
+    path.write_text("# header\n\ndocs\n  # note\n  2024  \n\n", encoding="utf-8")
+    assert list(read_lines(str(path))) == ["docs", "  2024"]
+
+
+def test_zst_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    with pytest.raises(OSError, match="zstandard"):
+        write_entries(iter(ENTRIES), str(tmp_path / "structure.txt.zst"))
@@ -0,0 +1,105 @@
+from structify.textfile import read_structure, write_structure
+from structify.tree import NO_NODE, ROOT, StructureTree
+
+LINES = [
+    "docs",
+    "  2024",
+    "    q1",
+    "    q2",
+    "  drafts",
+    "src",
+    "  app",
+    "  lib",
+    "tests",
+]
+
+
+def by_path(tree):
+    return {"/".join(tree.path(node)): node for node in tree.iter_nodes()}
+
+
+def test_lines_round_trip():
+    tree = StructureTree.from_lines(LINES)
+    assert len(tree) == 9
+    assert list(tree.iter_lines()) == LINES
+    assert [tree.name(node) for node in tree.children()] == ["docs", "src", "tests"]
+
+
+def test_parse_skips_blank_lines_and_annotations():
+    tree = StructureTree.from_lines(["a\t3\t120", "", "  b", "   ", "c"])
+    assert list(tree.iter_entries()) == [(0, "a"), (1, "b"), (0, "c")]
+
+
+def test_too_deep_lines_are_clamped_below_the_previous_folder():
+    tree = StructureTree.from_lines(["a", "      b"])
+    assert list(tree.iter_entries()) == [(0, "a"), (1, "b")]
+
+
+def test_file_round_trip(tmp_path):
+    tree = StructureTree.from_lines(LINES + ["  ünïcode name"])
+    for name in ("structure.txt", "structure.txt.gz"):
+        path = str(tmp_path / name)
+        write_structure(tree, path)
+        assert list(read_structure(path).iter_lines()) == list(tree.iter_lines())
+
+
+def test_names_are_interned():
+    tree = StructureTree.from_lines(["a", "  x", "b", "  x", "c", "  x"])
+    assert len(tree) == 6
+    assert tree.names.count("x") == 1
+
+
+def test_insert():
+    tree = StructureTree.from_lines(LINES)
+    nodes = by_path(tree)
+    first = tree.insert(nodes["docs"], "archive")
+    tree.insert(nodes["docs"], "notes", after=nodes["docs/2024"])
+    assert len(tree) == 11
+    assert tree.path(first) == ["docs", "archive"]
+    assert [tree.name(child) for child in tree.children(nodes["docs"])] == [
+        "archive", "2024", "notes", "drafts"]
+    # Appends after an edit continue at the end of the top level
+    tree.append(0, "zz")
+    tree.append(1, "inner")
+    assert list(tree.iter_lines())[-2:] == ["zz", "  inner"]
+
+
+def test_move_updates_depths_and_paths():
+    tree = StructureTree.from_lines(LINES)
+    nodes = by_path(tree)
+    tree.move(nodes["docs/2024"], nodes["src/app"], name="archive")
+    assert len(tree) == 9
+    assert tree.path(nodes["docs/2024/q1"]) == ["src", "app", "archive", "q1"]
+    assert list(tree.iter_lines()) == [
+        "docs",
+        "  drafts",
+        "src",
+        "  app",
+        "    archive",
+        "      q1",
+        "      q2",
+        "  lib",
+        "tests",
+    ]
+    # And back up to the top level, after "tests"
+    tree.move(nodes["docs/2024"], ROOT, after=nodes["tests"])
+    assert tree.depth[nodes["docs/2024/q2"]] == 1
+    assert list(tree.iter_lines())[-3:] == ["archive", "  q1", "  q2"]
+
+
+def test_remove_drops_the_subtree():
+    tree = StructureTree.from_lines(LINES)
+    nodes = by_path(tree)
+    tree.remove(nodes["docs"])
+    assert len(tree) == 4
+    assert list(tree.iter_lines()) == ["src", "  app", "  lib", "tests"]
+    assert tree.parent[nodes["docs"]] == NO_NODE
+
+
+def test_copy_is_independent():
+    tree = StructureTree.from_lines(LINES)
+    copy = tree.copy()
+    tree.remove(by_path(tree)["src"])
+    tree.rename(by_path(tree)["tests"], "spec")
+    assert list(copy.iter_lines()) == LINES
+    assert len(copy) == 9
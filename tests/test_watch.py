@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from structify.core import scan_tree
+from structify.watch import (CREATED, DELETED, MOVED, RESCAN, _PollingBackend, apply_events,
+                             coalesce)
+from structify.tree import StructureTree
+
+
+def created(*names):
+    return (CREATED, names)
+
+
+def deleted(*names):
+    return (DELETED, names)
+
+
+def moved(src, dst):
+    return (MOVED, tuple(src.split("/")), tuple(dst.split("/")))
+
+
+def lines(tree):
+    return list(tree.iter_lines())
+
+
+@pytest.mark.parametrize("events, expected", [
+    # Created and deleted again within the batch: nothing happened
+    ([created("a"), created("a", "b"), deleted("a")], []),
+    # Anything below a deleted folder is covered by its delete
+    ([created("a", "x"), deleted("a", "y"), deleted("a")], [deleted("a")]),
+    # Created, then renamed: one create under the final name
+    ([created("a"), created("a", "b"), moved("a", "c"), created("c", "d")],
+     [created("c"), created("c", "b"), created("c", "d")]),
+    # Renamed twice: one rename
+    ([moved("a", "b"), moved("b", "c")], [moved("a", "c")]),
+    # Renamed and back
+    ([moved("a", "b"), created("b", "x"), moved("b", "a")], [created("a", "x")]),
+    # Renamed, then deleted: the original folder is gone
+    ([moved("x", "y"), deleted("y")], [deleted("x")]),
+    ([moved("x", "p/y"), deleted("p")], [deleted("x"), deleted("p")]),
+    # Moved out of a folder before that folder went
+    ([moved("p/y", "y"), deleted("p")], [moved("p/y", "y"), deleted("p")]),
+    # Deleted, recreated, deleted: the original folder is still gone
+    ([deleted("p"), created("p"), deleted("p")], [deleted("p")]),
+    # A folder renamed away and a new one under the old name
+    ([moved("a", "b"), created("a"), moved("b", "c")], [moved("a", "c"), created("a")]),
+    ([(RESCAN,), created("a")], [(RESCAN,), created("a")]),
+])
+def test_coalesce(events, expected):
+    assert coalesce(events) == expected
+
+
+def test_coalesced_events_give_the_same_tree():
+    base = ["a", "  x", "b", "p", "  q"]
+    events = [created("n"), created("n", "m"), moved("n", "o"), moved("a", "a2"),
+              created("a2", "y"), moved("p/q", "b/q"), deleted("p"), moved("b", "b2"),
+              created("t"), deleted("t"), moved("x9", "never")]
+    one_by_one = StructureTree.from_lines(base)
+    apply_events(one_by_one, events)
+    batched = StructureTree.from_lines(base)
+    apply_events(batched, coalesce(events))
+    # x9 is not in the tree, so it moved in from outside as "never"
+    assert lines(batched) == lines(one_by_one) == [
+        "a2", "  x", "  y", "b2", "  q", "never", "o", "  m"]
+
+
+def test_apply_events_matches_a_fresh_scan(tmp_path):
+    root = str(tmp_path)
+    for path in ("a/x", "b/y", "c"):
+        os.makedirs(os.path.join(root, *path.split("/")))
+    tree = scan_tree(root, workers=1)
+    os.makedirs(os.path.join(root, "a", "new", "inner"))
+    os.rename(os.path.join(root, "b"), os.path.join(root, "renamed"))
+    os.rmdir(os.path.join(root, "c"))
+    events = [created("a", "new"), created("a", "new", "inner"), moved("b", "renamed"),
+              deleted("c"), created("already", "gone")]
+    assert apply_events(tree, coalesce(events)) == 4
+    assert lines(tree) == lines(scan_tree(root, workers=1))
+    # Applying the same events again changes nothing
+    assert apply_events(tree, events) == 0
+
+
+def test_apply_events_keeps_sorted_order(tmp_path):
+    tree = StructureTree.from_lines(["b", "d"])
+    apply_events(tree, [created("c"), created("a"), created("e"), moved("e", "0")])
+    assert lines(tree) == ["0", "a", "b", "c", "d"]
+
+
+def poll(backend):
+    backend._next_poll = 0.0
+    backend.run_once(0)
+
+
+def test_polling_backend(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "a", "x"))
+    os.mkdir(os.path.join(root, "b"))
+    events = []
+    backend = _PollingBackend(root, True, events.append, interval=60)
+    backend.start()
+    poll(backend)
+    assert events == []
+
+    os.makedirs(os.path.join(root, "a", "new", "inner"))
+    poll(backend)
+    assert events == [created("a", "new"), created("a", "new", "inner")]
+
+    del events[:]
+    os.rmdir(os.path.join(root, "a", "x"))
+    poll(backend)
+    assert events == [deleted("a", "x")]
+
+    # Polling sees a rename as the old name gone and the new one created
+    del events[:]
+    os.rename(os.path.join(root, "b"), os.path.join(root, "c"))
+    poll(backend)
+    assert events == [deleted("b"), created("c")]
+
+    # Nothing changed, nothing reported
+    del events[:]
+    poll(backend)
+    assert events == []
+
+    # The events bring a scanned tree up to date
+    tree = StructureTree.from_lines(["a", "  x", "b"])
+    apply_events(tree, [created("a", "new"), created("a", "new", "inner"),
+                        deleted("a", "x"), deleted("b"), created("c")])
+    assert lines(tree) == lines(scan_tree(root, workers=1))
+    backend.close()
+
+
+def test_polling_backend_reports_a_lost_root(tmp_path):
+    root = str(tmp_path / "root")
+    os.mkdir(root)
+    events = []
+    backend = _PollingBackend(root, True, events.append, interval=60)
+    backend.start()
+    os.rmdir(root)
+    poll(backend)
+    assert events == [(RESCAN,)]
+
+
+def test_polling_backend_cannot_watch_a_missing_root(tmp_path):
+    backend = _PollingBackend(str(tmp_path / "missing"), True, print)
+    with pytest.raises(OSError):
+        backend.start()